@@ -6,11 +6,9 @@ from pydantic import Field
 
 from pcdf import Settings
 from pcdf.cmd import CommandContext
-from pcdf.cli.typer import datamodel_cli, render_cli
+from pcdf.cli.typer import datamodel_cli, render_cli, serve_cli
 from pcdf.lib import configmap, datamodel, deployment, ingress, service
 
-from .ext import secret
-
 TOOL_VERSION = "0.0.0"
 
 
@@ -38,7 +36,10 @@ settings = Settings(
         service.DEFAULT_CONFIG,
         ingress.DEFAULT_CONFIG.with_mutators(ingress.CertManagerMutator),
         configmap.DEFAULT_CONFIG,
-        Settings.Resource(provider=secret.Provider, mutators=[]),
+        # entities may be referenced by fqname (or entry point name once
+        # their package is installed), their modules are imported only by
+        # commands running them
+        Settings.Resource(provider="pcd.ext.secret.Provider", mutators=[]),
     ],
 )
 
@@ -63,4 +64,5 @@ def setup(ctx: typer.Context, debug: bool = False, interactive: bool = True):
 
 cli.add_typer(render_cli, invoke_without_command=True)
 cli.add_typer(datamodel_cli)
+cli.add_typer(serve_cli)
 cli()
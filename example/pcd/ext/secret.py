@@ -4,31 +4,35 @@ from typing import Protocol, runtime_checkable
 
 from pcdf import Settings
 from pcdf.core import (
-    AbstractResourceProvider,
+    AsyncResourceProvider,
     Resource,
     RunContext,
+    build,
 )
 from pcdf.lib import datamodel
 
-from kubemodels.io.k8s.api.core.v1 import Secret
-from kubemodels.io.k8s.apimachinery.pkg.apis.meta.v1 import ObjectMeta
 
-
-class Provider(AbstractResourceProvider):
+class Provider(AsyncResourceProvider):
     @runtime_checkable
     class Datamodel(Protocol):
         metadata: datamodel.Metadata
 
-    def execute(
+    async def execute(
         self, log: Logger, ctx: RunContext, data: Datamodel
     ) -> Sequence[Resource]:
+        from kubemodels.io.k8s.api.core.v1 import Secret
+        from kubemodels.io.k8s.apimachinery.pkg.apis.meta.v1 import ObjectMeta
+
         return [
             Resource(
-                Secret(
+                build(
+                    Secret,
                     apiVersion="core/v1",
                     kind="Job",
-                    metadata=ObjectMeta(
-                        name=data.metadata.name, namespace=data.metadata.namespace
+                    metadata=build(
+                        ObjectMeta,
+                        name=data.metadata.name,
+                        namespace=data.metadata.namespace,
                     ),
                     stringData={"somesecretvariable": "oh it's very secret"},
                 )
@@ -1,2 +1,15 @@
-from pcdf.core import *
+from typing import TYPE_CHECKING, Any
 
+if TYPE_CHECKING:  # pragma: no cover
+    from pcdf.core import *
+
+from pcdf.core import __all__
+
+
+def __getattr__(name: str) -> Any:
+    # re-export pcdf.core lazily, see pcdf.core.__getattr__
+    if name in __all__:
+        from pcdf import core
+
+        return getattr(core, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,25 @@
+"""Benchmark suite of pcdf hot paths over synthetic datamodels.
+
+Run it with ``python -m pcdf.bench run --save baseline.json`` and later
+``python -m pcdf.bench run --compare baseline.json`` to gate regressions.
+``python -m pcdf.bench imports --budget-ms N`` guards cold start time.
+"""
+
+from pcdf.bench.baseline import Comparison, Report, ScaleMismatchError, compare
+from pcdf.bench.suite import Benchmark, Result, collect, measure
+from pcdf.bench.synthetic import SETTINGS, Datamodel, Scale, make_datamodel
+
+__all__ = [
+    "Benchmark",
+    "Comparison",
+    "Datamodel",
+    "Report",
+    "Result",
+    "SETTINGS",
+    "Scale",
+    "ScaleMismatchError",
+    "collect",
+    "compare",
+    "make_datamodel",
+    "measure",
+]
@@ -0,0 +1,135 @@
+import fnmatch
+import sys
+import tempfile
+from typing import Annotated
+
+import typer
+
+from pcdf.bench.baseline import (
+    Report,
+    ScaleMismatchError,
+    compare,
+    format_comparison,
+    format_results,
+)
+from pcdf.bench.imports import (
+    DEFAULT_FORBIDDEN,
+    DEFAULT_STATEMENT,
+    median_profile,
+    slowest,
+)
+from pcdf.bench.suite import collect, measure
+from pcdf.bench.synthetic import Scale
+
+cli = typer.Typer(no_args_is_help=True, short_help="pcdf benchmarks")
+
+
+@cli.command("run")
+def run_cmd(
+    ports: Annotated[int, typer.Option("--ports")] = Scale.ports,
+    envs: Annotated[int, typer.Option("--envs")] = Scale.envs,
+    publications: Annotated[int, typer.Option("--publications")] = Scale.publications,
+    files: Annotated[int, typer.Option("--files")] = Scale.files,
+    file_size: Annotated[
+        int, typer.Option("--file-size", help="Size of each file in bytes")
+    ] = Scale.file_size,
+    releases: Annotated[
+        int, typer.Option("--releases", help="Values files rendered end-to-end")
+    ] = Scale.releases,
+    only: Annotated[
+        list[str],
+        typer.Option("--only", "-k", help="Run benchmarks matching glob pattern"),
+    ] = [],
+    min_time: Annotated[
+        float, typer.Option("--min-time", help="Seconds spent on each benchmark")
+    ] = 0.2,
+    save: Annotated[
+        str, typer.Option("--save", help="Write results to JSON report")
+    ] = "",
+    baseline: Annotated[
+        str,
+        typer.Option("--compare", help="Compare results with saved JSON report"),
+    ] = "",
+    threshold: Annotated[
+        float, typer.Option("--threshold", help="Tolerated slowdown, 0.1 is 10%")
+    ] = 0.1,
+):
+    """Runs benchmarks and optionally saves or gates them against baseline"""
+    scale = Scale(ports, envs, publications, files, file_size, releases)
+    with tempfile.TemporaryDirectory(prefix="pcdf-bench-") as workdir:
+        benches = [
+            b
+            for b in collect(scale, workdir)
+            if not only or any(fnmatch.fnmatch(b.name, p) for p in only)
+        ]
+        results = []
+        for bench in benches:
+            sys.stderr.write(f"{bench.name}\n")
+            results.append(measure(bench, min_time))
+
+    print(format_results(results))
+    report = Report(scale, {r.name: r for r in results})
+    if save != "":
+        report.save(save)
+    if baseline != "":
+        _gate(Report.load(baseline), report, threshold)
+
+
+@cli.command("compare")
+def compare_cmd(
+    baseline: Annotated[str, typer.Argument(help="Baseline JSON report")],
+    current: Annotated[str, typer.Argument(help="Current JSON report")],
+    threshold: Annotated[
+        float, typer.Option("--threshold", help="Tolerated slowdown, 0.1 is 10%")
+    ] = 0.1,
+):
+    """Compares two saved reports, exits with 1 on regression"""
+    _gate(Report.load(baseline), Report.load(current), threshold)
+
+
+@cli.command("imports")
+def imports_cmd(
+    statement: Annotated[
+        str, typer.Option("--statement", "-c", help="Python statement to profile")
+    ] = DEFAULT_STATEMENT,
+    budget_ms: Annotated[
+        float,
+        typer.Option("--budget-ms", help="Fail when imports take longer, 0 disables"),
+    ] = 0,
+    forbid: Annotated[
+        list[str],
+        typer.Option("--forbid", help="Fail when module (or its submodule) loaded"),
+    ] = list(DEFAULT_FORBIDDEN),
+    runs: Annotated[int, typer.Option("--runs")] = 5,
+):
+    """Measures cold import time of statement with python -X importtime"""
+    profile = median_profile(statement, runs)
+    for module, us in slowest(profile):
+        print(f"{us / 1e3:9.1f} ms  {module}")
+    print(f"{profile.total_us / 1e3:9.1f} ms  total")
+
+    failed = False
+    if loaded := profile.loaded(forbid):
+        sys.stderr.write(f"forbidden modules loaded: {", ".join(loaded)}\n")
+        failed = True
+    if budget_ms > 0 and profile.total_us / 1e3 > budget_ms:
+        sys.stderr.write(f"imports exceeded budget of {budget_ms} ms\n")
+        failed = True
+    if failed:
+        exit(1)
+
+
+def _gate(baseline: Report, current: Report, threshold: float):
+    try:
+        rows = compare(baseline, current, threshold)
+    except ScaleMismatchError as e:
+        sys.stderr.write(f"{e}\n")
+        exit(2)
+
+    print(format_comparison(rows))
+    if regressed := [c.name for c in rows if c.regressed]:
+        sys.stderr.write(f"{len(regressed)} benchmark(s) regressed\n")
+        exit(1)
+
+
+cli()
@@ -0,0 +1,134 @@
+import json
+import platform
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from pcdf.bench.suite import Result
+from pcdf.bench.synthetic import Scale
+
+FORMAT_VERSION = 1
+
+
+@dataclass(frozen=True)
+class Report:
+    """Benchmark results with scale they were measured at"""
+
+    scale: Scale
+    results: dict[str, Result]
+    python: str = platform.python_version()
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "version": FORMAT_VERSION,
+            "python": self.python,
+            "scale": asdict(self.scale),
+            "results": {name: r.to_dict() for name, r in self.results.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, raw: dict[str, Any]) -> "Report":
+        if raw.get("version") != FORMAT_VERSION:
+            raise ValueError(
+                f"unsupported benchmark report version: {raw.get('version')}"
+            )
+        return cls(
+            scale=Scale(**raw["scale"]),
+            results={
+                name: Result.from_dict(name, r) for name, r in raw["results"].items()
+            },
+            python=raw["python"],
+        )
+
+    def save(self, path: str):
+        with open(path, "w") as file:
+            json.dump(self.to_dict(), file, indent=2)
+            file.write("\n")
+
+    @classmethod
+    def load(cls, path: str) -> "Report":
+        with open(path, "r") as file:
+            return cls.from_dict(json.load(file))
+
+
+@dataclass(frozen=True)
+class Comparison:
+    name: str
+    baseline_ns: int
+    current_ns: int
+    regressed: bool
+
+    @property
+    def ratio(self) -> float:
+        return self.current_ns / self.baseline_ns if self.baseline_ns else 1.0
+
+
+@dataclass
+class ScaleMismatchError(Exception):
+    """Raised then reports measured at different scales are compared"""
+
+    baseline: Scale
+    current: Scale
+
+    def __str__(self) -> str:
+        return f"reports measured at different scales: baseline {self.baseline}, current {self.current}"  # noqa: E501
+
+
+def compare(baseline: Report, current: Report, threshold: float) -> list[Comparison]:
+    """Compares medians of benchmarks present in both reports. Benchmark is
+    regressed when its median grew by more than threshold (0.1 is 10%) and
+    by more than its baseline median absolute deviation, so that noisy
+    microbenchmarks do not fail the gate on jitter alone.
+    """
+    if baseline.scale != current.scale:
+        raise ScaleMismatchError(baseline.scale, current.scale)
+
+    rows = []
+    for name, cur in current.results.items():
+        if (base := baseline.results.get(name)) is None:
+            continue
+        limit = max(base.median_ns * (1 + threshold), base.median_ns + base.mad_ns)
+        rows.append(
+            Comparison(name, base.median_ns, cur.median_ns, cur.median_ns > limit)
+        )
+    return rows
+
+
+def format_results(results: list[Result]) -> str:
+    header = ("benchmark", "samples", "median us", "min us", "mad us")
+    rows = [
+        (
+            r.name,
+            str(r.samples),
+            f"{r.median_ns / 1e3:.1f}",
+            f"{r.min_ns / 1e3:.1f}",
+            f"{r.mad_ns / 1e3:.1f}",
+        )
+        for r in results
+    ]
+    return _format_table(header, rows)
+
+
+def format_comparison(rows: list[Comparison]) -> str:
+    header = ("benchmark", "baseline us", "current us", "change", "")
+    body = [
+        (
+            c.name,
+            f"{c.baseline_ns / 1e3:.1f}",
+            f"{c.current_ns / 1e3:.1f}",
+            f"{(c.ratio - 1) * 100:+.1f}%",
+            "REGRESSED" if c.regressed else "",
+        )
+        for c in rows
+    ]
+    return _format_table(header, body)
+
+
+def _format_table(header: tuple[str, ...], rows: list[tuple[str, ...]]) -> str:
+    widths = [max(len(r[i]) for r in [header, *rows]) for i in range(len(header))]
+    return "\n".join(
+        "  ".join(
+            col.ljust(w) if i == 0 else col.rjust(w)
+            for i, (col, w) in enumerate(zip(row, widths))
+        ).rstrip()
+        for row in [header, *rows]
+    )
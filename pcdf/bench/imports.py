@@ -0,0 +1,62 @@
+import subprocess
+import sys
+from dataclasses import dataclass
+
+# Statement importing everything a CLI built with pcdf imports before it
+# parses arguments.
+DEFAULT_STATEMENT = (
+    "import pcdf, pcdf.cli.typer, pcdf.lib.configmap, pcdf.lib.deployment, "
+    "pcdf.lib.ingress, pcdf.lib.service"
+)
+
+# Modules cold start must not load: they're needed only by commands actually
+# rendering or printing something.
+DEFAULT_FORBIDDEN = ("kubemodels", "yaml", "rich", "asyncio", "pcdf.core.factory")
+
+
+@dataclass(frozen=True)
+class ImportProfile:
+    """Import time of statement in fresh interpreter"""
+
+    total_us: int
+    modules: dict[str, int]  # module -> cumulative import time, us
+
+    def loaded(self, packages: list[str]) -> list[str]:
+        """Returns packages which (or submodules of which) were loaded"""
+        return [
+            p
+            for p in packages
+            if any(m == p or m.startswith(p + ".") for m in self.modules)
+        ]
+
+
+def profile_imports(statement: str = DEFAULT_STATEMENT) -> ImportProfile:
+    """Runs statement under python -X importtime and parses its report"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = {}
+    total = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        modules[name.strip()] = int(cumulative)
+        if not name.startswith("  "):  # not nested into another import
+            total += int(cumulative)
+    return ImportProfile(total, modules)
+
+
+def median_profile(statement: str = DEFAULT_STATEMENT, runs: int = 5) -> ImportProfile:
+    """Profiles statement several times, returns the run of median total time"""
+    profiles = sorted(
+        (profile_imports(statement) for _ in range(runs)), key=lambda p: p.total_us
+    )
+    return profiles[len(profiles) // 2]
+
+
+def slowest(profile: ImportProfile, top: int = 15) -> list[tuple[str, int]]:
+    return sorted(profile.modules.items(), key=lambda m: m[1], reverse=True)[:top]
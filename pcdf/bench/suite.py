@@ -0,0 +1,185 @@
+import gc
+import logging
+import statistics
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from pcdf.bench.synthetic import SETTINGS, Datamodel, Scale, make_values, write_releases
+from pcdf.cmd import CommandContext, OutputFormat, get_serializer
+from pcdf.cmd.render import render_manifests
+from pcdf.cmd.values import load_values
+from pcdf.core import ResourceFactory, Settings, construction, validate_config
+from pcdf.core.context import RunInfo
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    """Single measured operation. Setup runs before every call, outside of
+    measured time, and its result is passed to operation as arguments.
+    """
+
+    name: str
+    group: str
+    op: Callable[..., Any]
+    setup: Callable[[], tuple] = tuple
+
+
+@dataclass(frozen=True)
+class Result:
+    name: str
+    group: str
+    samples: int
+    median_ns: int
+    min_ns: int
+    mad_ns: int
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "group": self.group,
+            "samples": self.samples,
+            "median_ns": self.median_ns,
+            "min_ns": self.min_ns,
+            "mad_ns": self.mad_ns,
+        }
+
+    @classmethod
+    def from_dict(cls, name: str, raw: dict[str, Any]) -> "Result":
+        return cls(name=name, **raw)
+
+
+def measure(bench: Benchmark, min_time: float = 0.2, min_samples: int = 5) -> Result:
+    """Calls operation until it took min_time seconds in total and at least
+    min_samples times. Median and median absolute deviation of single call
+    are reported, being less sensitive to outliers than mean.
+    """
+    bench.op(*bench.setup())  # warm up caches and lazy imports
+    gc.collect()
+
+    samples: list[int] = []
+    total = 0
+    budget = int(min_time * 1e9)
+    while total < budget or len(samples) < min_samples:
+        args = bench.setup()
+        start = time.perf_counter_ns()
+        bench.op(*args)
+        elapsed = time.perf_counter_ns() - start
+        samples.append(elapsed)
+        total += elapsed
+
+    median = int(statistics.median(samples))
+    return Result(
+        name=bench.name,
+        group=bench.group,
+        samples=len(samples),
+        median_ns=median,
+        min_ns=min(samples),
+        mad_ns=int(statistics.median(abs(s - median) for s in samples)),
+    )
+
+
+def collect(scale: Scale, workdir: str) -> list[Benchmark]:
+    """Builds benchmarks of every provider and mutator of synthetic settings,
+    whole factory run, serialization and end-to-end render of releases
+    written to workdir.
+    """
+    log = logging.getLogger("pcdf.bench")
+    raw = make_values(scale)
+    data = Datamodel.model_validate(raw)
+    factory = ResourceFactory.from_config(log, SETTINGS)
+    ctx = factory.root_ctx.with_run_info(RunInfo())
+
+    benches = [
+        Benchmark(
+            "datamodel/validate", "datamodel", Datamodel.model_validate, lambda: (raw,)
+        ),
+        Benchmark(
+            "datamodel/conformance",
+            "datamodel",
+            validate_config,
+            lambda: (SETTINGS.resources, data),
+        ),
+    ]
+
+    for res in SETTINGS.resources:
+        provider_cls = res.provider_class()
+        bare = provider_cls().with_mutators()
+        benches.append(
+            Benchmark(
+                f"provider/{provider_cls.fqname()}",
+                "provider",
+                bare.execute,
+                lambda: (log, ctx, data),
+            )
+        )
+
+        def execute_trusted(bare=bare):
+            with construction.trusted():
+                bare.execute(log, ctx, data)
+
+        benches.append(
+            Benchmark(
+                f"provider/{provider_cls.fqname()}/trusted", "provider", execute_trusted
+            )
+        )
+        benches += _mutator_benchmarks(log, ctx, data, res)
+
+    trusted = ResourceFactory.from_config(log, SETTINGS).with_construction(True)
+    benches += [
+        Benchmark("factory/run", "factory", factory.run, lambda: (data,)),
+        Benchmark("factory/run/trusted", "factory", trusted.run, lambda: (data,)),
+    ]
+
+    resources = factory.run(data)
+    for fmt in OutputFormat:
+        serializer = get_serializer(fmt)
+        benches.append(
+            Benchmark(
+                f"serialize/{fmt.value}",
+                "serialize",
+                serializer.dump_resources,
+                lambda: (resources,),
+            )
+        )
+
+    cmd_ctx = CommandContext(
+        logger=log, settings=SETTINGS, datamodel=Datamodel, interactive=False
+    )
+    paths = write_releases(workdir, scale)
+
+    def render_releases():
+        for path in paths:
+            model = load_values(cmd_ctx, path).model
+            validate_config(SETTINGS.resources, model)
+            render_manifests(cmd_ctx, factory, model)
+
+    benches.append(Benchmark("render/releases", "render", render_releases))
+    return benches
+
+
+def _mutator_benchmarks(
+    log: logging.Logger, ctx: Any, data: Datamodel, res: Settings.Resource
+) -> list[Benchmark]:
+    """Measures every mutator against resources produced by provider with
+    the mutators configured before it, i.e. the state it sees in a real run.
+    """
+    benches = []
+    mutators = res.mutator_classes()
+    for i, mut_cls in enumerate(mutators):
+        provider = res.provider_class()().with_mutators(*[m() for m in mutators[:i]])
+        mutator = mut_cls()
+
+        def op(resources, mutator=mutator):
+            for r in resources:
+                mutator.execute(log, data, r)
+
+        benches.append(
+            Benchmark(
+                f"mutator/{mut_cls.fqname()}",
+                "mutator",
+                op,
+                lambda provider=provider: (provider.execute(log, ctx, data),),
+            )
+        )
+    return benches
@@ -0,0 +1,97 @@
+import os
+from dataclasses import dataclass
+from typing import Any
+
+import yaml
+from pydantic import Field
+
+from pcdf import Settings
+from pcdf.lib import configmap, datamodel, deployment, ingress, service
+
+
+class Datamodel(datamodel.Base):
+    """Datamodel satisfying every pcdf.lib entity"""
+
+    runtime: datamodel.Runtime
+    resources: datamodel.Resources = Field(default_factory=datamodel.Resources)
+    network: datamodel.Networking
+    certmanager: datamodel.CertManager = Field(default_factory=datamodel.CertManager)
+    envs: list[datamodel.EnvVar] = []
+    files: list[datamodel.Document] = []
+    filesMountPath: str = "/opt/app"
+
+
+# Every pcdf.lib provider with every mutator it ships. Default configs are
+# copied, not extended: with_mutators() modifies them in place.
+SETTINGS = Settings(
+    version="bench",
+    resources=[
+        Settings.Resource(
+            provider=deployment.Provider,
+            mutators=[*deployment.DEFAULT_CONFIG.mutators, deployment.ResourcesMutator],
+        ),
+        service.DEFAULT_CONFIG,
+        Settings.Resource(
+            provider=ingress.Provider,
+            mutators=[*ingress.DEFAULT_CONFIG.mutators, ingress.CertManagerMutator],
+        ),
+        configmap.DEFAULT_CONFIG,
+    ],
+)
+
+
+@dataclass(frozen=True)
+class Scale:
+    """Size of generated datamodels"""
+
+    ports: int = 2
+    envs: int = 10
+    publications: int = 2
+    files: int = 2
+    file_size: int = 1024
+    releases: int = 10
+
+
+def make_values(scale: Scale, release: int = 0) -> dict[str, Any]:
+    """Builds raw values of given release as it would be read from values file"""
+    line = "key: " + "v" * 59 + "\n"
+    content = line * max(scale.file_size // len(line), 1)
+    return {
+        "metadata": {
+            "name": f"release-{release}",
+            "namespace": "bench",
+            "project": "pcdf-bench",
+        },
+        "runtime": {"image": "registry.local/bench", "tag": f"v{release}"},
+        "network": {
+            "ports": [
+                {"name": f"port-{i}", "number": 8000 + i} for i in range(scale.ports)
+            ],
+            "publicate": [
+                {"host": f"host-{i}.release-{release}.bench.local"}
+                for i in range(scale.publications)
+            ],
+        },
+        "envs": [
+            {"name": f"ENV_{i}", "value": f"value-{i}"} for i in range(scale.envs)
+        ],
+        "files": [
+            {"name": f"file-{i}.yaml", "content": content} for i in range(scale.files)
+        ],
+    }
+
+
+def make_datamodel(scale: Scale, release: int = 0) -> Datamodel:
+    return Datamodel.model_validate(make_values(scale, release))
+
+
+def write_releases(path: str, scale: Scale) -> list[str]:
+    """Writes values file of every release into directory, returns their paths"""
+    os.makedirs(path, exist_ok=True)
+    paths = []
+    for release in range(scale.releases):
+        p = os.path.join(path, f"release-{release}.yaml")
+        with open(p, "w") as file:
+            yaml.safe_dump(make_values(scale, release), file)
+        paths.append(p)
+    return paths
@@ -2,7 +2,18 @@ from typing import Annotated
 
 import typer
 
-from pcdf.cmd import render, schema, validate
+from pcdf.cmd.cache import default_cache_dir
+from pcdf.cmd.remote import DEFAULT_PORT
+from pcdf.cmd.serializers import OutputFormat
+
+# Command implementations are imported inside commands, so that --help and
+# other commands do not load what they do not run.
+
+CACHE_HELP = (
+    "Reuse output of previous renders of the same values. Entries hold whole "
+    "output (secrets included) and are keyed by datamodel only, so enable it "
+    "only for providers not reading external state"
+)
 
 render_cli = typer.Typer(name="render", short_help="Render manifests")
 
@@ -12,9 +23,248 @@ def render_cmd(
     ctx: typer.Context,
     values: Annotated[str, typer.Option("--values", "-f")] = "values.yaml",
     output: Annotated[str, typer.Option("--output", "-o")] = "",
+    output_dir: Annotated[
+        str,
+        typer.Option(
+            "--output-dir",
+            help="Write each resource to its own file under directory, files "
+            "of unchanged resources are left alone. Files are replaced one by "
+            "one, so update as a whole is not atomic",
+        ),
+    ] = "",
+    fmt: Annotated[
+        OutputFormat, typer.Option("--format", help="Output format")
+    ] = OutputFormat.YAML,
+    batch: Annotated[
+        str,
+        typer.Option(
+            "--batch",
+            help="Directory, glob or manifest file with values files to render",
+        ),
+    ] = "",
+    split: Annotated[
+        bool,
+        typer.Option(
+            "--split",
+            help="Write each values file of batch to its own file under --output",
+        ),
+    ] = False,
+    overlays: Annotated[
+        list[str],
+        typer.Option(
+            "--overlay",
+            help="Directory, glob or manifest file with overlays merged onto "
+            "--values, repeat for every axis. Each combination of one overlay "
+            "per axis is rendered into its own directory under --output",
+        ),
+    ] = [],
+    jobs: Annotated[
+        int,
+        typer.Option(
+            "--jobs",
+            "-j",
+            help="Worker processes for batch and overlay rendering, 0 means one "
+            "per CPU",
+        ),
+    ] = 1,
+    use_cache: Annotated[
+        bool,
+        typer.Option(
+            "--cache/--no-cache",
+            help=CACHE_HELP,
+        ),
+    ] = False,
+    cache_dir: Annotated[
+        str, typer.Option("--cache-dir", help="Render cache directory")
+    ] = default_cache_dir(),
+    cache_size: Annotated[
+        int, typer.Option("--cache-size", help="Render cache size limit in MiB")
+    ] = 256,
+    state: Annotated[
+        str,
+        typer.Option(
+            "--state",
+            help="Incremental render state file, providers with unchanged "
+            "inputs reuse output stored there",
+        ),
+    ] = "",
+    watch: Annotated[
+        bool,
+        typer.Option(
+            "--watch",
+            help="Keep running and render again whenever values file changes",
+        ),
+    ] = False,
+    debounce: Annotated[
+        float,
+        typer.Option(
+            "--debounce", help="Seconds changes have to settle before --watch renders"
+        ),
+    ] = 0.2,
+    server: Annotated[
+        str,
+        typer.Option(
+            "--server",
+            envvar="PCDF_SERVER",
+            help="Forward render to server started by `serve`: socket path or "
+            "host:port",
+        ),
+    ] = "",
+    content_hash: Annotated[
+        bool,
+        typer.Option(
+            "--content-hash",
+            help="Annotate every resource with hash of its content "
+            "(run id excluded)",
+        ),
+    ] = False,
+    diff_against: Annotated[
+        str,
+        typer.Option(
+            "--diff-against",
+            help="Previous render (file or directory), only new and changed "
+            "resources are written",
+        ),
+    ] = "",
+    pruned: Annotated[
+        str,
+        typer.Option(
+            "--pruned",
+            help="File to list resources of --diff-against render which are "
+            "gone, they are logged otherwise",
+        ),
+    ] = "",
+    verify_resources: Annotated[
+        bool,
+        typer.Option(
+            "--verify-resources",
+            help="Validate resources built without validation by trusted "
+            "construction mode, render cache is bypassed",
+        ),
+    ] = False,
+    profile: Annotated[
+        bool,
+        typer.Option(
+            "--profile", help="Print time spent by every provider, mutator and phase"
+        ),
+    ] = False,
+    profile_trace: Annotated[
+        str,
+        typer.Option(
+            "--profile-trace", help="Write Chrome trace (Perfetto) JSON to file"
+        ),
+    ] = "",
+    profile_memory: Annotated[
+        bool,
+        typer.Option("--profile-memory", help="Record tracemalloc peak of spans"),
+    ] = False,
 ):
     """Render kubernetes manifests"""
-    render(ctx.obj, values, output)
+    if len(overlays) > 0 and (batch != "" or watch or server != ""):
+        raise typer.BadParameter(
+            "--overlay could not be used with --batch, --watch or --server"
+        )
+    if diff_against != "" and (
+        batch != "" or watch or server != "" or len(overlays) > 0 or state != ""
+    ):
+        raise typer.BadParameter(
+            "--diff-against could not be used with --batch, --watch, --server, "
+            "--overlay or --state"
+        )
+    if output_dir != "" and (
+        output != ""
+        or batch != ""
+        or watch
+        or server != ""
+        or len(overlays) > 0
+        or diff_against != ""
+    ):
+        raise typer.BadParameter(
+            "--output-dir could not be used with --output, --batch, --watch, "
+            "--server, --overlay or --diff-against"
+        )
+    if split and batch == "":
+        raise typer.BadParameter("--split could only be used with --batch")
+    if state != "" and (batch != "" or len(overlays) > 0):
+        raise typer.BadParameter("--state could not be used with --batch or --overlay")
+    if content_hash and (batch != "" or watch or len(overlays) > 0):
+        raise typer.BadParameter(
+            "--content-hash could not be used with --batch, --watch or --overlay"
+        )
+    if use_cache and (output_dir != "" or diff_against != "" or watch or state != ""):
+        raise typer.BadParameter(
+            "--cache could not be used with --output-dir, --diff-against, --watch "
+            "or --state"
+        )
+    if server != "":
+        # server renders single values file with settings it was started with
+        if (
+            batch != ""
+            or split
+            or jobs != 1
+            or watch
+            or state != ""
+            or use_cache
+            or verify_resources
+            or content_hash
+            or profile
+            or profile_trace != ""
+            or profile_memory
+        ):
+            raise typer.BadParameter(
+                "--server could not be used with --batch, --split, --jobs, "
+                "--watch, --state, --cache, --verify-resources, --content-hash "
+                "or --profile*"
+            )
+        from pcdf.cmd.remote import Address, render_remote_to
+
+        render_remote_to(ctx.obj, Address.parse(server), values, output, fmt)
+        return
+
+    from pcdf.cmd import RenderCache, render_batch
+    from pcdf.cmd.render import render
+    from pcdf.cmd.profile import profile_command
+
+    # every command below builds its factory from settings
+    if verify_resources:
+        ctx.obj["settings"] = ctx.obj["settings"].model_copy(
+            update={"verify_resources": True}
+        )
+
+    if watch:
+        from pcdf.cmd.watch import watch as watch_values
+
+        if batch != "":
+            raise typer.BadParameter("--watch could not be used with --batch")
+        with profile_command(profile, profile_trace, profile_memory):
+            watch_values(ctx.obj, values, output, state, fmt, debounce)
+        return
+
+    cache = (
+        None
+        if not use_cache or verify_resources
+        else RenderCache(cache_dir, cache_size * 1024 * 1024)
+    )
+    with profile_command(profile, profile_trace, profile_memory):
+        if output_dir != "":
+            from pcdf.cmd.outdir import render_dir
+
+            render_dir(ctx.obj, values, output_dir, state, fmt, content_hash)
+            return
+        if diff_against != "":
+            from pcdf.cmd.diff import render_diff
+
+            render_diff(ctx.obj, values, diff_against, output, pruned, fmt)
+            return
+        if batch != "":
+            render_batch(ctx.obj, batch, output, split, jobs, cache, fmt)
+            return
+        if len(overlays) > 0:
+            from pcdf.cmd.overlay import render_overlays
+
+            render_overlays(ctx.obj, values, overlays, output, jobs, cache, fmt)
+            return
+        render(ctx.obj, values, output, cache, state, fmt, content_hash)
 
 
 datamodel_cli = typer.Typer(
@@ -33,6 +283,8 @@ def schema_cmd(
 
     Use `datamodel validate` first to ensure that you use correct schema
     """
+    from pcdf.cmd import schema
+
     schema(ctx.obj, output)
 
 
@@ -43,4 +295,56 @@ def validate_cmd(
     show_success_msg: bool = True,
 ):
     """Check if datamodel is correct"""
+    from pcdf.cmd import validate
+
     validate(ctx.obj, values, show_success_msg)
+
+
+serve_cli = typer.Typer(name="serve", short_help="Serve renders from warm process")
+
+
+@serve_cli.callback(invoke_without_command=True)
+def serve_cmd(
+    ctx: typer.Context,
+    socket: Annotated[
+        str, typer.Option("--socket", help="Listen on unix socket instead of TCP")
+    ] = "",
+    host: Annotated[str, typer.Option("--host")] = "127.0.0.1",
+    port: Annotated[int, typer.Option("--port", help="0 picks free port")] = (
+        DEFAULT_PORT
+    ),
+    reload: Annotated[
+        bool,
+        typer.Option(
+            "--reload/--no-reload",
+            help="Restart when source files defining settings change",
+        ),
+    ] = True,
+    reload_interval: Annotated[
+        float, typer.Option("--reload-interval", help="Seconds between checks")
+    ] = 1.0,
+    use_cache: Annotated[
+        bool,
+        typer.Option(
+            "--cache/--no-cache",
+            help=CACHE_HELP,
+        ),
+    ] = False,
+    cache_dir: Annotated[
+        str, typer.Option("--cache-dir", help="Render cache directory")
+    ] = default_cache_dir(),
+    cache_size: Annotated[
+        int, typer.Option("--cache-size", help="Render cache size limit in MiB")
+    ] = 256,
+):
+    """Serve render, validate and schema requests over HTTP
+
+    Endpoints: `POST /render?format=yaml`, `POST /validate` (values file as
+    body), `GET /schema`, `GET /healthz` and `GET /metrics`.
+    """
+    from pcdf.cmd import RenderCache
+    from pcdf.cmd.remote import Address
+    from pcdf.cmd.serve import serve
+
+    cache = RenderCache(cache_dir, cache_size * 1024 * 1024) if use_cache else None
+    serve(ctx.obj, Address(socket, host, port), cache, reload, reload_interval)
@@ -1,3 +1,51 @@
-from pcdf.cmd.datamodel import validate, schema
-from pcdf.cmd.render import render
-from pcdf.cmd.context import CommandContext
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:  # pragma: no cover
+    from pcdf.cmd.batch import render_batch
+    from pcdf.cmd.cache import RenderCache
+    from pcdf.cmd.context import CommandContext
+    from pcdf.cmd.datamodel import schema, validate
+    from pcdf.cmd.diff import render_diff
+    from pcdf.cmd.outdir import render_dir
+    from pcdf.cmd.overlay import render_overlays
+    from pcdf.cmd.remote import Address, render_remote, render_remote_to
+    from pcdf.cmd.render import render
+    from pcdf.cmd.serializers import OutputFormat, Serializer, get_serializer
+    from pcdf.cmd.values import LoadedValues, load_values
+
+# Commands are imported on first access: CLI startup (e.g. --help) should not
+# pay for modules of commands it does not run. Importing submodule binds it to
+# the package under its name, so render imported after pcdf.cmd.render is the
+# module: import it from pcdf.cmd.render in such code.
+_EXPORTS = {
+    "validate": "datamodel",
+    "schema": "datamodel",
+    "render": "render",
+    "render_batch": "batch",
+    "render_diff": "diff",
+    "render_dir": "outdir",
+    "render_overlays": "overlay",
+    "render_remote": "remote",
+    "render_remote_to": "remote",
+    "Address": "remote",
+    "CommandContext": "context",
+    "RenderCache": "cache",
+    "LoadedValues": "values",
+    "load_values": "values",
+    "OutputFormat": "serializers",
+    "Serializer": "serializers",
+    "get_serializer": "serializers",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if (module := _EXPORTS.get(name)) is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,272 @@
+import functools
+import multiprocessing
+import os
+import pickle
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+from pcdf.cmd.cache import RenderCache
+from pcdf.cmd.context import CommandContext
+from pcdf.cmd.render import render_manifests, write_output
+from pcdf.cmd.serializers import OutputFormat, Serializer, get_serializer
+from pcdf.cmd.values import load_values
+from pcdf.core import (
+    MemoScope,
+    MemoStore,
+    ProviderExecutionError,
+    ResourceFactory,
+    profiling,
+    validate_config,
+)
+
+VALUES_SUFFIXES = (".yaml", ".yml")
+
+# Worker process state: command context, warm factory built once by pool
+# initializer and function rendering every item sent to the worker with it.
+_worker: (
+    tuple[CommandContext, ResourceFactory, Callable[..., "RenderResult"]] | None
+) = None
+
+
+@dataclass
+class RenderResult:
+    """Outcome of rendering a single values file in batch"""
+
+    values: str
+    output: str = ""
+    error: Exception | None = None
+
+
+def resolve_inputs(source: str) -> list[str]:
+    """Expands batch source into the ordered list of values files.
+
+    Source could be a directory (every *.yaml and *.yml file in it),
+    a glob pattern or a manifest file listing one values file per line.
+    Manifest entries are relative to the manifest's directory. Source which
+    does not exist expands to nothing.
+    """
+    if os.path.isdir(source):
+        return sorted(
+            path
+            for name in os.listdir(source)
+            if name.endswith(VALUES_SUFFIXES)
+            and os.path.isfile(path := os.path.join(source, name))
+        )
+
+    if any(c in source for c in "*?["):
+        from glob import glob
+
+        return sorted(p for p in glob(source, recursive=True) if os.path.isfile(p))
+
+    if not os.path.isfile(source):
+        return []
+    base = os.path.dirname(source)
+    with open(source, "r") as file:
+        entries = [line.strip() for line in file]
+    return [
+        os.path.join(base, entry)
+        for entry in entries
+        if entry != "" and not entry.startswith("#")
+    ]
+
+
+def render_one(
+    ctx: CommandContext,
+    factory: ResourceFactory,
+    values: str,
+    cache: RenderCache | None = None,
+    serializer: Serializer = get_serializer(OutputFormat.YAML),
+) -> RenderResult:
+    """Renders single values file with already configured factory.
+    Any error is captured into result instead of being raised.
+    """
+    try:
+        with profiling.span("load", "phase"):
+            data = load_values(ctx, values).model
+        with profiling.span("validate", "phase"):
+            validate_config(ctx["settings"].resources, data)
+        return RenderResult(
+            values,
+            render_manifests(ctx, factory, data, cache, serializer=serializer),
+        )
+    except Exception as err:
+        return RenderResult(values, error=err)
+
+
+def portable_error(err: Exception) -> Exception:
+    """Makes error safe to send back from worker process.
+    ProviderExecutionError keeps its structure, unpicklable errors are
+    replaced with RuntimeError holding original message.
+    """
+    if isinstance(err, ProviderExecutionError):
+        return ProviderExecutionError(
+            err.stage, err.provider_name, portable_error(err.wrapped_err)
+        )
+    try:
+        pickle.loads(pickle.dumps(err))
+        return err
+    except Exception:
+        return RuntimeError(f"{type(err).__name__}: {err}")
+
+
+def _init_worker(ctx: CommandContext, render: Callable[..., RenderResult]):
+    global _worker
+    factory = ResourceFactory.from_config(
+        ctx["logger"], ctx["settings"]
+    ).with_batch_memo(MemoStore())
+    _worker = (ctx, factory, render)
+
+
+def _render_in_worker(items: list[Any]) -> list[RenderResult]:
+    assert _worker is not None, "worker is not initialized"
+    ctx, factory, render = _worker
+    results = [render(ctx, factory, item) for item in items]
+    for res in results:
+        if res.error is not None:
+            res.error = portable_error(res.error)
+    return results
+
+
+def render_pool[T](
+    ctx: CommandContext,
+    items: list[T],
+    jobs: int,
+    render: Callable[[CommandContext, ResourceFactory, T], RenderResult],
+    name: Callable[[T], str] = str,
+    chunksize: int = 1,
+) -> list[RenderResult]:
+    """Renders items on process pool of given size, every worker with its own
+    warm factory: render(ctx, factory, item) is called for each item, so it
+    has to be picklable (e.g. functools.partial of module level function).
+    Chunks of consecutive items are rendered by the same worker.
+    Results are returned in items order regardless of completion order,
+    items of chunk which failed as a whole (e.g. worker died) get its error
+    in result named by name.
+    """
+    # fork keeps settings and datamodel classes defined in __main__ available
+    # to workers without pickling them
+    mp_ctx = multiprocessing.get_context(
+        "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+    )
+    chunks = [items[i : i + chunksize] for i in range(0, len(items), chunksize)]
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        mp_context=mp_ctx,
+        initializer=_init_worker,
+        initargs=(ctx, render),
+    ) as pool:
+        futures = [pool.submit(_render_in_worker, chunk) for chunk in chunks]
+        results = []
+        for chunk, fut in zip(chunks, futures):
+            try:
+                results += fut.result()
+            except Exception as err:
+                results += [RenderResult(name(item), error=err) for item in chunk]
+        return results
+
+
+def render_parallel(
+    ctx: CommandContext,
+    inputs: list[str],
+    jobs: int,
+    cache: RenderCache | None = None,
+    serializer: Serializer = get_serializer(OutputFormat.YAML),
+) -> list[RenderResult]:
+    """Renders values files on process pool of given size (see render_pool).
+    Results are returned in inputs order regardless of completion order.
+    """
+    return render_pool(
+        ctx,
+        inputs,
+        jobs,
+        functools.partial(render_one, cache=cache, serializer=serializer),
+    )
+
+
+def split_path(output: str, values: str, inputs: list[str], ext: str) -> str:
+    """Returns output path for given values file in split mode"""
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(p)) for p in inputs])
+    rel = os.path.relpath(os.path.abspath(values), root)
+    return os.path.join(output, os.path.splitext(rel)[0] + ext)
+
+
+def write_results(
+    results: list[RenderResult], output: str, split: bool, serializer: Serializer
+):
+    inputs = [res.values for res in results]
+    if not split:
+        write_output(
+            serializer.join(res.output for res in results if res.error is None),
+            output,
+        )
+        return
+
+    for res in results:
+        if res.error is not None:
+            continue
+        path = split_path(output, res.values, inputs, serializer.extension)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_output(res.output, path)
+
+
+def render_batch(
+    ctx: CommandContext,
+    source: str,
+    output: str = "",
+    split: bool = False,
+    jobs: int = 1,
+    cache: RenderCache | None = None,
+    fmt: OutputFormat = OutputFormat.YAML,
+):
+    """Renders every values file found in source with single ResourceFactory.
+
+    Without split all manifests go into one stream (output file or
+    stdout). With split output is a directory receiving one file per values
+    file. Failed values files are reported and skipped, the rest of the batch
+    is still rendered.
+
+    With jobs > 1 values files are sharded across a process pool with one
+    factory per worker; jobs = 0 means one worker per CPU.
+
+    Batch scoped memoized values (see pcdf.core.memo) are shared by every
+    values file rendered by the same factory.
+    """
+    log = ctx["logger"]
+    if split and output == "":
+        log.error("output directory is required in split mode")
+        exit(1)
+
+    inputs = resolve_inputs(source)
+    if len(inputs) == 0:
+        log.error(f"no values files found in {source}")
+        exit(1)
+
+    serializer = get_serializer(fmt)
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    jobs = min(jobs, len(inputs))
+
+    log.debug(f"rendering {len(inputs)} values files with {jobs} jobs")
+    if jobs > 1:
+        if profiling.current() is not None:
+            log.warning("worker processes are not profiled")
+        results = render_parallel(ctx, inputs, jobs, cache, serializer)
+    else:
+        memo = MemoStore()
+        with ResourceFactory.from_config(log, ctx["settings"]) as factory:
+            factory.with_batch_memo(memo)
+            results = [
+                render_one(ctx, factory, values, cache, serializer) for values in inputs
+            ]
+        memo.log_stats(log, MemoScope.BATCH)
+
+    write_results(results, output, split, serializer)
+
+    failed = [res for res in results if res.error is not None]
+    for res in failed:
+        log.error(f"{res.values}: {res.error}")
+    log.info(f"rendered {len(results) - len(failed)}/{len(results)} values files")
+    if len(failed) > 0:
+        exit(1)
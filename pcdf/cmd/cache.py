@@ -0,0 +1,131 @@
+import hashlib
+import json
+import os
+import tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from pydantic import BaseModel
+
+from pcdf.cmd.serializers import TextSink
+from pcdf.core import RunInfo, Settings
+
+RUN_ID_PLACEHOLDER = "@@pcdf-run-id@@"
+
+
+def default_cache_dir() -> str:
+    if (path := os.environ.get("PCDF_CACHE_DIR")) is not None:
+        return path
+    base = os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache"))
+    return os.path.join(base, "pcdf", "render")
+
+
+class _RunIdMask:
+    """Replaces run id with placeholder in everything written to sink.
+    Serializers write whole documents at once, so run id is never split
+    between writes.
+    """
+
+    __slots__ = ["sink", "run_id"]
+
+    def __init__(self, sink: TextSink, run_id: str):
+        self.sink = sink
+        self.run_id = run_id
+
+    def write(self, s: str, /) -> int:
+        return self.sink.write(s.replace(self.run_id, RUN_ID_PLACEHOLDER))
+
+
+class RenderCache:
+    """On-disk cache of rendered manifests.
+
+    Entries are keyed by the validated datamodel, configured entities with
+    their cache salts and system info. Run id is not part of the entry: it's
+    stored as placeholder and substituted with current run id on hit.
+    Least recently used entries are evicted once cache exceeds max_bytes.
+
+    Providers are not executed on hit, so cache is opt-in: output of
+    providers reading anything besides datamodel has to be salted (see
+    cache_salt) or it goes stale.
+    """
+
+    __slots__ = ["path", "max_bytes"]
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+
+    def key(self, settings: Settings, data: BaseModel, variant: str = "") -> str:
+        """Computes entry key. Variant distinguishes outputs of the same
+        render (e.g. output format)
+        """
+        si = settings.get_system_info()
+        h = hashlib.sha256()
+        h.update(f"{variant}\0{si.version}\0{si.framework_version}\0".encode())
+        for res in settings.resources:
+            for ent in res.entities():
+                h.update(f"{ent.fqname()}\0{ent.cache_salt()}\0".encode())
+        h.update(f"{type(data).__module__}.{type(data).__qualname__}\0".encode())
+        h.update(
+            json.dumps(
+                data.model_dump(mode="json"), sort_keys=True, separators=(",", ":")
+            ).encode()
+        )
+        return h.hexdigest()
+
+    def copy_to(self, key: str, ri: RunInfo, out: TextSink) -> bool:
+        """Writes entry to out if it exists. Returns whether it was a hit"""
+        path = self._entry(key)
+        try:
+            file = open(path, "r")
+        except FileNotFoundError:
+            return False
+        with file:
+            for line in file:
+                out.write(line.replace(RUN_ID_PLACEHOLDER, ri.id))
+        os.utime(path)
+        return True
+
+    @contextmanager
+    def writer(self, key: str, ri: RunInfo) -> Iterator[TextSink]:
+        """Opens new entry for writing. Entry becomes visible only when
+        context exits without error.
+        """
+        # entries could hold secrets, they are readable by owner only
+        os.makedirs(self.path, mode=0o700, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as file:
+                yield _RunIdMask(file, ri.id)
+        except BaseException:
+            os.remove(tmp)
+            raise
+        os.replace(tmp, self._entry(key))
+        self._evict()
+
+    def _entry(self, key: str) -> str:
+        return os.path.join(self.path, f"{key}.yaml")
+
+    def _evict(self):
+        entries = []
+        total = 0
+        with os.scandir(self.path) as it:
+            for ent in it:
+                if not ent.name.endswith(".yaml"):
+                    continue
+                try:
+                    st = ent.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, ent.path))
+                total += st.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
@@ -1,10 +1,8 @@
 import json
 
-import yaml
-from rich import print
-
 from pcdf.cmd.context import CommandContext
-from pcdf.core import ProtocolConformanceError, validate_config
+from pcdf.cmd.values import LoadedValues, load_values
+from pcdf.core import DatamodelConformanceError, validate_config
 
 
 def schema(
@@ -15,30 +13,35 @@ def schema(
         json.dump(ctx["datamodel"].model_json_schema(), file)
 
     if ctx["interactive"]:
+        from rich import print
+
         print(f"[green]schema writen to {output}[/green]")
 
 
 def validate(
     ctx: CommandContext,
-    values: str,
+    values: str | LoadedValues,
     show_success_msg: bool = True,
 ):
     log = ctx["logger"]
     settings = ctx["settings"]
-    with open(values, "r") as file:
-        datamodel = ctx["datamodel"](**yaml.safe_load(file))
+    if isinstance(values, str):
+        values = load_values(ctx, values)
 
     log.debug("validating datamodel")
     try:
-        validate_config(settings.resources, datamodel)
-    except ProtocolConformanceError as err:
-        if ctx["interactive"]:
-            print(
-                f"[red]Error[/red]: given datamodel does not conform [yellow]{err.protocol}[/yellow] protocol"
-                f"\nMissing fields: {"\n - " + "\n - ".join(err.unconformed)}",
-            )
-        else:
-            log.fatal(err)
+        validate_config(settings.resources, values.model)
+    except DatamodelConformanceError as errs:
+        for err in errs.errors:
+            if ctx["interactive"]:
+                from rich import print
+
+                print(
+                    f"[red]Error[/red]: given datamodel does not conform [yellow]{err.protocol}[/yellow] protocol"
+                    f"\nMissing fields: {"\n - " + "\n - ".join(err.unconformed)}",
+                )
+            else:
+                log.fatal(err)
         exit(51)
     if show_success_msg:
         log.info("datamodel correct")
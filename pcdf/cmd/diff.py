@@ -0,0 +1,154 @@
+import json
+import os
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from typing import Any
+
+from pcdf.cmd.context import CommandContext
+from pcdf.cmd.datamodel import validate
+from pcdf.cmd.render import open_output, write_output
+from pcdf.cmd.serializers import OutputFormat, get_serializer, load_yaml_all
+from pcdf.cmd.values import load_values
+from pcdf.core import ResourceFactory, profiling
+from pcdf.core.canonical import (
+    CONTENT_HASH_ANNOTATION,
+    ObjectKey,
+    format_key,
+    object_key,
+    stored_hash,
+    with_content_hash,
+)
+
+RENDER_SUFFIXES = (".yaml", ".yml", ".json", ".jsonl")
+
+
+def read_documents(path: str) -> Iterator[dict[str, Any]]:
+    """Streams documents of rendered file of any output format, picked by
+    file extension
+    """
+    with open(path, "r") as file:
+        if path.endswith(".jsonl"):
+            yield from (json.loads(line) for line in file if line.strip() != "")
+        elif path.endswith(".json"):
+            doc = json.load(file)
+            yield from doc.get("items", []) if doc.get("kind") == "List" else [doc]
+        else:
+            yield from (doc for doc in load_yaml_all(file) if doc is not None)
+
+
+def index_render(path: str) -> dict[ObjectKey, str]:
+    """Indexes objects of previous render by identity (see
+    pcdf.core.canonical.object_key) to their content hash. Path is rendered
+    file or directory searched for rendered files recursively.
+    """
+    if os.path.isdir(path):
+        paths = sorted(
+            os.path.join(root, name)
+            for root, _, names in os.walk(path)
+            for name in names
+            # hidden files are not renders, e.g. index of render --output-dir
+            if name.endswith(RENDER_SUFFIXES) and not name.startswith(".")
+        )
+    else:
+        paths = [path]
+    return {
+        object_key(doc): stored_hash(doc) for p in paths for doc in read_documents(p)
+    }
+
+
+@dataclass
+class RenderDiff:
+    """Outcome of comparing render with previous one"""
+
+    new: list[ObjectKey] = field(default_factory=list)
+    changed: list[ObjectKey] = field(default_factory=list)
+    unchanged: int = 0
+    pruned: list[ObjectKey] = field(default_factory=list)
+
+    def summary(self) -> str:
+        return (
+            f"{len(self.new)} new, {len(self.changed)} changed, "
+            f"{self.unchanged} unchanged, {len(self.pruned)} pruned"
+        )
+
+
+def diff_documents(
+    documents: Iterable[dict[str, Any]],
+    previous: dict[ObjectKey, str],
+    diff: RenderDiff,
+) -> Iterator[dict[str, Any]]:
+    """Yields documents new or changed since previous render annotated with
+    content hash and records outcome into diff. Pruned objects are recorded
+    once documents are exhausted.
+    """
+    seen: set[ObjectKey] = set()
+    for doc in documents:
+        doc = with_content_hash(doc)
+        key = object_key(doc)
+        seen.add(key)
+        if (prev := previous.get(key)) is None:
+            diff.new.append(key)
+        elif prev != doc["metadata"]["annotations"][CONTENT_HASH_ANNOTATION]:
+            diff.changed.append(key)
+        else:
+            diff.unchanged += 1
+            continue
+        yield doc
+    diff.pruned = [key for key in previous if key not in seen]
+
+
+def render_diff(
+    ctx: CommandContext,
+    values: str,
+    against: str,
+    output: str = "",
+    pruned: str = "",
+    fmt: OutputFormat = OutputFormat.YAML,
+):
+    """Renders only objects which are new or changed since previous render
+    (file or directory of files in any output format). Objects of previous
+    render missing now are written to pruned file one per line, or logged.
+
+    Objects are compared by content hash, volatile labels (run id) are not
+    part of it. Output is annotated with hashes, but it lacks unchanged
+    objects: previous render of the next diff has to be a full render
+    (annotated or not).
+    """
+    log = ctx["logger"]
+    with profiling.span("load", "phase"):
+        vals = load_values(ctx, values)
+    with profiling.span("validate", "phase"):
+        validate(ctx, vals, show_success_msg=False)
+    with profiling.span("index", "phase"):
+        try:
+            previous = index_render(against)
+        except Exception as err:
+            log.error(f"unable to read previous render {against}: {err}")
+            exit(1)
+
+    diff = RenderDiff()
+    try:
+        with (
+            ResourceFactory.from_config(log, ctx["settings"]) as factory,
+            open_output(output) as out,
+        ):
+            documents = (res.dump() for res in factory.iter_run(vals.model))
+            get_serializer(fmt).write_documents(
+                profiling.consumer_spans(
+                    diff_documents(documents, previous, diff), "serialize", "phase"
+                ),
+                out,
+            )
+    except Exception as err:
+        log.error(err)
+        exit(1)
+
+    for kind, keys in [("new", diff.new), ("changed", diff.changed)]:
+        for key in keys:
+            log.debug(f"{kind} {format_key(key)}")
+    if pruned != "":
+        write_output("".join(f"{format_key(key)}\n" for key in diff.pruned), pruned)
+    else:
+        for key in diff.pruned:
+            log.info(f"pruned {format_key(key)}")
+    log.info(diff.summary())
@@ -0,0 +1,305 @@
+import json
+import os
+import stat
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+
+from pcdf.cmd.context import CommandContext
+from pcdf.cmd.datamodel import validate
+from pcdf.cmd.diff import read_documents
+from pcdf.cmd.render import load_state, save_state
+from pcdf.cmd.serializers import OutputFormat, Serializer, get_serializer
+from pcdf.cmd.values import load_values
+from pcdf.core import ResourceFactory, profiling
+from pcdf.core.canonical import (
+    CONTENT_HASH_ANNOTATION,
+    content_hash,
+    object_key,
+    with_content_hash,
+)
+
+INDEX_NAME = ".pcdf-index.json"
+"""File of output directory mapping files written by pcdf to content hashes"""
+
+INDEX_VERSION = 2
+
+CLUSTER_SCOPED_DIR = "_cluster"
+
+
+@dataclass
+class ConflictingPathError(Exception):
+    path: str
+
+    def __str__(self):
+        return f"several resources would be written to {self.path}"
+
+
+def resource_path(doc: dict[str, Any], extension: str) -> str:
+    """Stable path of dumped resource relative to output directory:
+    <namespace>/<kind>-<name><extension>, cluster scoped resources are put
+    into _cluster directory
+    """
+    _, kind, namespace, name = object_key(doc)
+    stem = f"{kind.lower()}-{name}" if name != "" else kind.lower()
+    return os.path.join(
+        _path_part(namespace) if namespace != "" else CLUSTER_SCOPED_DIR,
+        _path_part(stem) + extension,
+    )
+
+
+def _path_part(s: str) -> str:
+    """Keeps name within its directory"""
+    return s.replace(os.sep, "_").lstrip(".") or "_"
+
+
+@dataclass
+class DirUpdate:
+    """Outcome of output directory update"""
+
+    written: list[str] = field(default_factory=list)
+    unchanged: int = 0
+    removed: list[str] = field(default_factory=list)
+
+    def summary(self) -> str:
+        return (
+            f"{len(self.written)} written, {self.unchanged} unchanged, "
+            f"{len(self.removed)} removed"
+        )
+
+
+class OutputDir:
+    """Directory holding one file per resource.
+
+    Files are tracked in index file by content hash (see
+    pcdf.core.canonical), so files of resources whose content has not changed
+    are not written at all and keep their mtime, and files of resources
+    which are gone are removed. Index keeps size and mtime of files as
+    written too: files edited since are hashed again. Files pcdf has not
+    written are left alone.
+
+    With annotate resources are annotated with their content hash in
+    files.
+
+    Only indexed files are touched, so directory may hold anything else
+    (e.g. be root of a repository). Changed files are written on a thread
+    pool, each to a temp file next to it which then replaces it by rename:
+    readers never see partially written files, but update is not atomic
+    (see update).
+    """
+
+    __slots__ = ["path", "serializer", "annotate", "workers"]
+
+    def __init__(
+        self,
+        path: str,
+        serializer: Serializer,
+        annotate: bool = False,
+        workers: int | None = None,
+    ):
+        self.path = path
+        self.serializer = serializer
+        self.annotate = annotate
+        self.workers = workers
+
+    def index(self) -> dict[str, dict[str, Any]]:
+        """Written files by relative path to their content hash, size and
+        mtime_ns. Of index written with other annotate setting, or of other
+        version, only paths are kept: its files differ, so they are written
+        again, but files of resources gone since are still removed.
+        """
+        try:
+            with open(os.path.join(self.path, INDEX_NAME), "r") as file:
+                index = json.load(file)
+        except FileNotFoundError:
+            return {}
+        if (
+            index.get("version") != INDEX_VERSION
+            or index.get("annotate", False) != self.annotate
+        ):
+            return {rel: {} for rel in index.get("files") or {}}
+        return index["files"]
+
+    def update(self, documents: list[dict[str, Any]]) -> DirUpdate:
+        """Writes changed files and removes gone ones. Update as a whole is not
+        atomic: each file is replaced on its own, so readers may see directory
+        partially updated, and an interrupted update leaves it so (next update
+        completes it).
+        """
+        index = self.index()
+        files: dict[str, tuple[dict[str, Any], str]] = {}
+        for doc in documents:
+            rel = resource_path(doc, self.serializer.extension)
+            if rel in files:
+                raise ConflictingPathError(rel)
+            files[rel] = (doc, content_hash(doc))
+
+        update = DirUpdate()
+        entries: dict[str, dict[str, Any]] = {}
+        changed: dict[str, dict[str, Any]] = {}
+        for rel, (doc, digest) in files.items():
+            entry = self._stored_entry(rel, index.get(rel))
+            if entry is not None and entry["hash"] == digest:
+                update.unchanged += 1
+                entries[rel] = entry
+            else:
+                changed[rel] = doc
+        update.written = sorted(changed)
+        update.removed = sorted(rel for rel in index if rel not in files)
+
+        os.makedirs(self.path, exist_ok=True)
+        with ThreadPoolExecutor(self.workers) as pool:
+            stats = pool.map(
+                lambda rel: self._write(changed[rel], os.path.join(self.path, rel)),
+                update.written,
+            )
+            for rel, (size, mtime_ns) in zip(update.written, stats):
+                entries[rel] = {
+                    "hash": files[rel][1],
+                    "size": size,
+                    "mtime_ns": mtime_ns,
+                }
+        for rel in update.removed:
+            self._remove(rel)
+
+        if entries != index or not os.path.isfile(os.path.join(self.path, INDEX_NAME)):
+            self._write_index(dict(sorted(entries.items())))
+        return update
+
+    def _stored_entry(
+        self, rel: str, entry: dict[str, Any] | None
+    ) -> dict[str, Any] | None:
+        """Index entry of existing file. File which is not indexed (e.g.
+        index was lost) or was modified since it was written is hashed
+        again. None means file has to be written.
+        """
+        path = os.path.join(self.path, rel)
+        try:
+            # stat is taken before reading, file changed meanwhile is
+            # hashed again next time
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        if not stat.S_ISREG(st.st_mode):
+            return None
+        if (
+            entry is not None
+            and entry.get("size") == st.st_size
+            and entry.get("mtime_ns") == st.st_mtime_ns
+        ):
+            return entry
+        if (digest := self._file_hash(path)) is None:
+            return None
+        return {"hash": digest, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+    def _file_hash(self, path: str) -> str | None:
+        """Content hash of resource read from file, None if file does not
+        hold single resource dumped with current annotate setting
+        """
+        try:
+            docs = list(read_documents(path))
+        except Exception:
+            return None
+        if len(docs) != 1:
+            return None
+        annotations = (docs[0].get("metadata") or {}).get("annotations") or {}
+        if (CONTENT_HASH_ANNOTATION in annotations) != self.annotate:
+            return None
+        return content_hash(docs[0])
+
+    def _write(self, doc: dict[str, Any], path: str) -> tuple[int, int]:
+        """Replaces file by rename, returns its size and mtime_ns"""
+        if self.annotate:
+            doc = with_content_hash(doc)
+        text = self.serializer.dump_documents([doc])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        st = _replace_file(path, text)
+        return st.st_size, st.st_mtime_ns
+
+    def _remove(self, rel: str):
+        """Removes file and directories left empty by it"""
+        try:
+            os.remove(os.path.join(self.path, rel))
+        except FileNotFoundError:
+            pass
+        parent = os.path.dirname(rel)
+        while parent != "":
+            try:
+                os.rmdir(os.path.join(self.path, parent))
+            except OSError:
+                return
+            parent = os.path.dirname(parent)
+
+    def _write_index(self, entries: dict[str, dict[str, Any]]):
+        _replace_file(
+            os.path.join(self.path, INDEX_NAME),
+            json.dumps(
+                {"version": INDEX_VERSION, "annotate": self.annotate, "files": entries},
+                indent=2,
+            )
+            + "\n",
+        )
+
+
+def _replace_file(path: str, text: str) -> os.stat_result:
+    """Writes file by rename of temp file, returns its stat as written
+    (taken before rename, so later edits are not mistaken for it)
+    """
+    # hidden, so that it's not taken for render by readers of directory
+    directory, name = os.path.split(path)
+    tmp = os.path.join(directory, f".{name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "w") as file:
+            file.write(text)
+            file.flush()
+            st = os.fstat(file.fileno())
+        os.replace(tmp, path)
+        return st
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def render_dir(
+    ctx: CommandContext,
+    values: str,
+    output_dir: str,
+    state: str = "",
+    fmt: OutputFormat = OutputFormat.YAML,
+    content_hash: bool = False,
+):
+    """Renders values into directory, one file per resource (see OutputDir).
+
+    Render cache is not used: providers have to run anyway to learn which
+    resources changed. Volatile labels (run id) do not count as a change, so
+    unchanged files keep run id of the render which wrote them.
+    """
+    log = ctx["logger"]
+    with profiling.span("load", "phase"):
+        vals = load_values(ctx, values)
+    with profiling.span("validate", "phase"):
+        validate(ctx, vals, show_success_msg=False)
+
+    try:
+        with ResourceFactory.from_config(log, ctx["settings"]) as factory:
+            if state != "":
+                documents, next_state = factory.run_incremental(
+                    vals.model, load_state(state)
+                )
+                save_state(state, next_state)
+            else:
+                documents = [res.dump() for res in factory.iter_run(vals.model)]
+        with profiling.span("write", "phase"):
+            update = OutputDir(output_dir, get_serializer(fmt), content_hash).update(
+                documents
+            )
+    except Exception as err:
+        log.error(err)
+        exit(1)
+
+    for rel in update.written:
+        log.debug(f"written {rel}")
+    for rel in update.removed:
+        log.debug(f"removed {rel}")
+    log.info(update.summary())
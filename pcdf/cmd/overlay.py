@@ -0,0 +1,270 @@
+import functools
+import itertools
+import os
+from typing import Any
+
+from pydantic import (
+    AfterValidator,
+    BaseModel,
+    BeforeValidator,
+    PlainValidator,
+    WrapValidator,
+)
+
+from pcdf.cmd.batch import RenderResult, render_pool, resolve_inputs
+from pcdf.cmd.cache import RenderCache
+from pcdf.cmd.context import CommandContext
+from pcdf.cmd.render import render_manifests, write_output
+from pcdf.cmd.serializers import OutputFormat, Serializer, get_serializer, load_yaml
+from pcdf.cmd.values import validation_context
+from pcdf.core import (
+    MemoScope,
+    MemoStore,
+    ResourceFactory,
+    profiling,
+    validate_config,
+)
+
+MANIFESTS_NAME = "manifests"
+
+type Combination = tuple[str, ...]
+
+_FIELD_VALIDATORS = (AfterValidator, BeforeValidator, PlainValidator, WrapValidator)
+
+
+def deep_merge(base: dict[str, Any], overlay: dict[str, Any]) -> dict[str, Any]:
+    """Returns base with overlay merged onto it: mappings are merged key by
+    key, anything else (lists included) is replaced and null removes the key.
+    Arguments are not modified, subtrees overlay does not touch are shared
+    with base.
+    """
+    merged = dict(base)
+    for key, value in overlay.items():
+        if value is None:
+            merged.pop(key, None)
+        elif isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = deep_merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+class OverlayMatrix:
+    """Base values file with axes of overlay files. Values of combination
+    (one overlay per axis) are base deep-merged with its overlays in axes
+    order.
+
+    Merges are memoized by combination prefix, so base merged with "prod"
+    is computed once for every region. Base is validated once, then only
+    top level fields overlays touch are validated for each combination.
+    """
+
+    __slots__ = ["ctx", "base_path", "axes", "_raw", "_merged", "_base"]
+
+    def __init__(self, ctx: CommandContext, base_path: str, axes: list[list[str]]):
+        self.ctx = ctx
+        self.base_path = base_path
+        self.axes = axes
+        self._raw: dict[str, dict[str, Any]] = {}
+        self._merged: dict[Combination, tuple[dict[str, Any], frozenset[str]]] = {}
+        self._base: BaseModel | Exception | None = None
+
+    def combinations(self) -> list[Combination]:
+        return list(itertools.product(*self.axes))
+
+    def merged(self, combo: Combination) -> tuple[dict[str, Any], frozenset[str]]:
+        """Returns merged values of combination and top level keys set by
+        its overlays
+        """
+        if len(combo) == 0:
+            return self._load(self.base_path), frozenset()
+        if (merged := self._merged.get(combo)) is None:
+            raw, touched = self.merged(combo[:-1])
+            overlay = self._load(combo[-1])
+            merged = (deep_merge(raw, overlay), touched | overlay.keys())
+            self._merged[combo] = merged
+        return merged
+
+    def model(self, combo: Combination) -> BaseModel:
+        """Validated datamodel of combination.
+
+        The whole datamodel is validated instead when validating fields one
+        by one could differ from it: datamodel has model or field validators
+        (field validators may read other fields), overlay removes a field or
+        sets unknown one, or base alone is not valid (e.g. overlays provide
+        required fields).
+        """
+        raw, touched = self.merged(combo)
+        cls: type[BaseModel] = self.ctx["datamodel"]
+        context = validation_context(self.base_path)
+        if (base := self._base_model()) is None or not _partially_valid(
+            cls, raw, touched
+        ):
+            return cls.model_validate(raw, context=context)
+
+        model = base.model_copy()
+        for name in sorted(touched):
+            cls.__pydantic_validator__.validate_assignment(
+                model, name, raw[name], context=context
+            )
+        return model
+
+    def _base_model(self) -> BaseModel | None:
+        if self._base is None:
+            try:
+                self._base = self.ctx["datamodel"].model_validate(
+                    self._load(self.base_path),
+                    context=validation_context(self.base_path),
+                )
+            except Exception as err:
+                self.ctx["logger"].debug(
+                    f"base values are not valid alone, combinations are "
+                    f"validated as a whole: {err}"
+                )
+                self._base = err
+        return self._base if isinstance(self._base, BaseModel) else None
+
+    def _load(self, path: str) -> dict[str, Any]:
+        if (raw := self._raw.get(path)) is None:
+            with open(path, "r") as file:
+                raw = load_yaml(file) or {}
+            if not isinstance(raw, dict):
+                raise ValueError(f"{path} is not a mapping")
+            self._raw[path] = raw
+        return raw
+
+
+def _partially_valid(
+    cls: type[BaseModel], raw: dict[str, Any], touched: frozenset[str]
+) -> bool:
+    """Whether validating touched fields of valid base equals validating
+    raw values as a whole. Validators of nested models see only their own
+    model, which is validated as a whole once touched, so only validators of
+    datamodel itself count.
+    """
+    decorators = cls.__pydantic_decorators__
+    return (
+        not decorators.model_validators
+        and not decorators.root_validators
+        and not decorators.field_validators
+        and not decorators.validators
+        and not any(
+            isinstance(m, _FIELD_VALIDATORS)
+            for field in cls.model_fields.values()
+            for m in field.metadata
+        )
+        and not cls.model_config.get("frozen", False)
+        and all(name in cls.model_fields and name in raw for name in touched)
+    )
+
+
+def combination_name(combo: Combination) -> str:
+    """Relative directory of combination output: overlay names by axis"""
+    return os.path.join(*[_stem(path) for path in combo])
+
+
+def _stem(path: str) -> str:
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def render_combination(
+    ctx: CommandContext,
+    factory: ResourceFactory,
+    combo: Combination,
+    matrix: OverlayMatrix,
+    cache: RenderCache | None = None,
+    serializer: Serializer = get_serializer(OutputFormat.YAML),
+) -> RenderResult:
+    """Renders single combination, errors are captured into result"""
+    try:
+        with profiling.span("load", "phase"):
+            data = matrix.model(combo)
+        with profiling.span("validate", "phase"):
+            validate_config(ctx["settings"].resources, data)
+        return RenderResult(
+            combination_name(combo),
+            render_manifests(ctx, factory, data, cache, serializer=serializer),
+        )
+    except Exception as err:
+        return RenderResult(combination_name(combo), error=err)
+
+
+def render_overlays(
+    ctx: CommandContext,
+    values: str,
+    overlays: list[str],
+    output: str,
+    jobs: int = 1,
+    cache: RenderCache | None = None,
+    fmt: OutputFormat = OutputFormat.YAML,
+):
+    """Renders base values file merged with every combination of overlays.
+
+    Every overlay source (directory, glob or manifest file, see
+    pcdf.cmd.batch.resolve_inputs) is an axis, combinations take one overlay
+    per axis. Output of combination is written to
+    <output>/<overlay name>/.../manifests<ext>, overlay name being its file
+    name without extension. Combinations are rendered by one warm factory,
+    or sharded across jobs worker processes.
+    """
+    log = ctx["logger"]
+    if output == "":
+        log.error("output directory is required to render overlays")
+        exit(1)
+
+    axes = [resolve_inputs(src) for src in overlays]
+    for src, axis in zip(overlays, axes):
+        if len(axis) == 0:
+            log.error(f"no overlays found in {src}")
+            exit(1)
+        if len({_stem(path) for path in axis}) != len(axis):
+            log.error(f"overlays found in {src} have the same file names")
+            exit(1)
+
+    serializer = get_serializer(fmt)
+    matrix = OverlayMatrix(ctx, values, axes)
+    combos = matrix.combinations()
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    jobs = min(jobs, len(combos))
+
+    log.debug(f"rendering {len(combos)} combinations with {jobs} jobs")
+    if jobs > 1:
+        if profiling.current() is not None:
+            log.warning("worker processes are not profiled")
+        # consecutive combinations share merged prefixes, chunks keep them
+        # in the same worker
+        results = render_pool(
+            ctx,
+            combos,
+            jobs,
+            functools.partial(
+                render_combination, matrix=matrix, cache=cache, serializer=serializer
+            ),
+            combination_name,
+            chunksize=max(1, len(combos) // (jobs * 4)),
+        )
+    else:
+        memo = MemoStore()
+        with ResourceFactory.from_config(log, ctx["settings"]) as factory:
+            factory.with_batch_memo(memo)
+            results = [
+                render_combination(ctx, factory, combo, matrix, cache, serializer)
+                for combo in combos
+            ]
+        memo.log_stats(log, MemoScope.BATCH)
+
+    failed = []
+    for res in results:
+        if res.error is not None:
+            failed.append(res)
+            continue
+        path = os.path.join(output, res.values, MANIFESTS_NAME + serializer.extension)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_output(res.output, path)
+
+    for res in failed:
+        log.error(f"{res.values}: {res.error}")
+    log.info(f"rendered {len(results) - len(failed)}/{len(results)} combinations")
+    if len(failed) > 0:
+        exit(1)
@@ -0,0 +1,30 @@
+import json
+import sys
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from pcdf.core import Profiler, profiling
+
+
+@contextmanager
+def profile_command(
+    summary: bool = False, trace: str = "", trace_memory: bool = False
+) -> Iterator[Profiler | None]:
+    """Profiles command executed within context. Summary table is printed
+    to stderr and Chrome trace is written to trace file when requested,
+    even if command failed. Does nothing when neither is requested.
+    """
+    if not summary and trace == "":
+        yield None
+        return
+
+    prof = Profiler(trace_memory)
+    try:
+        with profiling.activate(prof):
+            yield prof
+    finally:
+        if summary:
+            sys.stderr.write(prof.format_summary() + "\n")
+        if trace != "":
+            with open(trace, "w") as file:
+                json.dump(prof.chrome_trace(), file)
@@ -0,0 +1,157 @@
+import http.client
+import json
+import os
+import socket
+import sys
+import time
+import urllib.parse
+from dataclasses import dataclass, field
+from typing import Any
+
+from pcdf.cmd.context import CommandContext
+from pcdf.cmd.serializers import OutputFormat
+
+DEFAULT_PORT = 8765
+
+
+@dataclass(frozen=True)
+class Address:
+    """Where render server listens: unix socket path or localhost TCP port"""
+
+    socket: str = ""
+    host: str = "127.0.0.1"
+    port: int = DEFAULT_PORT
+
+    @classmethod
+    def parse(cls, value: str) -> "Address":
+        """Parses "unix:/path/to.sock", "/path/to.sock", "host:port" or "port" """
+        if value.startswith("unix:"):
+            return cls(socket=value.removeprefix("unix:"))
+        if "/" in value:
+            return cls(socket=value)
+        host, _, port = value.rpartition(":")
+        return cls(host=host or cls.host, port=int(port))
+
+    def __str__(self) -> str:
+        if self.socket != "":
+            return f"unix:{self.socket}"
+        return f"{self.host}:{self.port}"
+
+
+@dataclass
+class RemoteError(Exception):
+    """Raised then render server responded with error"""
+
+    status: int
+    message: str
+    errors: list[dict[str, Any]] = field(default_factory=list)
+
+    def __str__(self) -> str:
+        return f"render server responded {self.status}: {self.message}"
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+def request(
+    address: Address,
+    method: str,
+    url: str,
+    body: bytes | None = None,
+    timeout: float = 300,
+    connect_retry: float = 10,
+) -> bytes:
+    """Sends request to render server, returns body of successful response.
+    Connection is retried for connect_retry seconds, so that requests sent
+    while server reloads wait for it instead of failing.
+    """
+    deadline = time.monotonic() + connect_retry
+    while True:
+        conn: http.client.HTTPConnection = (
+            _UnixHTTPConnection(address.socket, timeout)
+            if address.socket != ""
+            else http.client.HTTPConnection(address.host, address.port, timeout=timeout)
+        )
+        try:
+            conn.request(method, url, body=body)
+            resp = conn.getresponse()
+            data = resp.read()
+            break
+        except (ConnectionRefusedError, FileNotFoundError):
+            conn.close()
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.1)
+    conn.close()
+
+    if resp.status >= 400:
+        try:
+            err = json.loads(data)
+        except ValueError:
+            err = {"error": data.decode(errors="replace")}
+        raise RemoteError(resp.status, err.get("error", ""), err.get("errors", []))
+    return data
+
+
+def render_remote(
+    ctx: CommandContext,
+    address: Address,
+    values: str,
+    fmt: OutputFormat = OutputFormat.YAML,
+) -> str:
+    """Renders values file by render server instead of this process"""
+    with open(values, "rb") as file:
+        body = file.read()
+    # server listening on unix socket runs on the same host, absolute path
+    # lets it resolve files referenced by values relative to it. Server
+    # listening on TCP ignores path.
+    params = {"format": fmt.value}
+    if address.socket != "":
+        params["path"] = os.path.abspath(values)
+    query = urllib.parse.urlencode(params)
+    ctx["logger"].debug(f"rendering {values} by server at {address}")
+    return request(address, "POST", f"/render?{query}", body).decode()
+
+
+def render_remote_to(
+    ctx: CommandContext,
+    address: Address,
+    values: str,
+    output: str = "",
+    fmt: OutputFormat = OutputFormat.YAML,
+):
+    """Client side of `render --server`: writes output and exits on errors
+    the same way local render does
+    """
+    log = ctx["logger"]
+    try:
+        text = render_remote(ctx, address, values, fmt)
+    except RemoteError as err:
+        if err.status == 422:
+            for e in err.errors:
+                log.fatal(
+                    f"given datamodel does not conform {e["protocol"]} protocol, "
+                    f"missing fields: {", ".join(e["unconformed"])}"
+                )
+            exit(51)
+        log.error(err)
+        exit(1)
+    except OSError as err:
+        log.error(f"unable to reach render server at {address}: {err}")
+        exit(1)
+
+    if output == "":
+        sys.stdout.write(text)
+        return
+    tmp = f"{output}.tmp"
+    with open(tmp, "w") as file:
+        file.write(text)
+    os.replace(tmp, output)
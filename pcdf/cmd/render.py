@@ -1,38 +1,187 @@
+import io
+import json
+import os
 import sys
-from typing import Annotated, cast
+from collections.abc import Iterator
+from contextlib import contextmanager
 
-import typer
-import yaml
+from pydantic import BaseModel
 
+from pcdf.cmd.cache import RenderCache
 from pcdf.cmd.context import CommandContext
 from pcdf.cmd.datamodel import validate
+from pcdf.cmd.serializers import (
+    OutputFormat,
+    Serializer,
+    TextSink,
+    Tee,
+    get_serializer,
+)
+from pcdf.cmd.values import load_values
 from pcdf.core import (
+    RenderState,
     ResourceFactory,
+    RunInfo,
+    profiling,
 )
+from pcdf.core.canonical import with_content_hash
+
+
+def write_output(text: str, output: str = ""):
+    """Writes rendered stream to output file or stdout"""
+    if output == "":
+        sys.stdout.write(text)
+    else:
+        with open(output, "w") as file:
+            file.write(text)
+
+
+def load_state(path: str) -> RenderState | None:
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as file:
+        return RenderState.from_dict(json.load(file))
+
+
+def save_state(path: str, state: RenderState):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as file:
+        json.dump(state.to_dict(), file)
+    os.replace(tmp, path)
+
+
+def render_to(
+    ctx: CommandContext,
+    factory: ResourceFactory,
+    data: BaseModel,
+    out: TextSink,
+    cache: RenderCache | None = None,
+    state: str = "",
+    serializer: Serializer = get_serializer(OutputFormat.YAML),
+    content_hash: bool = False,
+):
+    """Runs factory over datamodel and writes serialized resources to out
+    as soon as their provider is done.
+    With cache given the whole provider pipeline is skipped on hit, on miss
+    output is streamed to cache entry at the same time.
+    With state file given only providers with changed inputs are executed,
+    cache is not used then, as hit would leave state file behind.
+    With content_hash every resource is annotated with hash of its content,
+    see pcdf.core.canonical.
+    """
+    ri = RunInfo()
+    if cache is None or state != "":
+        _render_to(factory, data, out, ri, state, serializer, content_hash)
+        return
+
+    variant = serializer.format.value + ("+content-hash" if content_hash else "")
+    key = cache.key(ctx["settings"], data, variant)
+    if cache.copy_to(key, ri, out):
+        ctx["logger"].debug(f"render cache hit {key}")
+        return
+    with cache.writer(key, ri) as entry:
+        _render_to(factory, data, Tee(out, entry), ri, state, serializer, content_hash)
+
+
+def _render_to(
+    factory: ResourceFactory,
+    data: BaseModel,
+    out: TextSink,
+    ri: RunInfo,
+    state: str,
+    serializer: Serializer,
+    content_hash: bool,
+):
+    if state != "":
+        documents, next_state = factory.run_incremental(data, load_state(state), ri)
+        save_state(state, next_state)
+        if content_hash:
+            documents = [with_content_hash(doc) for doc in documents]
+        serializer.write_documents(
+            profiling.consumer_spans(documents, "serialize", "phase"), out
+        )
+    elif content_hash:
+        serializer.write_documents(
+            profiling.consumer_spans(
+                (with_content_hash(res.dump()) for res in factory.iter_run(data, ri)),
+                "serialize",
+                "phase",
+            ),
+            out,
+        )
+    else:
+        serializer.write_resources(
+            profiling.consumer_spans(factory.iter_run(data, ri), "serialize", "phase"),
+            out,
+        )
+
+
+def render_manifests(
+    ctx: CommandContext,
+    factory: ResourceFactory,
+    data: BaseModel,
+    cache: RenderCache | None = None,
+    state: str = "",
+    serializer: Serializer = get_serializer(OutputFormat.YAML),
+    content_hash: bool = False,
+) -> str:
+    """Same as render_to but returns output as string"""
+    buf = io.StringIO()
+    render_to(ctx, factory, data, buf, cache, state, serializer, content_hash)
+    return buf.getvalue()
+
+
+@contextmanager
+def open_output(output: str = "") -> Iterator[TextSink]:
+    """Opens output file or stdout for streaming. File is replaced
+    only when context exits without error.
+    """
+    if output == "":
+        yield sys.stdout
+        return
+
+    tmp = f"{output}.tmp"
+    try:
+        with open(tmp, "w") as file:
+            yield file
+    except BaseException:
+        os.remove(tmp)
+        raise
+    os.replace(tmp, output)
 
 
 def render(
     ctx: CommandContext,
     values: str,
     output: str = "",
+    cache: RenderCache | None = None,
+    state: str = "",
+    fmt: OutputFormat = OutputFormat.YAML,
+    content_hash: bool = False,
 ):
     log = ctx["logger"]
     settings = ctx["settings"]
-    with open(values, "r") as file:
-        vals = ctx["datamodel"](**yaml.safe_load(file))
-
-    validate(ctx, values, show_success_msg=False)
+    with profiling.span("load", "phase"):
+        vals = load_values(ctx, values)
+    with profiling.span("validate", "phase"):
+        validate(ctx, vals, show_success_msg=False)
 
     log.debug("launching resource factory")
     try:
-        result = ResourceFactory.from_config(log, settings).run(vals)
+        with (
+            ResourceFactory.from_config(log, settings) as factory,
+            open_output(output) as out,
+        ):
+            render_to(
+                ctx,
+                factory,
+                vals.model,
+                out,
+                cache,
+                state,
+                get_serializer(fmt),
+                content_hash,
+            )
     except Exception as err:
         log.error(err)
-        return
-
-    dumped = [res.dump() for res in result]
-    if output == "":
-        yaml.dump_all(dumped, sys.stdout)
-    else:
-        with open(output, "w") as file:
-            yaml.dump_all(dumped, file)
+        exit(1)
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import functools
+import io
+import json
+from abc import ABC, abstractmethod
+from collections.abc import Iterable, Iterator
+from enum import Enum
+from types import ModuleType
+from typing import IO, TYPE_CHECKING, Any, ClassVar, Protocol
+
+if TYPE_CHECKING:  # pragma: no cover
+    from pcdf.core import Resource
+
+
+class OutputFormat(str, Enum):
+    YAML = "yaml"
+    JSON = "json"
+    JSONL = "jsonl"
+
+
+@functools.cache
+def _yaml() -> tuple[ModuleType, type, type]:
+    """Imports yaml on first use, it's not needed by json output or --help.
+    Returns module with its safe loader and dumper.
+    """
+    import yaml
+
+    # libyaml bindings are several times faster than pure python implementation
+    # and produce the same output for documents built from plain types
+    try:
+        return yaml, yaml.CSafeLoader, yaml.CSafeDumper
+    except AttributeError:  # pragma: no cover
+        return yaml, yaml.SafeLoader, yaml.SafeDumper
+
+
+def load_yaml(stream: IO[str] | str) -> Any:
+    yaml, loader, _ = _yaml()
+    return yaml.load(stream, Loader=loader)
+
+
+def load_yaml_all(stream: IO[str] | str) -> Iterator[Any]:
+    """Loads documents of multi-document stream one by one"""
+    yaml, loader, _ = _yaml()
+    return yaml.load_all(stream, Loader=loader)
+
+
+class TextSink(Protocol):
+    """Anything serialized output could be written to"""
+
+    def write(self, s: str, /) -> int: ...
+
+
+class Tee:
+    """Writes everything to several sinks"""
+
+    __slots__ = ["sinks"]
+
+    def __init__(self, *sinks: TextSink):
+        self.sinks = sinks
+
+    def write(self, s: str, /) -> int:
+        for sink in self.sinks:
+            sink.write(s)
+        return len(s)
+
+
+class Serializer(ABC):
+    """Turns rendered resources into output stream of some format.
+    Resources are written one by one, so the whole output is never held
+    in memory unless it's requested as string.
+    """
+
+    format: ClassVar[OutputFormat]
+    extension: ClassVar[str]
+
+    @abstractmethod
+    def write_resources(self, resources: Iterable[Resource], out: TextSink): ...
+
+    @abstractmethod
+    def write_documents(self, documents: Iterable[dict[str, Any]], out: TextSink):
+        """Same as write_resources for already dumped resources"""
+        ...
+
+    @abstractmethod
+    def join(self, outputs: Iterable[str]) -> str:
+        """Merges several outputs of this serializer into one stream"""
+        ...
+
+    def dump_resources(self, resources: Iterable[Resource]) -> str:
+        buf = io.StringIO()
+        self.write_resources(resources, buf)
+        return buf.getvalue()
+
+    def dump_documents(self, documents: Iterable[dict[str, Any]]) -> str:
+        buf = io.StringIO()
+        self.write_documents(documents, buf)
+        return buf.getvalue()
+
+
+class YamlSerializer(Serializer):
+    """Multi-document yaml stream"""
+
+    format = OutputFormat.YAML
+    extension = ".yaml"
+
+    def write_resources(self, resources: Iterable[Resource], out: TextSink):
+        self.write_documents((res.dump() for res in resources), out)
+
+    def write_documents(self, documents: Iterable[dict[str, Any]], out: TextSink):
+        yaml, _, dumper = _yaml()
+        # same separators as yaml.dump_all uses
+        for i, doc in enumerate(documents):
+            if i > 0:
+                out.write("---\n")
+            out.write(yaml.dump(doc, Dumper=dumper))
+
+    def join(self, outputs: Iterable[str]) -> str:
+        return "---\n".join(out for out in outputs if out != "")
+
+
+class JsonSerializer(Serializer):
+    """Single kubernetes List object holding every resource"""
+
+    format = OutputFormat.JSON
+    extension = ".json"
+
+    prefix: ClassVar[str] = '{"apiVersion":"v1","kind":"List","items":['
+    suffix: ClassVar[str] = "]}\n"
+
+    def write_resources(self, resources: Iterable[Resource], out: TextSink):
+        self._write((res.dump_json() for res in resources), out)
+
+    def write_documents(self, documents: Iterable[dict[str, Any]], out: TextSink):
+        self._write((dump_json(doc) for doc in documents), out)
+
+    def join(self, outputs: Iterable[str]) -> str:
+        buf = io.StringIO()
+        self._write(
+            (
+                items
+                for out in outputs
+                if (items := out[len(self.prefix) : -len(self.suffix)]) != ""
+            ),
+            buf,
+        )
+        return buf.getvalue()
+
+    def _write(self, items: Iterable[str], out: TextSink):
+        out.write(self.prefix)
+        for i, item in enumerate(items):
+            if i > 0:
+                out.write(",")
+            out.write(item)
+        out.write(self.suffix)
+
+
+class JsonLinesSerializer(Serializer):
+    """One json document per line"""
+
+    format = OutputFormat.JSONL
+    extension = ".jsonl"
+
+    def write_resources(self, resources: Iterable[Resource], out: TextSink):
+        for res in resources:
+            out.write(res.dump_json() + "\n")
+
+    def write_documents(self, documents: Iterable[dict[str, Any]], out: TextSink):
+        for doc in documents:
+            out.write(dump_json(doc) + "\n")
+
+    def join(self, outputs: Iterable[str]) -> str:
+        return "".join(outputs)
+
+
+def dump_json(doc: dict[str, Any]) -> str:
+    """Dumps document the same way pydantic's model_dump_json does"""
+    return json.dumps(doc, ensure_ascii=False, separators=(",", ":"))
+
+
+SERIALIZERS: dict[OutputFormat, Serializer] = {
+    s.format: s() for s in [YamlSerializer, JsonSerializer, JsonLinesSerializer]
+}
+
+
+def get_serializer(fmt: OutputFormat | str = OutputFormat.YAML) -> Serializer:
+    return SERIALIZERS[OutputFormat(fmt)]
@@ -0,0 +1,379 @@
+import json
+import os
+import signal
+import socket
+import socketserver
+import stat
+import sys
+import threading
+import time
+import urllib.parse
+from collections.abc import Callable
+from http.server import BaseHTTPRequestHandler
+from typing import Any
+
+from pcdf.cmd.cache import RenderCache
+from pcdf.cmd.context import CommandContext
+from pcdf.cmd.remote import Address
+from pcdf.cmd.render import render_manifests
+from pcdf.cmd.serializers import OutputFormat, get_serializer
+from pcdf.cmd.values import LoadedValues, parse_values
+from pcdf.cmd.watch import FileWatcher
+from pcdf.core import DatamodelConformanceError, ResourceFactory, validate_config
+
+
+class Metrics:
+    """Request counters exposed in Prometheus text format"""
+
+    __slots__ = ["started", "in_flight", "_lock", "_requests", "_durations"]
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.in_flight = 0
+        self._lock = threading.Lock()
+        self._requests: dict[tuple[str, int], int] = {}
+        self._durations: dict[str, list[float]] = {}
+
+    def begin(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def end(self, endpoint: str, status: int, seconds: float):
+        with self._lock:
+            self.in_flight -= 1
+            key = (endpoint, status)
+            self._requests[key] = self._requests.get(key, 0) + 1
+            d = self._durations.setdefault(endpoint, [0.0, 0])
+            d[0] += seconds
+            d[1] += 1
+
+    def exposition(self) -> str:
+        with self._lock:
+            requests = sorted(self._requests.items())
+            durations = sorted(self._durations.items())
+            in_flight = self.in_flight
+        lines = ["# TYPE pcdf_requests_total counter"]
+        lines += [
+            f'pcdf_requests_total{{endpoint="{ep}",code="{code}"}} {n}'
+            for (ep, code), n in requests
+        ]
+        lines.append("# TYPE pcdf_request_duration_seconds summary")
+        for ep, (total, count) in durations:
+            lines.append(
+                f'pcdf_request_duration_seconds_sum{{endpoint="{ep}"}} {total}'
+            )
+            lines.append(
+                f'pcdf_request_duration_seconds_count{{endpoint="{ep}"}} {count}'
+            )
+        lines += [
+            "# TYPE pcdf_requests_in_flight gauge",
+            f"pcdf_requests_in_flight {in_flight}",
+            "# TYPE pcdf_uptime_seconds gauge",
+            f"pcdf_uptime_seconds {time.monotonic() - self.started:.3f}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+class RenderService:
+    """Warm command context, factory and cache shared by request threads"""
+
+    __slots__ = ["ctx", "factory", "cache", "metrics"]
+
+    def __init__(
+        self,
+        ctx: CommandContext,
+        factory: ResourceFactory,
+        cache: RenderCache | None = None,
+    ):
+        self.ctx = ctx
+        self.factory = factory
+        self.cache = cache
+        self.metrics = Metrics()
+
+    def load(self, text: str, path: str = "", read_files: bool = True) -> LoadedValues:
+        """Parses values and checks them against configured entities.
+        Raises DatamodelConformanceError, any other error means values are
+        not valid against datamodel.
+        """
+        vals = parse_values(self.ctx, text, path, read_files)
+        validate_config(self.ctx["settings"].resources, vals.model)
+        return vals
+
+    def render(self, vals: LoadedValues, fmt: OutputFormat) -> str:
+        return render_manifests(
+            self.ctx,
+            self.factory,
+            vals.model,
+            self.cache,
+            serializer=get_serializer(fmt),
+        )
+
+    def schema(self) -> dict[str, Any]:
+        return self.ctx["datamodel"].model_json_schema()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    last_status = 500
+    server: "_TCPServer | _UnixServer"
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def log_message(self, format: str, *args: Any):
+        self.server.service.ctx["logger"].debug(format % args)
+
+    def _dispatch(self, method: str):
+        service = self.server.service
+        url = urllib.parse.urlsplit(self.path)
+        query = dict(urllib.parse.parse_qsl(url.query))
+        service.metrics.begin()
+        start = time.monotonic()
+        status = 500
+        try:
+            status = self._route(service, method, url.path, query)
+        finally:
+            # unknown paths are not counted one by one
+            endpoint = url.path if status != 404 else "unknown"
+            service.metrics.end(endpoint, status, time.monotonic() - start)
+
+    def _route(
+        self, service: RenderService, method: str, path: str, query: dict[str, str]
+    ) -> int:
+        routes: dict[str, tuple[str, Callable[[], int]]] = {
+            "/healthz": ("GET", lambda: self._send(200, "ok\n")),
+            "/metrics": ("GET", lambda: self._send(200, service.metrics.exposition())),
+            "/schema": ("GET", lambda: self._send_json(200, service.schema())),
+            "/render": ("POST", lambda: self._render(service, query)),
+            "/validate": ("POST", lambda: self._validate(service, query)),
+        }
+        if (route := routes.get(path)) is None:
+            return self._send_json(404, {"error": f"no such endpoint: {path}"})
+        if route[0] != method:
+            return self._send_json(405, {"error": f"{path} expects {route[0]}"})
+        return route[1]()
+
+    def _render(self, service: RenderService, query: dict[str, str]) -> int:
+        text = self._read_body()
+        try:
+            fmt = OutputFormat(query.get("format", OutputFormat.YAML.value))
+        except ValueError as err:
+            return self._send_json(400, {"error": str(err)})
+        if (vals := self._load(service, text, query)) is None:
+            return self.last_status
+        try:
+            out = service.render(vals, fmt)
+        except Exception as err:
+            service.ctx["logger"].error(err)
+            return self._send_json(500, {"error": str(err)})
+        return self._send(200, out)
+
+    def _validate(self, service: RenderService, query: dict[str, str]) -> int:
+        if self._load(service, self._read_body(), query) is None:
+            return self.last_status
+        return self._send_json(200, {"status": "datamodel correct"})
+
+    def _load(
+        self, service: RenderService, text: str, query: dict[str, str]
+    ) -> LoadedValues | None:
+        """Loads request values, responds with error and returns None if
+        they are not valid. Only clients of unix socket, which is private to
+        the user running server, may have files of server host read: values
+        path they send is honored and values may reference files.
+        """
+        try:
+            if self.server.local_clients:
+                return service.load(text, query.get("path", ""))
+            return service.load(text, read_files=False)
+        except DatamodelConformanceError as err:
+            self._send_json(
+                422,
+                {
+                    "error": str(err),
+                    "errors": [
+                        {"protocol": e.protocol, "unconformed": e.unconformed}
+                        for e in err.errors
+                    ],
+                },
+            )
+        except Exception as err:
+            self._send_json(400, {"error": f"invalid values: {err}"})
+        return None
+
+    def _read_body(self) -> str:
+        length = int(self.headers.get("Content-Length", 0))
+        return self.rfile.read(length).decode()
+
+    def _send_json(self, status: int, body: Any) -> int:
+        return self._send(status, json.dumps(body) + "\n", "application/json")
+
+    def _send(self, status: int, body: str, ctype: str = "text/plain") -> int:
+        data = body.encode()
+        self.last_status = status
+        self.send_response(status)
+        self.send_header("Content-Type", f"{ctype}; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+        return status
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    # in-flight requests are waited for on close
+    daemon_threads = False
+    block_on_close = True
+    allow_reuse_address = True
+    # anyone able to connect could have files read otherwise
+    local_clients = False
+
+    def __init__(self, address: Address, service: RenderService):
+        self.service = service
+        super().__init__((address.host, address.port), _Handler)
+
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = False
+    block_on_close = True
+    local_clients = True
+
+    def __init__(self, address: Address, service: RenderService):
+        self.service = service
+        _remove_stale_socket(address.socket)
+        super().__init__(address.socket, _Handler)
+
+    def server_bind(self):
+        super().server_bind()
+        # connections are accepted only once listening, after chmod
+        os.chmod(self.server_address, 0o600)  # type: ignore[arg-type]
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):  # type: ignore[arg-type]
+            os.remove(self.server_address)  # type: ignore[arg-type]
+
+
+def _remove_stale_socket(path: str):
+    """Removes socket file left by server which is not running anymore"""
+    try:
+        if not stat.S_ISSOCK(os.stat(path).st_mode):
+            return
+    except FileNotFoundError:
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(path)
+        except ConnectionRefusedError:
+            os.remove(path)
+            return
+    raise OSError(f"render server is already listening on {path}")
+
+
+def watched_files(ctx: CommandContext) -> list[str]:
+    """Source files defining served settings: modules of datamodel and of
+    every provider and mutator, the main module and every module loaded from
+    the main module's package directory.
+    """
+    modules = {ctx["datamodel"].__module__, "__main__"}
+    for res in ctx["settings"].resources:
+        modules.update(ent.__module__ for ent in res.entities())
+
+    files = {
+        path
+        for name in modules
+        if (path := getattr(sys.modules.get(name), "__file__", None)) is not None
+    }
+    if (main := getattr(sys.modules.get("__main__"), "__file__", None)) is not None:
+        root = os.path.dirname(os.path.abspath(main)) + os.sep
+        files.update(
+            path
+            for mod in list(sys.modules.values())
+            if (path := getattr(mod, "__file__", None)) is not None
+            and os.path.abspath(path).startswith(root)
+        )
+    return sorted(files)
+
+
+class _Reloader(threading.Thread):
+    """Polls files and calls on_change once any of them changed"""
+
+    def __init__(self, files: list[str], interval: float, on_change: Callable):
+        super().__init__(name="pcdf-reloader", daemon=True)
+        self.watcher = FileWatcher(files)
+        self.interval = interval
+        self.on_change = on_change
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            if changed := self.watcher.changed():
+                self.on_change(changed)
+                return
+
+
+def serve(
+    ctx: CommandContext,
+    address: Address,
+    cache: RenderCache | None = None,
+    reload: bool = True,
+    reload_interval: float = 1.0,
+):
+    """Serves render, validate and schema requests with warm factory.
+
+    Unix socket is accessible to the user running server only. Values sent
+    over TCP could not reference files (see _Handler._load).
+
+    Requests are handled concurrently, each in its own thread. On SIGTERM
+    server stops accepting requests and exits once in-flight ones are done.
+    On SIGHUP, or when reload is enabled and a source file defining settings
+    changes, it drains the same way and re-executes itself to load new code.
+    """
+    log = ctx["logger"]
+    restart = threading.Event()
+
+    with ResourceFactory.from_config(log, ctx["settings"]) as factory:
+        service = RenderService(ctx, factory, cache)
+        server = (
+            _UnixServer(address, service)
+            if address.socket != ""
+            else _TCPServer(address, service)
+        )
+
+        def shutdown(reload: bool):
+            if reload:
+                restart.set()
+            # shutdown() waits for serve_forever, so it must not be called by
+            # the thread running it (signal handlers run on that thread)
+            threading.Thread(target=server.shutdown, daemon=True).start()
+
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, lambda *_: shutdown(reload=False))
+            signal.signal(signal.SIGHUP, lambda *_: shutdown(reload=True))
+
+        reloader = None
+        if reload:
+
+            def on_change(changed: list[str]):
+                log.info(f"reloading, changed: {", ".join(changed)}")
+                shutdown(reload=True)
+
+            reloader = _Reloader(watched_files(ctx), reload_interval, on_change)
+            reloader.start()
+
+        if address.socket == "" and address.port == 0:
+            address = Address(host=address.host, port=server.server_address[1])
+        log.info(f"serving on {address}")
+        try:
+            server.serve_forever()
+        finally:
+            if reloader is not None:
+                reloader.stopped.set()
+            server.server_close()
+        log.info("all requests are done, stopping")
+
+    if restart.is_set():
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.execv(sys.executable, sys.orig_argv)
@@ -0,0 +1,78 @@
+import os
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import Any
+
+from pydantic import BaseModel
+
+from pcdf.cmd.context import CommandContext
+from pcdf.cmd.serializers import load_yaml
+
+
+@dataclass(frozen=True)
+class LoadedValues:
+    """Values file parsed and validated against configured datamodel once.
+    Commands pass it around instead of re-reading the file.
+    """
+
+    path: str
+    model: BaseModel
+
+    @property
+    def inputs(self) -> list[str]:
+        """Files values were read from, including files referenced by the
+        datamodel (e.g. documents). Watched by render --watch
+        """
+        inputs = [self.path] if self.path != "" else []
+        return inputs + list(dict.fromkeys(_input_files(self.model)))
+
+
+def _input_files(obj: Any) -> Iterator[str]:
+    """Walks datamodel for models reading files, they declare them by
+    input_files() method
+    """
+    match obj:
+        case BaseModel():
+            if callable(input_files := getattr(obj, "input_files", None)):
+                yield from input_files()
+            for name in type(obj).model_fields:
+                yield from _input_files(getattr(obj, name))
+        case list() | tuple():
+            for item in obj:
+                yield from _input_files(item)
+        case dict():
+            for item in obj.values():
+                yield from _input_files(item)
+
+
+def validation_context(path: str, read_files: bool = True) -> dict[str, Any]:
+    """Context of datamodel validation: paths in values are relative to
+    directory of values file. Without read_files values could not reference
+    files at all, e.g. ones sent to render server by remote clients.
+    """
+    return {
+        "values_dir": os.path.dirname(os.path.abspath(path)) if path else "",
+        "read_files": read_files,
+    }
+
+
+def load_values(ctx: CommandContext, path: str) -> LoadedValues:
+    with open(path, "r") as file:
+        raw = load_yaml(file)
+    return LoadedValues(
+        path, ctx["datamodel"].model_validate(raw, context=validation_context(path))
+    )
+
+
+def parse_values(
+    ctx: CommandContext, text: str, path: str = "", read_files: bool = True
+) -> LoadedValues:
+    """Same as load_values for values file content read elsewhere,
+    e.g. received by render server
+    """
+    return LoadedValues(
+        path,
+        ctx["datamodel"].model_validate(
+            load_yaml(text), context=validation_context(path, read_files)
+        ),
+    )
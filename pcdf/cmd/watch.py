@@ -0,0 +1,181 @@
+import hashlib
+import io
+import os
+import time
+from collections.abc import Iterable
+
+from pcdf.cmd.cache import RUN_ID_PLACEHOLDER
+from pcdf.cmd.context import CommandContext
+from pcdf.cmd.render import load_state, open_output, save_state
+from pcdf.cmd.serializers import OutputFormat, get_serializer
+from pcdf.cmd.values import LoadedValues, load_values
+from pcdf.core import (
+    DatamodelConformanceError,
+    RenderState,
+    ResourceFactory,
+    RunInfo,
+    validate_config,
+)
+
+
+class FileWatcher:
+    """Detects changes of files by polling their mtime and size"""
+
+    __slots__ = ["_stamps"]
+
+    def __init__(self, paths: Iterable[str] = ()):
+        self._stamps: dict[str, tuple[int, int] | None] = {}
+        self.watch(paths)
+
+    def watch(self, paths: Iterable[str]):
+        """Replaces watched files. Files watched already keep their baseline,
+        so changes made meanwhile are still reported
+        """
+        self._stamps = {
+            p: self._stamps[p] if p in self._stamps else _stamp(p) for p in paths
+        }
+
+    def changed(self) -> list[str]:
+        """Returns files changed (or created, or removed) since previous call"""
+        changed = []
+        for path, before in self._stamps.items():
+            if (now := _stamp(path)) != before:
+                self._stamps[path] = now
+                changed.append(path)
+        return changed
+
+    def wait(self, interval: float, debounce: float) -> list[str]:
+        """Blocks until some files changed and then stayed unchanged for
+        debounce seconds, so that a burst of writes (e.g. editor saving via
+        temp file) is reported once. Returns every file changed meanwhile.
+        """
+        changed: list[str] = []
+        while not changed:
+            time.sleep(interval)
+            changed = self.changed()
+        quiet_since = time.monotonic()
+        while time.monotonic() - quiet_since < debounce:
+            time.sleep(interval)
+            if more := self.changed():
+                changed += [p for p in more if p not in changed]
+                quiet_since = time.monotonic()
+        return changed
+
+
+def _stamp(path: str) -> tuple[int, int] | None:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class _Renderer:
+    """Keeps previous render of watched values to skip redundant work"""
+
+    __slots__ = [
+        "ctx",
+        "factory",
+        "output",
+        "state",
+        "fmt",
+        "prev",
+        "digest",
+        "written",
+    ]
+
+    def __init__(
+        self,
+        ctx: CommandContext,
+        factory: ResourceFactory,
+        output: str,
+        state: str,
+        fmt: OutputFormat,
+    ):
+        self.ctx = ctx
+        self.factory = factory
+        self.output = output
+        self.state = state
+        self.fmt = fmt
+        self.prev: RenderState | None = load_state(state) if state != "" else None
+        self.digest = ""
+        self.written = ""
+
+    def render(self, vals: LoadedValues):
+        log = self.ctx["logger"]
+        digest = hashlib.sha256(vals.model.model_dump_json().encode()).hexdigest()
+        if digest == self.digest:
+            log.info("datamodel has not changed")
+            return
+
+        ri = RunInfo()
+        try:
+            documents, self.prev = self.factory.run_incremental(
+                vals.model, self.prev, ri
+            )
+        except Exception as err:
+            log.error(err)
+            return
+        self.digest = digest
+        if self.state != "":
+            save_state(self.state, self.prev)
+
+        buf = io.StringIO()
+        get_serializer(self.fmt).write_documents(documents, buf)
+        text = buf.getvalue()
+        # run id differs every render, output is compared without it
+        if (masked := text.replace(ri.id, RUN_ID_PLACEHOLDER)) == self.written:
+            log.info("output has not changed")
+            return
+        with open_output(self.output) as out:
+            out.write(text)
+        self.written = masked
+        log.info(f"rendered {vals.path}")
+
+
+def watch(
+    ctx: CommandContext,
+    values: str,
+    output: str = "",
+    state: str = "",
+    fmt: OutputFormat = OutputFormat.YAML,
+    debounce: float = 0.2,
+    interval: float = 0.1,
+):
+    """Renders values file and renders it again each time it or any input
+    it references changes, until interrupted.
+
+    Process, factory and previous render state are kept warm: render happens
+    only when parsed datamodel changed, only providers whose inputs changed
+    are executed and output is written only when it differs from the previous
+    one. Invalid values are reported and watching continues.
+    """
+    log = ctx["logger"]
+    watcher = FileWatcher([values])
+    with ResourceFactory.from_config(log, ctx["settings"]) as factory:
+        renderer = _Renderer(ctx, factory, output, state, fmt)
+        try:
+            while True:
+                if (vals := _load(ctx, values)) is not None:
+                    watcher.watch(vals.inputs)
+                    renderer.render(vals)
+                changed = watcher.wait(interval, debounce)
+                log.debug(f"changed: {", ".join(changed)}")
+        except KeyboardInterrupt:
+            return
+
+
+def _load(ctx: CommandContext, values: str) -> LoadedValues | None:
+    """Loads and validates values, reports errors instead of raising them"""
+    log = ctx["logger"]
+    try:
+        vals = load_values(ctx, values)
+        validate_config(ctx["settings"].resources, vals.model)
+    except DatamodelConformanceError as errs:
+        for err in errs.errors:
+            log.error(err)
+        return None
+    except Exception as err:
+        log.error(f"unable to load {values}: {err}")
+        return None
+    return vals
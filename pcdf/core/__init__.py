@@ -1,32 +1,127 @@
 """
 Core library for PCDF. It's useful for writing your own framework entities.
 Also PCDF provides some ready entities. You could find them in package pcdf.lib.
+
+Names are imported lazily on first access, so a command importing only
+Settings does not pay for the factory and its executors.
 """
 
-from .context import Context, RunContext, RunInfo, SystemInfo
-from .factory import ResourceFactory
-from .resource import (
-    AbstractResourceMutator,
-    AbstractResourceProvider,
-    ExecutionStage,
-    ProtocolConformanceError,
-    ProviderExecutionError,
-    Resource,
-    UndefinedDatamodelError,
-    check_datamodel_conformance,
-)
-from .settings import Settings, validate_config
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:  # pragma: no cover
+    from . import canonical, profiling
+    from .canonical import CONTENT_HASH_ANNOTATION
+    from .construction import build
+    from .conformance import ConformancePlan, compile_conformance
+    from .context import Context, RunContext, RunInfo, SystemInfo
+    from .factory import ResourceFactory
+    from .incremental import ProviderSnapshot, RenderState
+    from .memo import Memo, MemoKey, MemoScope, MemoStore, memoize
+    from .profiling import Profiler
+    from .registry import MUTATORS_GROUP, PROVIDERS_GROUP, load_entity
+    from .resource import (
+        AbstractResourceMutator,
+        AbstractResourceProvider,
+        AsyncResourceMutator,
+        AsyncResourceProvider,
+        DatamodelConformanceError,
+        ExecutionStage,
+        ProtocolConformanceError,
+        ProviderDependencyError,
+        ProviderExecutionError,
+        Resource,
+        UndefinedDatamodelError,
+        check_datamodel_conformance,
+    )
+    from .settings import Settings, validate_config
+    from .workload import WorkloadIndex
+
+# exported name -> submodule defining it
+_EXPORTS = {
+    "CONTENT_HASH_ANNOTATION": "canonical",
+    "build": "construction",
+    "ConformancePlan": "conformance",
+    "compile_conformance": "conformance",
+    "Context": "context",
+    "RunContext": "context",
+    "RunInfo": "context",
+    "SystemInfo": "context",
+    "ResourceFactory": "factory",
+    "ProviderSnapshot": "incremental",
+    "RenderState": "incremental",
+    "Memo": "memo",
+    "MemoKey": "memo",
+    "MemoScope": "memo",
+    "MemoStore": "memo",
+    "memoize": "memo",
+    "Profiler": "profiling",
+    "MUTATORS_GROUP": "registry",
+    "PROVIDERS_GROUP": "registry",
+    "load_entity": "registry",
+    "AbstractResourceMutator": "resource",
+    "AbstractResourceProvider": "resource",
+    "AsyncResourceMutator": "resource",
+    "AsyncResourceProvider": "resource",
+    "DatamodelConformanceError": "resource",
+    "ExecutionStage": "resource",
+    "ProtocolConformanceError": "resource",
+    "ProviderDependencyError": "resource",
+    "ProviderExecutionError": "resource",
+    "Resource": "resource",
+    "UndefinedDatamodelError": "resource",
+    "check_datamodel_conformance": "resource",
+    "Settings": "settings",
+    "validate_config": "settings",
+    "WorkloadIndex": "workload",
+}
 
 __all__ = [
     "Settings",
     "Resource",
     "ProtocolConformanceError",
+    "DatamodelConformanceError",
     "UndefinedDatamodelError",
     "AbstractResourceProvider",
     "AbstractResourceMutator",
+    "AsyncResourceProvider",
+    "AsyncResourceMutator",
     "ResourceFactory",
+    "RenderState",
+    "ProviderSnapshot",
     "ExecutionStage",
     "ProviderExecutionError",
+    "ProviderDependencyError",
     "check_datamodel_conformance",
     "validate_config",
+    "compile_conformance",
+    "ConformancePlan",
+    "Profiler",
+    "profiling",
+    "build",
+    "Memo",
+    "MemoKey",
+    "MemoScope",
+    "MemoStore",
+    "memoize",
+    "WorkloadIndex",
+    "CONTENT_HASH_ANNOTATION",
+    "canonical",
+    "PROVIDERS_GROUP",
+    "MUTATORS_GROUP",
+    "load_entity",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    if name in ("profiling", "canonical"):
+        return importlib.import_module(f"{__name__}.{name}")
+    if (module := _EXPORTS.get(name)) is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_EXPORTS) | {"profiling", "canonical"})
@@ -0,0 +1,73 @@
+import hashlib
+import json
+from typing import Any
+
+from pcdf.core.context import RUN_ID_LABEL
+
+CONTENT_HASH_ANNOTATION = "progressive-cd.io/content-hash"
+
+VOLATILE_LABELS = frozenset({RUN_ID_LABEL})
+"""Labels differing between renders of the same object"""
+
+type ObjectKey = tuple[str, str, str, str]
+
+
+def canonical_json(doc: dict[str, Any]) -> str:
+    """Deterministic serialization of dumped resource: sorted keys, no
+    whitespace, volatile labels and content hash annotation left out.
+    Empty labels and annotations are left out too, so object hashes the same
+    before and after it's annotated.
+    """
+    meta = doc.get("metadata")
+    if isinstance(meta, dict):
+        meta = dict(meta)
+        for name, volatile in [
+            ("labels", VOLATILE_LABELS),
+            ("annotations", {CONTENT_HASH_ANNOTATION}),
+        ]:
+            if values := {
+                k: v for k, v in (meta.get(name) or {}).items() if k not in volatile
+            }:
+                meta[name] = values
+            else:
+                meta.pop(name, None)
+        doc = doc | {"metadata": meta}
+    return json.dumps(doc, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def content_hash(doc: dict[str, Any]) -> str:
+    return hashlib.sha256(canonical_json(doc).encode()).hexdigest()
+
+
+def with_content_hash(doc: dict[str, Any]) -> dict[str, Any]:
+    """Returns copy of dumped resource annotated with its content hash"""
+    meta = dict(doc.get("metadata") or {})
+    meta["annotations"] = dict(meta.get("annotations") or {})
+    meta["annotations"][CONTENT_HASH_ANNOTATION] = content_hash(doc)
+    return doc | {"metadata": meta}
+
+
+def stored_hash(doc: dict[str, Any]) -> str:
+    """Content hash annotated on dumped resource, computed if it's missing"""
+    annotations = (doc.get("metadata") or {}).get("annotations") or {}
+    if (digest := annotations.get(CONTENT_HASH_ANNOTATION)) is not None:
+        return digest
+    return content_hash(doc)
+
+
+def object_key(doc: dict[str, Any]) -> ObjectKey:
+    """Identity of object in cluster: API group, kind, namespace and name"""
+    meta = doc.get("metadata") or {}
+    return (
+        str(doc.get("apiVersion", "")).rpartition("/")[0],
+        str(doc.get("kind", "")),
+        str(meta.get("namespace") or ""),
+        str(meta.get("name") or ""),
+    )
+
+
+def format_key(key: ObjectKey) -> str:
+    """Formats key the way kubectl names objects, e.g. deployment.apps/ns/name"""
+    group, kind, namespace, name = key
+    kind = f"{kind.lower()}.{group}" if group != "" else kind.lower()
+    return "/".join(p for p in [kind, namespace, name] if p != "")
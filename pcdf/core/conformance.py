@@ -0,0 +1,90 @@
+import functools
+import inspect
+from dataclasses import dataclass
+from typing import Any
+
+from pydantic import BaseModel
+
+from pcdf.core.resource import (
+    DatamodelConformanceError,
+    FqNamedEntity,
+    ProtocolConformanceError,
+    datamodel_fields,
+)
+
+
+@dataclass(frozen=True)
+class ConformancePlan:
+    """Result of checking entities' Datamodel protocols against datamodel class.
+
+    Fields missing in class could still be provided by instance when model
+    allows extra fields, such fields are rechecked on every input.
+    """
+
+    datamodel: type[BaseModel]
+    errors: tuple[ProtocolConformanceError, ...]
+    dynamic: bool
+
+    def check(self, input: BaseModel):
+        errors = list(self.errors)
+        if self.dynamic:
+            errors = [
+                ProtocolConformanceError(
+                    err.protocol,
+                    [
+                        f
+                        for f in err.unconformed
+                        if _name(f) not in (input.model_extra or {})
+                    ],
+                )
+                for err in errors
+            ]
+            errors = [err for err in errors if len(err.unconformed) > 0]
+        if len(errors) > 0:
+            raise DatamodelConformanceError(errors)
+
+
+def _name(unconformed: str) -> str:
+    return unconformed.split(":", 1)[0]
+
+
+def _provides(datamodel: type[BaseModel], field: str) -> bool:
+    """Fields, computed fields and properties provide protocol field. Other
+    class attributes do not: every model has methods like copy or schema.
+    """
+    return (
+        field in datamodel.model_fields
+        or field in datamodel.model_computed_fields
+        or isinstance(
+            inspect.getattr_static(datamodel, field, None),
+            (property, functools.cached_property),
+        )
+    )
+
+
+def _annotation(annotation: Any) -> str:
+    return annotation.__name__ if isinstance(annotation, type) else str(annotation)
+
+
+@functools.cache
+def compile_conformance(
+    datamodel: type[BaseModel], entities: tuple[FqNamedEntity, ...]
+) -> ConformancePlan:
+    """Checks Datamodel protocols of entities against datamodel class once.
+    Plans are cached per datamodel class and entities set.
+    """
+    errors = []
+    for ent in entities:
+        missing = [
+            f"{field}: {_annotation(annotation)}"
+            for field, annotation in sorted(datamodel_fields(ent).items())
+            if not _provides(datamodel, field)
+        ]
+        if len(missing) > 0:
+            errors.append(ProtocolConformanceError(ent.fqname(), missing))
+
+    return ConformancePlan(
+        datamodel,
+        tuple(errors),
+        dynamic=datamodel.model_config.get("extra") == "allow",
+    )
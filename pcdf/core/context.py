@@ -1,7 +1,11 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from ksuid import Ksuid
 
+from pcdf.core.memo import Memo
+
+RUN_ID_LABEL = "progressive-cd.io/last-run-id"
+
 
 @dataclass(frozen=True)
 class SystemInfo:
@@ -16,10 +20,10 @@ class SystemInfo:
 
 @dataclass(frozen=True)
 class RunInfo:
-    id: str = Ksuid().__str__()
+    id: str = field(default_factory=lambda: Ksuid().__str__())
 
     def labels(self) -> dict[str, str]:
-        return {"progressive-cd.io/last-run-id": self.id}
+        return {RUN_ID_LABEL: self.id}
 
 @dataclass
 class Context():
@@ -32,20 +36,24 @@ class Context():
             values=self.values | values,
         )
 
-    def with_run_info(self, ri: RunInfo) -> "RunContext":
+    def with_run_info(self, ri: RunInfo, memo: Memo | None = None) -> "RunContext":
         return RunContext(
             system=self.system,
             run=ri,
             values=self.values,
+            memo=memo or Memo(),
         )
 
 @dataclass
 class RunContext(Context):
     run: RunInfo
+    memo: Memo = field(default_factory=Memo)
+    """Values computed once per run, shared by providers of the run"""
 
     def with_values(self, values: dict[str, str]) -> "RunContext":
         return RunContext(
             system=self.system,
             run=self.run,
             values=self.values | values,
+            memo=self.memo,
         )
@@ -1,11 +1,27 @@
-from collections.abc import Sequence
+import asyncio
+import contextvars
+import threading
+from collections.abc import Collection, Coroutine, Iterator, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import AbstractContextManager, nullcontext
 from logging import Logger
-from typing import Self
+from typing import Any, Self
 
+from pcdf.core import construction, memo, profiling
 from pcdf.core.context import Context, RunContext, RunInfo, SystemInfo
+from pcdf.core.incremental import (
+    ProviderSnapshot,
+    RenderState,
+    provider_fingerprints,
+    replace_run_id,
+)
+from pcdf.core.memo import Memo, MemoScope, MemoStore
+from pcdf.core.profiling import Profiler
 from pcdf.core.resource import (
     AbstractResourceProvider,
+    AsyncResourceProvider,
     ExecutionStage,
+    ProviderDependencyError,
     ProviderExecutionError,
     Resource,
 )
@@ -13,29 +29,59 @@ from pcdf.core.settings import Settings
 
 
 class ResourceFactory[T]:
+    """Executes configured providers over datamodel.
+
+    Factory keeps no per-run state: every run gets its own RunContext and
+    result list, so one configured factory (and its provider and mutator
+    instances) could be run many times, including from several threads
+    at once. Call close() to release the thread pool used by concurrent runs.
+    """
+
     __slots__ = [
         "logger",
         "root_ctx",
         "providers",
-        "resources",
+        "concurrency",
+        "trusted",
+        "verify",
+        "batch_memo",
+        "_pool",
+        "_pool_lock",
     ]
 
     providers: dict[str, AbstractResourceProvider]
-    resources: list[Resource]
 
     def __init__(self, logger: Logger, si: SystemInfo):
         self.logger = logger
         self.root_ctx = Context(si, values={})
         self.providers = {}
-        self.resources = []
+        self.concurrency = 1
+        self.trusted = False
+        self.verify = False
+        self.batch_memo: MemoStore | None = None
+        self._pool: ThreadPoolExecutor | None = None
+        self._pool_lock = threading.Lock()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Shuts down thread pool shared by concurrent runs"""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
 
     @classmethod
     def from_config(cls, logger: Logger, settings: Settings) -> Self:
-        return cls(logger, settings.get_system_info()).with_providers(
-            *[
-                res.provider().with_mutators(*[mut() for mut in res.mutators])
-                for res in settings.resources
-            ]
+        return (
+            cls(logger, settings.get_system_info())
+            .with_providers(*[res.instantiate() for res in settings.resources])
+            .with_concurrency(settings.concurrency)
+            .with_construction(settings.trusted_construction, settings.verify_resources)
         )
 
     def with_providers(self, *providers: AbstractResourceProvider) -> Self:
@@ -43,33 +89,394 @@ class ResourceFactory[T]:
             self.providers[p.fqname()] = p
         return self
 
-    def run(self, data: T) -> Sequence[Resource]:
-        ctx = self.root_ctx.with_run_info(RunInfo())
-        for pname in self.providers.keys():
-            self.logger.debug(f"executing {pname}")
-            self._execute_provider(ctx, pname, data)
-        return self.resources
+    def with_concurrency(self, workers: int) -> Self:
+        """Allows up to workers providers to be executed at the same time.
+        Only providers declared as side effect free or having dependencies
+        are executed concurrently, the rest keep running one by one.
+        """
+        self.close()
+        self.concurrency = max(workers, 1)
+        return self
+
+    def with_construction(self, trusted: bool, verify: bool = False) -> Self:
+        """Trusted construction makes pcdf.core.build skip validation of models
+        built by providers and mutators, their inputs were validated by
+        datamodel already. Verify validates every resource once its provider
+        is done, which is useful in CI and while debugging providers.
+        """
+        self.trusted = trusted
+        self.verify = verify
+        return self
+
+    def with_batch_memo(self, store: MemoStore | None) -> Self:
+        """Shares store of batch scoped memoized values between runs,
+        see pcdf.core.memo
+        """
+        self.batch_memo = store
+        return self
+
+    def run(self, data: T, ri: RunInfo | None = None) -> Sequence[Resource]:
+        return list(self.iter_run(data, ri))
+
+    def iter_run(self, data: T, ri: RunInfo | None = None) -> Iterator[Resource]:
+        """Executes providers and yields their resources as soon as provider
+        is done, so callers could write and release them one by one.
+        Resources are yielded in providers order whatever the execution
+        order was. Async providers are awaited all together before yielding.
+        """
+        ctx = self._run_ctx(ri or RunInfo())
+        try:
+            yield from self._iter_run(ctx, data)
+        finally:
+            ctx.memo.run.log_stats(self.logger, MemoScope.RUN)
+
+    def _iter_run(self, ctx: RunContext, data: T) -> Iterator[Resource]:
+        pnames = list(self.providers.keys())
+        if any(isinstance(self.providers[p], AsyncResourceProvider) for p in pnames):
+            outputs = _run_coroutine(self._aexecute(ctx, data, pnames))
+            for pname in pnames:
+                yield from outputs.pop(pname)
+            return
+
+        executed = (
+            self._iter_sequential(ctx, data, pnames)
+            if self.concurrency == 1
+            else self._iter_concurrent(ctx, data, pnames)
+        )
+        finished: dict[str, Sequence[Resource]] = {}
+        pos = 0
+        for pname, resources in executed:
+            finished[pname] = resources
+            while pos < len(pnames) and pnames[pos] in finished:
+                yield from finished.pop(pnames[pos])
+                pos += 1
+
+    async def arun(self, data: T, ri: RunInfo | None = None) -> Sequence[Resource]:
+        """Executes providers under running event loop.
+        With concurrency above 1, async providers and sync ones with
+        concurrency declarations are awaited concurrently, up to concurrency
+        at once. Sync providers are executed on factory's thread pool.
+        """
+        ctx = self._run_ctx(ri or RunInfo())
+        outputs = await self._aexecute(ctx, data, list(self.providers.keys()))
+        ctx.memo.run.log_stats(self.logger, MemoScope.RUN)
+        return [res for pname in self.providers for res in outputs[pname]]
+
+    def run_incremental(
+        self, data: T, prev: RenderState | None = None, ri: RunInfo | None = None
+    ) -> tuple[list[dict[str, Any]], RenderState]:
+        """Executes only providers whose declared datamodel inputs changed since
+        prev run, output of the rest is taken from prev state.
+        Providers which are not side effect free are always executed.
+        Returns dumped resources and state for the next run.
+        """
+        ri = ri or RunInfo()
+        ctx = self._run_ctx(ri)
+        system = self.root_ctx.system
+        fingerprints = provider_fingerprints(self.providers, data)
+
+        reused: dict[str, ProviderSnapshot] = {}
+        if prev is not None and prev.system == system:
+            for pname, provider in self.providers.items():
+                snap = prev.providers.get(pname)
+                if (
+                    provider.side_effect_free
+                    and snap is not None
+                    and fingerprints[pname] is not None
+                    and snap.fingerprint == fingerprints[pname]
+                ):
+                    reused[pname] = snap
+
+        outputs = self._execute(
+            ctx, data, [pname for pname in self.providers if pname not in reused]
+        )
+        ctx.memo.run.log_stats(self.logger, MemoScope.RUN)
+
+        snapshots: dict[str, ProviderSnapshot] = {}
+        for pname in self.providers:
+            if (snap := reused.get(pname)) is not None and prev is not None:
+                self.logger.debug(f"reusing previous output of {pname}")
+                docs = replace_run_id(snap.documents, prev.run_id, ri.id)
+            else:
+                docs = [res.dump() for res in outputs[pname]]
+            snapshots[pname] = ProviderSnapshot(fingerprints[pname], docs)
+
+        state = RenderState(system, ri.id, snapshots)
+        return [doc for snap in snapshots.values() for doc in snap.documents], state
+
+    def _run_ctx(self, ri: RunInfo) -> RunContext:
+        return self.root_ctx.with_run_info(ri, Memo(self.batch_memo))
+
+    def _execute(
+        self, ctx: RunContext, data: T, pnames: list[str]
+    ) -> dict[str, Sequence[Resource]]:
+        """Executes given providers, ones missing in pnames are considered done"""
+        if any(isinstance(self.providers[p], AsyncResourceProvider) for p in pnames):
+            return _run_coroutine(self._aexecute(ctx, data, pnames))
+        if self.concurrency > 1:
+            return dict(self._iter_concurrent(ctx, data, pnames))
+        return dict(self._iter_sequential(ctx, data, pnames))
+
+    async def _aexecute(
+        self, ctx: RunContext, data: T, pnames: list[str]
+    ) -> dict[str, Sequence[Resource]]:
+        if self.concurrency == 1:
+            return {
+                pname: await self._aexecute_provider(ctx, pname, data)
+                for pname in self._sequential_order(pnames)
+            }
+        self._check_dependencies()
+
+        sem = asyncio.Semaphore(self.concurrency)
+
+        async def execute(pname: str) -> Sequence[Resource]:
+            async with sem:
+                return await self._aexecute_provider(ctx, pname, data)
+
+        outputs: dict[str, Sequence[Resource]] = {}
+        pending = list(pnames)
+        running: dict[asyncio.Task, str] = {}
+        try:
+            while len(pending) > 0 or len(running) > 0:
+                for pname in self._ready_providers(pending, running.values()):
+                    pending.remove(pname)
+                    running[asyncio.create_task(execute(pname))] = pname
+
+                if len(running) == 0:
+                    raise ProviderDependencyError(
+                        pending[0], "dependencies could not be satisfied"
+                    )
+
+                done, _ = await asyncio.wait(
+                    running, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    outputs[running.pop(task)] = task.result()
+        finally:
+            for task in running:
+                task.cancel()
+        return outputs
+
+    def _check_dependencies(self):
+        for pname, provider in self.providers.items():
+            for dep in provider.depends_on:
+                if dep not in self.providers:
+                    raise ProviderDependencyError(pname, f"unknown dependency {dep}")
+
+    def _sequential_order(self, pnames: list[str]) -> list[str]:
+        """Providers in configured order, except that provider is moved after
+        providers it depends on
+        """
+        self._check_dependencies()
+
+        order: list[str] = []
+        pending = list(pnames)
+        while len(pending) > 0:
+            for pname in pending:
+                if all(dep not in pending for dep in self.providers[pname].depends_on):
+                    break
+            else:
+                raise ProviderDependencyError(
+                    pending[0], "dependencies could not be satisfied"
+                )
+            pending.remove(pname)
+            order.append(pname)
+        return order
 
-    def _execute_provider(self, ctx: RunContext, pname: str, data: T):
+    def _iter_sequential(
+        self, ctx: RunContext, data: T, pnames: list[str]
+    ) -> Iterator[tuple[str, Sequence[Resource]]]:
+        """Executes providers one by one in dependency order, yielding their
+        outputs as they are done
+        """
+        for pname in self._sequential_order(pnames):
+            yield pname, self._execute_provider(ctx, pname, data)
+
+    def _iter_concurrent(
+        self, ctx: RunContext, data: T, pnames: list[str]
+    ) -> Iterator[tuple[str, Sequence[Resource]]]:
+        """Executes providers on thread pool yielding their outputs
+        in completion order
+        """
+        self._check_dependencies()
+
+        pool = self._thread_pool()
+        pending = list(pnames)
+        running: dict[Future, str] = {}
+        try:
+            while len(pending) > 0 or len(running) > 0:
+                for pname in self._ready_providers(pending, running.values()):
+                    pending.remove(pname)
+                    fut = pool.submit(
+                        contextvars.copy_context().run,
+                        self._execute_provider,
+                        ctx,
+                        pname,
+                        data,
+                    )
+                    running[fut] = pname
+
+                if len(running) == 0:
+                    raise ProviderDependencyError(
+                        pending[0], "dependencies could not be satisfied"
+                    )
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    yield running.pop(fut), fut.result()
+        finally:
+            # pool outlives the run, so leftovers of failed run are awaited here
+            for fut in running:
+                fut.cancel()
+            wait(running)
+
+    def _thread_pool(self) -> ThreadPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.concurrency, thread_name_prefix="pcdf-provider"
+                )
+            return self._pool
+
+    def _ready_providers(
+        self,
+        pending: list[str],
+        running: Collection[str],
+    ) -> list[str]:
+        """Returns pending providers which could be started right now.
+        Provider without concurrency declarations acts as a barrier: it starts
+        only after every provider before it finished (but ones waiting for
+        providers after it) and runs alone.
+        """
+        if any(not self.providers[p].is_concurrent() for p in running):
+            return []
+
+        ready = []
+        for pname in pending:
+            provider = self.providers[pname]
+            if not provider.is_concurrent():
+                if len(ready) == 0 and len(running) == 0:
+                    ready.append(pname)
+                break
+            if all(
+                dep not in pending and dep not in running for dep in provider.depends_on
+            ):
+                ready.append(pname)
+        return ready
+
+    def _execute_provider(
+        self, ctx: RunContext, pname: str, data: T
+    ) -> Sequence[Resource]:
+        self.logger.debug(f"executing {pname}")
         ctx = ctx.with_values({"pname": pname})
+        prof = profiling.current()
         provider = self.providers[pname]
         plog = self.logger.getChild(pname)
 
         if type(provider).pre_hook != AbstractResourceProvider.pre_hook:
             stlog = plog.getChild(ExecutionStage.PRE_HOOK.value)
             try:
-                provider.pre_hook(stlog, ctx)
+                with _stage_span(prof, pname, ExecutionStage.PRE_HOOK):
+                    provider.pre_hook(stlog, ctx)
             except Exception as err:
                 raise ProviderExecutionError(ExecutionStage.PRE_HOOK, pname, err)
 
         try:
-            self.resources += provider.execute(plog, ctx, data)
+            with (
+                _stage_span(prof, pname, ExecutionStage.MAIN),
+                construction.trusted(self.trusted),
+                memo.activate(ctx.memo),
+            ):
+                resources = provider.execute(plog, ctx, data)
         except Exception as err:
             raise ProviderExecutionError(ExecutionStage.MAIN, pname, err)
+        self._verify(prof, pname, resources)
 
         if type(provider).post_hook != AbstractResourceProvider.post_hook:
             stlog = plog.getChild(ExecutionStage.POST_HOOK.value)
             try:
-                provider.post_hook(stlog, ctx)
+                with _stage_span(prof, pname, ExecutionStage.POST_HOOK):
+                    provider.post_hook(stlog, ctx)
             except Exception as err:
                 raise ProviderExecutionError(ExecutionStage.POST_HOOK, pname, err)
+
+        return resources
+
+    async def _aexecute_provider(
+        self, ctx: RunContext, pname: str, data: T
+    ) -> Sequence[Resource]:
+        provider = self.providers[pname]
+        if not isinstance(provider, AsyncResourceProvider):
+            return await asyncio.get_running_loop().run_in_executor(
+                self._thread_pool(),
+                contextvars.copy_context().run,
+                self._execute_provider,
+                ctx,
+                pname,
+                data,
+            )
+
+        self.logger.debug(f"executing {pname}")
+        ctx = ctx.with_values({"pname": pname})
+        prof = profiling.current()
+        plog = self.logger.getChild(pname)
+
+        if type(provider).pre_hook != AsyncResourceProvider.pre_hook:
+            stlog = plog.getChild(ExecutionStage.PRE_HOOK.value)
+            try:
+                with _stage_span(prof, pname, ExecutionStage.PRE_HOOK):
+                    await provider.pre_hook(stlog, ctx)
+            except Exception as err:
+                raise ProviderExecutionError(ExecutionStage.PRE_HOOK, pname, err)
+
+        try:
+            with (
+                _stage_span(prof, pname, ExecutionStage.MAIN),
+                construction.trusted(self.trusted),
+                memo.activate(ctx.memo),
+            ):
+                resources = await provider.execute(plog, ctx, data)
+        except Exception as err:
+            raise ProviderExecutionError(ExecutionStage.MAIN, pname, err)
+        self._verify(prof, pname, resources)
+
+        if type(provider).post_hook != AsyncResourceProvider.post_hook:
+            stlog = plog.getChild(ExecutionStage.POST_HOOK.value)
+            try:
+                with _stage_span(prof, pname, ExecutionStage.POST_HOOK):
+                    await provider.post_hook(stlog, ctx)
+            except Exception as err:
+                raise ProviderExecutionError(ExecutionStage.POST_HOOK, pname, err)
+
+        return resources
+
+    def _verify(self, prof: Profiler | None, pname: str, resources: Sequence[Resource]):
+        if not self.verify:
+            return
+        try:
+            with _stage_span(prof, pname, ExecutionStage.VERIFY):
+                for res in resources:
+                    res.validate()
+        except Exception as err:
+            raise ProviderExecutionError(ExecutionStage.VERIFY, pname, err)
+
+
+def _run_coroutine[R](coro: Coroutine[Any, Any, R]) -> R:
+    """Runs coroutine to completion from sync code. Event loop of the caller
+    could not be re-entered, so if there is one coroutine gets its own loop
+    in another thread (use arun from async code instead).
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(1, thread_name_prefix="pcdf-loop") as pool:
+        return pool.submit(contextvars.copy_context().run, asyncio.run, coro).result()
+
+
+def _stage_span(
+    prof: Profiler | None, pname: str, stage: ExecutionStage
+) -> AbstractContextManager[None]:
+    if prof is None:
+        return nullcontext()
+    return prof.span(pname, f"provider.{stage.value}")
@@ -0,0 +1,93 @@
+import hashlib
+import json
+from collections.abc import Mapping
+from dataclasses import asdict, dataclass
+from typing import Any, Self
+
+from pydantic_core import to_jsonable_python
+
+from pcdf.core.context import SystemInfo
+from pcdf.core.resource import (
+    AbstractResourceProvider,
+    UndefinedDatamodelError,
+    datamodel_fields,
+)
+
+
+@dataclass
+class ProviderSnapshot:
+    """Dumped output of provider with fingerprint of inputs it was built from"""
+
+    fingerprint: str | None
+    documents: list[dict[str, Any]]
+
+
+@dataclass
+class RenderState:
+    """Per-provider outputs of a run, used to render the next run incrementally"""
+
+    system: SystemInfo
+    run_id: str
+    providers: dict[str, ProviderSnapshot]
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, d: dict[str, Any]) -> Self:
+        return cls(
+            system=SystemInfo(**d["system"]),
+            run_id=d["run_id"],
+            providers={
+                pname: ProviderSnapshot(**snap)
+                for pname, snap in d["providers"].items()
+            },
+        )
+
+
+def provider_fingerprints(
+    providers: Mapping[str, AbstractResourceProvider], data: Any
+) -> dict[str, str | None]:
+    """Computes fingerprint of datamodel fields read by every provider and its
+    mutators. Fingerprint is None when some entity has no Datamodel declared,
+    so its inputs are unknown.
+    """
+    digests: dict[str, str] = {}
+
+    def field_digest(field: str) -> str:
+        if (digest := digests.get(field)) is None:
+            value = to_jsonable_python(getattr(data, field, None))
+            digest = hashlib.sha256(
+                json.dumps(value, sort_keys=True, separators=(",", ":")).encode()
+            ).hexdigest()
+            digests[field] = digest
+        return digest
+
+    fingerprints: dict[str, str | None] = {}
+    for pname, provider in providers.items():
+        h = hashlib.sha256()
+        fields: set[str] = set()
+        try:
+            for ent in [type(provider), *[type(m) for m in provider.mutators]]:
+                h.update(f"{ent.fqname()}\0{ent.cache_salt()}\0".encode())
+                fields |= datamodel_fields(ent).keys()
+        except UndefinedDatamodelError:
+            fingerprints[pname] = None
+            continue
+        for field in sorted(fields):
+            h.update(f"{field}\0{field_digest(field)}\0".encode())
+        fingerprints[pname] = h.hexdigest()
+    return fingerprints
+
+
+def replace_run_id(obj: Any, old: str, new: str) -> Any:
+    """Returns copy of dumped documents with old run id values replaced"""
+    match obj:
+        case dict():
+            return {k: replace_run_id(v, old, new) for k, v in obj.items()}
+        case list():
+            return [replace_run_id(v, old, new) for v in obj]
+        case str() if obj == old:
+            return new
+        case _:
+            return obj
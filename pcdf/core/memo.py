@@ -0,0 +1,120 @@
+import threading
+from collections.abc import Callable, Hashable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from enum import Enum
+from logging import DEBUG, Logger
+from typing import Any
+
+
+class MemoScope(str, Enum):
+    RUN = "run"
+    """Value lives while single datamodel is rendered, it may be derived
+    from the datamodel"""
+    BATCH = "batch"
+    """Value is shared by runs of factory having batch store (e.g. every
+    values file of render --batch), so it must depend on key arguments only"""
+
+
+@dataclass(frozen=True)
+class MemoKey[V]:
+    """Typed name of memoized value, declared once next to code using it:
+
+    IMAGE_DIGEST = MemoKey[str]("myorg.image-digest", MemoScope.BATCH)
+    """
+
+    name: str
+    scope: MemoScope = MemoScope.RUN
+
+
+@dataclass
+class MemoStats:
+    hits: int = 0
+    misses: int = 0
+
+
+class MemoStore:
+    """Thread safe store of computed values counting hits and misses"""
+
+    __slots__ = ["_values", "_stats", "_lock"]
+
+    def __init__(self):
+        self._values: dict[tuple[str, tuple[Hashable, ...]], Any] = {}
+        self._stats: dict[str, MemoStats] = {}
+        self._lock = threading.Lock()
+
+    def get[V](self, key: MemoKey[V], compute: Callable[..., V], *args: Hashable) -> V:
+        """Returns value of key for args, computed by compute(*args) on
+        first request. Compute runs unlocked, so value requested by several
+        threads at once could be computed more than once, first one is kept.
+        """
+        k = (key.name, args)
+        with self._lock:
+            stats = self._stats.setdefault(key.name, MemoStats())
+            if k in self._values:
+                stats.hits += 1
+                return self._values[k]
+            stats.misses += 1
+        value = compute(*args)
+        with self._lock:
+            return self._values.setdefault(k, value)
+
+    def stats(self) -> dict[str, MemoStats]:
+        with self._lock:
+            return {
+                name: MemoStats(s.hits, s.misses) for name, s in self._stats.items()
+            }
+
+    def log_stats(self, log: Logger, scope: MemoScope):
+        if not log.isEnabledFor(DEBUG):
+            return
+        for name, s in sorted(self.stats().items()):
+            log.debug(f"memo {scope.value} {name}: {s.hits} hits, {s.misses} misses")
+
+
+class Memo:
+    """Memoization facility of a run: its own store and, if factory has
+    one, the batch store shared with other runs
+    """
+
+    __slots__ = ["run", "batch"]
+
+    def __init__(self, batch: MemoStore | None = None):
+        self.run = MemoStore()
+        self.batch = batch
+
+    def get[V](self, key: MemoKey[V], compute: Callable[..., V], *args: Hashable) -> V:
+        """See MemoStore.get. Batch scoped keys are kept in run store when
+        there is no batch store.
+        """
+        if key.scope == MemoScope.BATCH and self.batch is not None:
+            return self.batch.get(key, compute, *args)
+        return self.run.get(key, compute, *args)
+
+
+_active: ContextVar[Memo | None] = ContextVar("pcdf_memo", default=None)
+
+
+def current() -> Memo | None:
+    """Returns memo of run executing current provider"""
+    return _active.get()
+
+
+@contextmanager
+def activate(memo: Memo) -> Iterator[Memo]:
+    """Makes memo current for code executed within context"""
+    token = _active.set(memo)
+    try:
+        yield memo
+    finally:
+        _active.reset(token)
+
+
+def memoize[V](key: MemoKey[V], compute: Callable[..., V], *args: Hashable) -> V:
+    """Memoizes value in current run, for code having no RunContext at hand
+    (e.g. mutators). Outside of factory run value is just computed.
+    """
+    if (memo := _active.get()) is None:
+        return compute(*args)
+    return memo.get(key, compute, *args)
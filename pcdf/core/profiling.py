@@ -0,0 +1,199 @@
+import threading
+import time
+import tracemalloc
+from collections.abc import Iterable, Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass(frozen=True)
+class Span:
+    """Single measured piece of execution. Times are in nanoseconds"""
+
+    name: str
+    category: str
+    start: int
+    wall: int
+    cpu: int
+    mem_peak: int | None
+    thread: int
+
+
+class Profiler:
+    """Records wall time, CPU time and optionally tracemalloc peak of spans.
+
+    Memory peak of nested spans is accounted to their parents, but spans
+    running concurrently in several threads share one tracemalloc peak.
+    """
+
+    __slots__ = ["spans", "trace_memory", "origin", "_lock", "_local"]
+
+    def __init__(self, trace_memory: bool = False):
+        self.spans: list[Span] = []
+        self.trace_memory = trace_memory
+        self.origin = time.perf_counter_ns()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def span(self, name: str, category: str) -> Iterator[None]:
+        frame = self._enter_memory() if self.trace_memory else None
+        start = time.perf_counter_ns()
+        cpu = time.thread_time_ns()
+        try:
+            yield
+        finally:
+            self._record(
+                name,
+                category,
+                start,
+                time.perf_counter_ns() - start,
+                time.thread_time_ns() - cpu,
+                None if frame is None else self._exit_memory(frame),
+            )
+
+    def _record(
+        self,
+        name: str,
+        category: str,
+        start: int,
+        wall: int,
+        cpu: int,
+        mem_peak: int | None,
+    ):
+        span = Span(name, category, start, wall, cpu, mem_peak, threading.get_ident())
+        with self._lock:
+            self.spans.append(span)
+
+    def _enter_memory(self) -> list[int]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        current, _ = tracemalloc.get_traced_memory()
+        if len(stack) == 0:
+            tracemalloc.reset_peak()
+        # [memory at start, highest peak reported by finished children]
+        frame = [current, 0]
+        stack.append(frame)
+        return frame
+
+    def _exit_memory(self, frame: list[int]) -> int:
+        stack = self._local.stack
+        _, peak = tracemalloc.get_traced_memory()
+        peak = max(peak, frame[1])
+        # async tasks sharing the thread may finish spans out of order
+        i = next(i for i, f in enumerate(stack) if f is frame)
+        del stack[i]
+        if i > 0:
+            stack[i - 1][1] = max(stack[i - 1][1], peak)
+        return peak - frame[0]
+
+    def summary(self) -> list[tuple[str, str, int, int, int, int | None]]:
+        """Aggregates spans by category and name.
+        Returns (category, name, calls, wall, cpu, max mem peak) rows sorted
+        by total wall time.
+        """
+        rows: dict[tuple[str, str], list[Any]] = {}
+        with self._lock:
+            spans = list(self.spans)
+        for s in spans:
+            row = rows.setdefault((s.category, s.name), [0, 0, 0, None])
+            row[0] += 1
+            row[1] += s.wall
+            row[2] += s.cpu
+            if s.mem_peak is not None:
+                row[3] = max(row[3] or 0, s.mem_peak)
+        return sorted(
+            ((cat, name, *row) for (cat, name), row in rows.items()),
+            key=lambda r: r[3],
+            reverse=True,
+        )
+
+    def format_summary(self) -> str:
+        header = ("category", "name", "calls", "wall ms", "cpu ms", "peak KiB")
+        rows = [
+            (
+                cat,
+                name,
+                str(calls),
+                f"{wall / 1e6:.3f}",
+                f"{cpu / 1e6:.3f}",
+                "-" if mem is None else f"{mem / 1024:.1f}",
+            )
+            for cat, name, calls, wall, cpu, mem in self.summary()
+        ]
+        widths = [max(len(r[i]) for r in [header, *rows]) for i in range(len(header))]
+        return "\n".join(
+            "  ".join(
+                col.ljust(w) if i < 2 else col.rjust(w)
+                for i, (col, w) in enumerate(zip(row, widths))
+            )
+            for row in [header, *rows]
+        )
+
+    def chrome_trace(self) -> dict[str, Any]:
+        """Returns spans in Chrome trace event format, readable by Perfetto"""
+        with self._lock:
+            spans = list(self.spans)
+        events = []
+        for s in spans:
+            args: dict[str, Any] = {"cpu_ms": s.cpu / 1e6}
+            if s.mem_peak is not None:
+                args["mem_peak_bytes"] = s.mem_peak
+            events.append(
+                {
+                    "name": s.name,
+                    "cat": s.category,
+                    "ph": "X",
+                    "ts": (s.start - self.origin) / 1e3,
+                    "dur": s.wall / 1e3,
+                    "pid": 0,
+                    "tid": s.thread,
+                    "args": args,
+                }
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+_active: ContextVar[Profiler | None] = ContextVar("pcdf_profiler", default=None)
+
+
+def current() -> Profiler | None:
+    """Returns profiler active in current context"""
+    return _active.get()
+
+
+@contextmanager
+def activate(profiler: Profiler) -> Iterator[Profiler]:
+    """Makes profiler active for code executed within context.
+    Worker threads started by ResourceFactory inherit it.
+    """
+    token = _active.set(profiler)
+    try:
+        yield profiler
+    finally:
+        _active.reset(token)
+
+
+def span(name: str, category: str) -> AbstractContextManager[None]:
+    """Measures span with active profiler, does nothing without one"""
+    if (prof := _active.get()) is None:
+        return nullcontext()
+    return prof.span(name, category)
+
+
+def consumer_spans[V](items: Iterable[V], name: str, category: str) -> Iterator[V]:
+    """Yields items measuring time consumer spends on each of them, e.g. the
+    serialization of streamed resources. Time spent producing items is not
+    included.
+    """
+    if (prof := _active.get()) is None:
+        yield from items
+        return
+    for item in items:
+        with prof.span(name, category):
+            yield item
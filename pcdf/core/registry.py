@@ -0,0 +1,182 @@
+"""
+Discovery of providers and mutators shipped by installed packages.
+
+Packages register entities as entry points of groups pcdf.providers and
+pcdf.mutators, e.g. in pyproject.toml:
+
+    [project.entry-points."pcdf.providers"]
+    secret = "myorg.pcdf.secret:Provider"
+
+Settings then reference them by entry point name instead of importing them,
+so modules of entities are imported only once a render needs them.
+"""
+
+import functools
+import hashlib
+import importlib
+import json
+import os
+import site
+import sys
+from dataclasses import dataclass
+from importlib.metadata import entry_points
+
+PROVIDERS_GROUP = "pcdf.providers"
+MUTATORS_GROUP = "pcdf.mutators"
+GROUPS = (PROVIDERS_GROUP, MUTATORS_GROUP)
+
+
+@dataclass
+class EntityNotFoundError(Exception):
+    ref: str
+    group: str
+
+    def __str__(self):
+        return (
+            f"{self.ref} is neither {self.group} entry point nor importable "
+            "fqname (entry points are registered once package is installed)"
+        )
+
+
+@dataclass
+class IncorrectEntityError(Exception):
+    ref: str
+    expected: type
+
+    def __str__(self):
+        return f"{self.ref} is not a subclass of {self.expected.__qualname__}"
+
+
+def default_index_path() -> str:
+    base = os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache"))
+    return os.path.join(base, "pcdf", "entry-points.json")
+
+
+def fingerprint() -> str:
+    """Identifies set of installed distributions: mtimes of site directories
+    on sys.path change whenever a distribution is installed or removed there.
+    Other entries (current directory, directory of script, sources of
+    editable installs) are left out, their mtimes change with any file
+    written there.
+    """
+    sites = site_dirs()
+    h = hashlib.sha256()
+    for path in sys.path:
+        if os.path.abspath(path) not in sites:
+            continue
+        try:
+            h.update(f"{path}\0{os.stat(path).st_mtime_ns}\0".encode())
+        except OSError:
+            h.update(f"{path}\0\0".encode())
+    return h.hexdigest()
+
+
+def site_dirs() -> set[str]:
+    """Directories distributions are installed to"""
+    dirs = site.getsitepackages()
+    if site.ENABLE_USER_SITE:
+        dirs.append(site.getusersitepackages())
+    return {os.path.abspath(d) for d in dirs}
+
+
+class Registry:
+    """Entry points of entity groups, name -> "module:attr".
+
+    Scanning metadata of every installed distribution is slow, so index is
+    cached in file and reused while sys.path fingerprint is the same.
+    Empty path disables the file.
+    """
+
+    __slots__ = ["path", "_groups"]
+
+    def __init__(self, path: str = ""):
+        self.path = path
+        self._groups: dict[str, dict[str, str]] | None = None
+
+    def entry_points(self, group: str) -> dict[str, str]:
+        if self._groups is None:
+            self._groups = self._load()
+        return self._groups.get(group, {})
+
+    def _load(self) -> dict[str, dict[str, str]]:
+        fp = fingerprint()
+        if self.path != "":
+            try:
+                with open(self.path, "r") as file:
+                    index = json.load(file)
+                if index.get("fingerprint") == fp:
+                    return index["groups"]
+            except (OSError, ValueError, KeyError):
+                pass
+
+        groups: dict[str, dict[str, str]] = {}
+        for group in GROUPS:
+            eps = groups[group] = {}
+            # first distribution on sys.path wins, as with imports
+            for ep in entry_points(group=group):
+                eps.setdefault(ep.name, ep.value)
+
+        if self.path != "":
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                tmp = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp, "w") as file:
+                    json.dump({"fingerprint": fp, "groups": groups}, file)
+                os.replace(tmp, self.path)
+            except OSError:
+                pass
+        return groups
+
+
+_registry: Registry | None = None
+
+
+def registry() -> Registry:
+    global _registry
+    if _registry is None:
+        _registry = Registry(default_index_path())
+    return _registry
+
+
+def load_entity[T](ref: type[T] | str, group: str, base: type[T]) -> type[T]:
+    """Returns entity class referenced by entry point name of group or by
+    fqname (module.Class or module:Class). Classes are returned as is.
+    """
+    if isinstance(ref, type):
+        return ref
+    entity = _resolve(ref, group)
+    if not isinstance(entity, type) or not issubclass(entity, base):
+        raise IncorrectEntityError(ref, base)
+    return entity
+
+
+@functools.cache
+def _resolve(ref: str, group: str) -> object:
+    if ":" not in ref and (value := registry().entry_points(group).get(ref)):
+        ref = value
+    if ":" in ref:
+        module, _, attr = ref.partition(":")
+        return _getattr_path(importlib.import_module(module), attr, ref, group)
+
+    # fqname: longest importable prefix is the module, the rest is qualname
+    parts = ref.split(".")
+    for i in range(len(parts) - 1, 0, -1):
+        module = ".".join(parts[:i])
+        try:
+            mod = importlib.import_module(module)
+        except ModuleNotFoundError as err:
+            # error raised by the module itself is not about the reference
+            if err.name is None or not (module + ".").startswith(err.name + "."):
+                raise
+            continue
+        return _getattr_path(mod, ".".join(parts[i:]), ref, group)
+    raise EntityNotFoundError(ref, group)
+
+
+def _getattr_path(obj: object, path: str, ref: str, group: str) -> object:
+    try:
+        for name in path.split("."):
+            obj = getattr(obj, name)
+    except AttributeError:
+        raise EntityNotFoundError(ref, group) from None
+    return obj
@@ -1,19 +1,23 @@
 from abc import ABC, abstractmethod
 from collections.abc import Sequence
+from contextlib import nullcontext
 from dataclasses import dataclass
 from enum import Enum
 from logging import Logger
-from typing import Any, Protocol, Self
+from typing import Any, ClassVar, Protocol, Self
 
 from pydantic import BaseModel
 
+from pcdf.core import canonical, profiling
 from pcdf.core.context import RunContext
+from pcdf.core.workload import WorkloadIndex, pod_spec
 
 
 class ExecutionStage(Enum):
     PRE_HOOK = "pre_hook"
     MAIN = "main"
     POST_HOOK = "post_hook"
+    VERIFY = "verify"
 
 
 class Resource[V: BaseModel]:
@@ -22,10 +26,42 @@ class Resource[V: BaseModel]:
 
     def __init__(self, model: V) -> None:
         self.model = model
+        self._workload: WorkloadIndex | None = None
+
+    @property
+    def workload(self) -> WorkloadIndex | None:
+        """Indexed pod spec of workload resource, shared by its mutators.
+        None if resource has no pod spec, see pcdf.core.workload.pod_spec
+        """
+        if (pod := pod_spec(self.model)) is None:
+            return None
+        if self._workload is None or self._workload.pod is not pod:
+            self._workload = WorkloadIndex(pod)
+        return self._workload
 
     def dump(self) -> dict[str, Any]:
         return self.model.model_dump(exclude_none=True)
 
+    def dump_json(self) -> str:
+        return self.model.model_dump_json(exclude_none=True)
+
+    def canonical_json(self) -> str:
+        """Deterministic dump, same for every render of unchanged resource.
+        See pcdf.core.canonical
+        """
+        return canonical.canonical_json(self.dump())
+
+    def content_hash(self) -> str:
+        return canonical.content_hash(self.dump())
+
+    def validate(self):
+        """Validates model built in trusted mode (see pcdf.core.construction).
+        Raises pydantic.ValidationError, the model itself is left as is.
+        """
+        type(self.model).model_validate(
+            self.model.model_dump(by_alias=True, exclude_unset=True, warnings=False)
+        )
+
 
 class AbstractResourceMutator(ABC):
     """Abstract class for ResourceMutators"""
@@ -34,39 +70,107 @@ class AbstractResourceMutator(ABC):
     def fqname(cls) -> str:
         return f"{cls.__module__}.{cls.__qualname__}"
 
+    @classmethod
+    def cache_salt(cls) -> str:
+        """Extra render cache key component. Override it when mutator output
+        depends on anything besides datamodel (e.g. its own code revision)
+        """
+        return ""
+
     @abstractmethod
     def execute(self, log: Logger, data: Any, resource: Resource):
         pass
 
 
+class AsyncResourceMutator(AbstractResourceMutator):
+    """Abstract class for ResourceMutators awaiting I/O during execution.
+    Could be attached only to AsyncResourceProvider.
+    """
+
+    @abstractmethod
+    async def execute(  # type: ignore[override]
+        self, log: Logger, data: Any, resource: Resource
+    ):
+        pass
+
+
 @dataclass
 class ProviderExecutionError(Exception):
     stage: ExecutionStage
     provider_name: str
     wrapped_err: Exception
 
+    def __reduce__(self):
+        return (type(self), (self.stage, self.provider_name, self.wrapped_err))
+
     def __str__(self) -> str:  # pragma: no cover
         return f"{self.provider_name} execution failed on {self.stage.value} stage: {self.wrapped_err}"  # noqa: E501
 
 
+@dataclass
+class ProviderDependencyError(Exception):
+    """Raised then provider dependencies could not be satisfied"""
+
+    provider_name: str
+    reason: str
+
+    def __str__(self) -> str:
+        return f"unable to schedule {self.provider_name}: {self.reason}"
+
+
 class AbstractResourceProvider(ABC):
     """Abstract class for ResourceProviders"""
 
+    side_effect_free: ClassVar[bool] = False
+    """Provider neither affects nor depends on other providers, so it could be
+    executed concurrently with them. Hooks may still do blocking I/O"""
+
+    depends_on: ClassVar[tuple[str, ...]] = ()
+    """fqnames of providers which have to be executed before this one.
+    Provider declaring dependencies is executed concurrently with the rest"""
+
     mutators: list[AbstractResourceMutator]
 
     @classmethod
     def fqname(cls) -> str:
         return f"{cls.__module__}.{cls.__qualname__}"
 
+    @classmethod
+    def cache_salt(cls) -> str:
+        """Extra render cache key component. Override it when provider output
+        depends on anything besides datamodel (e.g. its own code revision)
+        """
+        return ""
+
+    @classmethod
+    def is_concurrent(cls) -> bool:
+        """Whether provider declared enough to be scheduled concurrently"""
+        return cls.side_effect_free or len(cls.depends_on) > 0
+
     def with_mutators(self, *mutators: AbstractResourceMutator) -> Self:
         """Configures ResourceProvider with given mutators.
         Mutators should inherit AbstractResourceMutator class.
         """
         self.mutators = []
         for m in mutators:
+            if isinstance(m, AsyncResourceMutator):
+                raise TypeError(
+                    f"{m.fqname()} is async and could not be used by {self.fqname()}"
+                )
             self.mutators.append(m)
         return self
 
+    def mutate(self, log: Logger, data: Any, resource: Resource):
+        """Applies configured mutators to resource in order"""
+        if (prof := profiling.current()) is None:
+            for mut in self.mutators:
+                mut.execute(log, data, resource)
+            return
+
+        for mut in self.mutators:
+            with prof.span(mut.fqname(), "mutator"):
+                mut.execute(log, data, resource)
+
     @abstractmethod
     def execute(
         self, log: Logger, ctx: RunContext, data: Any
@@ -83,6 +187,53 @@ class AbstractResourceProvider(ABC):
         return
 
 
+class AsyncResourceProvider(AbstractResourceProvider):
+    """Abstract class for ResourceProviders with awaitable stages.
+    Async providers are awaited concurrently by ResourceFactory, set
+    side_effect_free to False to execute provider alone instead.
+    """
+
+    side_effect_free = True
+
+    def with_mutators(self, *mutators: AbstractResourceMutator) -> Self:
+        """Configures ResourceProvider with given mutators.
+        Both sync and async mutators are accepted.
+        """
+        self.mutators = list(mutators)
+        return self
+
+    async def mutate(  # type: ignore[override]
+        self, log: Logger, data: Any, resource: Resource
+    ):
+        """Applies configured mutators to resource in order"""
+        prof = profiling.current()
+        for mut in self.mutators:
+            with nullcontext() if prof is None else prof.span(mut.fqname(), "mutator"):
+                if isinstance(mut, AsyncResourceMutator):
+                    await mut.execute(log, data, resource)
+                else:
+                    mut.execute(log, data, resource)
+
+    @abstractmethod
+    async def execute(  # type: ignore[override]
+        self, log: Logger, ctx: RunContext, data: Any
+    ) -> Sequence[Resource]:  # pragma: no cover
+        """main stage of Provider execution"""
+        ...
+
+    async def pre_hook(  # type: ignore[override]
+        self, log: Logger, ctx: RunContext
+    ):  # pragma: no cover
+        """pre_hook executed before main stage"""
+        return
+
+    async def post_hook(  # type: ignore[override]
+        self, log: Logger, ctx: RunContext
+    ):  # pragma: no cover
+        """post_hook executed after main stage"""
+        return
+
+
 class FqNamedEntity(Protocol):
     """Protocol for entities with fqname classmethod (e.g. AbstractResourceProvider).
     This method should be usefull for logging and error handling.
@@ -113,6 +264,45 @@ class ProtocolConformanceError(Exception):
         return f"input does not conform {self.protocol}. Missing fields: {self.unconformed}"
 
 
+@dataclass(init=False)
+class DatamodelConformanceError(ProtocolConformanceError):
+    """Raised then data does not conform Datamodel of one or more entities.
+    It's ProtocolConformanceError of every protocol listed in errors, so
+    handlers of the latter catch it as well.
+    """
+
+    errors: list[ProtocolConformanceError]
+
+    def __init__(self, errors: list[ProtocolConformanceError]):
+        super().__init__(
+            ", ".join(err.protocol for err in errors),
+            list(dict.fromkeys(f for err in errors for f in err.unconformed)),
+        )
+        self.errors = errors
+
+    def __reduce__(self):
+        return (type(self), (self.errors,))
+
+    def __str__(self) -> str:
+        return "\n".join(str(err) for err in self.errors)
+
+
+def datamodel_fields(cls: FqNamedEntity) -> dict[str, Any]:
+    """Returns fields declared by Datamodel protocol of given FqNamedEntity
+    with their annotations
+    """
+    try:
+        datamodel = getattr(cls, "Datamodel")
+    except AttributeError:
+        raise UndefinedDatamodelError(cls.fqname())
+
+    dmvars = vars(datamodel)
+    return {
+        field: dmvars["__annotations__"].get(field)
+        for field in dmvars["__protocol_attrs__"]
+    }
+
+
 def check_datamodel_conformance(cls: FqNamedEntity, input: BaseModel):
     """Checks datamodel conformance over Datamodel protocol of given FqNamedEntity"""
     try:
@@ -126,7 +316,7 @@ def check_datamodel_conformance(cls: FqNamedEntity, input: BaseModel):
             cls.fqname(),
             [
                 f"{field}: {dmvars["__annotations__"][field]}"
-                for field in set(dmvars["__protocol_attrs__"])
-                - set(input.model_dump().keys())
+                for field in sorted(dmvars["__protocol_attrs__"])
+                if not hasattr(input, field)
             ],
         )
@@ -3,25 +3,60 @@ from typing import Self
 
 from pydantic import BaseModel
 
+from pcdf.core.conformance import compile_conformance
 from pcdf.core.context import SystemInfo
+from pcdf.core.registry import MUTATORS_GROUP, PROVIDERS_GROUP, load_entity
 from pcdf.core.resource import (
     AbstractResourceMutator,
     AbstractResourceProvider,
+    DatamodelConformanceError,
+    ProtocolConformanceError,
     check_datamodel_conformance,
 )
 
 
 class Settings(BaseModel):
     class Resource(BaseModel):
-        provider: type[AbstractResourceProvider]
-        mutators: list[type[AbstractResourceMutator]]
+        """Provider with its mutators. Entities are given as classes or as
+        references imported on first use: entry point name (see
+        pcdf.core.registry) or fqname.
+        """
 
-        def with_mutators(self, *mutators: type[AbstractResourceMutator]) -> Self:
+        provider: type[AbstractResourceProvider] | str
+        mutators: list[type[AbstractResourceMutator] | str]
+
+        def with_mutators(self, *mutators: type[AbstractResourceMutator] | str) -> Self:
             self.mutators += list(mutators)
             return self
 
+        def provider_class(self) -> type[AbstractResourceProvider]:
+            return load_entity(self.provider, PROVIDERS_GROUP, AbstractResourceProvider)
+
+        def mutator_classes(self) -> list[type[AbstractResourceMutator]]:
+            return [
+                load_entity(mut, MUTATORS_GROUP, AbstractResourceMutator)
+                for mut in self.mutators
+            ]
+
+        def instantiate(self) -> AbstractResourceProvider:
+            """Returns provider with its mutators"""
+            return self.provider_class()().with_mutators(
+                *[mut() for mut in self.mutator_classes()]
+            )
+
+        def entities(
+            self,
+        ) -> list[type[AbstractResourceProvider] | type[AbstractResourceMutator]]:
+            return [self.provider_class(), *self.mutator_classes()]
+
     resources: list[Resource]
     version: str
+    concurrency: int = 1
+    trusted_construction: bool = False
+    """Models built by providers and mutators with pcdf.core.build are not
+    validated, see ResourceFactory.with_construction"""
+    verify_resources: bool = False
+    """Validate every resource built in trusted mode once it's done"""
     framework_version: str = pkg_version("pcdf")
 
     def get_system_info(self) -> SystemInfo:
@@ -31,8 +66,22 @@ class Settings(BaseModel):
 
 
 def validate_config(cfg: list[Settings.Resource], input: BaseModel):
-    """Checks if input datamodel conforms to"""
-    for res in cfg:
-        check_datamodel_conformance(res.provider, input)
-        for mut in res.mutators:
-            check_datamodel_conformance(mut, input)
+    """Checks if input datamodel conforms to Datamodel of every configured
+    entity. Raises DatamodelConformanceError listing all non-conforming ones.
+
+    Pydantic models are checked by compiled plan, so validating many inputs
+    of the same class costs one compilation.
+    """
+    entities = tuple(dict.fromkeys(ent for res in cfg for ent in res.entities()))
+    if isinstance(input, BaseModel):
+        compile_conformance(type(input), entities).check(input)
+        return
+
+    errors = []
+    for ent in entities:
+        try:
+            check_datamodel_conformance(ent, input)
+        except ProtocolConformanceError as err:
+            errors.append(err)
+    if len(errors) > 0:
+        raise DatamodelConformanceError(errors)
@@ -0,0 +1,138 @@
+from typing import Any
+
+
+def pod_spec(model: Any) -> Any | None:
+    """Returns pod spec of workload model: Pod, CronJob or any kind having
+    pod template (Deployment, StatefulSet, DaemonSet, Job...).
+    Returns None if model has none (yet).
+    """
+    if (spec := getattr(model, "spec", None)) is None:
+        return None
+    if hasattr(spec, "containers"):
+        return spec
+    if (job := getattr(spec, "jobTemplate", None)) is not None:
+        if (spec := job.spec) is None:
+            return None
+    if (template := getattr(spec, "template", None)) is None:
+        return None
+    return template.spec
+
+
+class _NamedList:
+    """Index by name of list field of model. It's rebuilt when the list
+    was replaced or resized bypassing the index, so direct edits of models
+    are still seen.
+    """
+
+    __slots__ = ["owner", "field", "_items", "_size", "_index", "_counts"]
+
+    def __init__(self, owner: Any, field: str):
+        self.owner = owner
+        self.field = field
+        self._items: list[Any] | None = None
+        self._size = 0
+        self._index: dict[str, Any] = {}
+        self._counts: dict[str, int] = {}
+
+    def index(self) -> dict[str, Any]:
+        if (items := getattr(self.owner, self.field)) is None:
+            return {}
+        if items is not self._items or len(items) != self._size:
+            self._items = items
+            self._size = len(items)
+            self._index = {}
+            self._counts = {}
+            for item in items:
+                if item.name in self._index:
+                    self._counts[item.name] = self._counts.get(item.name, 1) + 1
+                    continue
+                self._index[item.name] = item
+        return self._index
+
+    def count(self, name: str) -> int:
+        """Number of items named so, which is 1 in correct manifest"""
+        if name not in self.index():
+            return 0
+        return self._counts.get(name, 1)
+
+    def put(self, *items: Any):
+        """Appends items, replacing ones of the same name in place"""
+        if getattr(self.owner, self.field) is None:
+            setattr(self.owner, self.field, [])
+        index = self.index()
+        lst = getattr(self.owner, self.field)
+        positions: dict[str, int] | None = None
+        for item in items:
+            if index.get(item.name) is None:
+                lst.append(item)
+                if positions is not None:
+                    positions[item.name] = len(lst) - 1
+            else:
+                # positions are looked up once for all replaced items
+                if positions is None:
+                    positions = {it.name: i for i, it in reversed(list(enumerate(lst)))}
+                lst[positions[item.name]] = item
+            index[item.name] = item
+        self._items = lst
+        self._size = len(lst)
+
+
+class WorkloadIndex:
+    """Indexed view of workload's pod spec: containers, init containers,
+    volumes and env of containers by name.
+
+    Built once per resource (see Resource.workload). Entries added through
+    it keep the index consistent, changes made to models directly are
+    noticed as well.
+    """
+
+    __slots__ = ["pod", "_containers", "_init_containers", "_volumes", "_env"]
+
+    def __init__(self, pod: Any):
+        self.pod = pod
+        self._containers = _NamedList(pod, "containers")
+        self._init_containers = _NamedList(pod, "initContainers")
+        self._volumes = _NamedList(pod, "volumes")
+        self._env: dict[int, _NamedList] = {}
+
+    def containers(self) -> dict[str, Any]:
+        return self._containers.index()
+
+    def container(self, name: str) -> Any | None:
+        return self._containers.index().get(name)
+
+    def container_count(self, name: str) -> int:
+        return self._containers.count(name)
+
+    def init_containers(self) -> dict[str, Any]:
+        return self._init_containers.index()
+
+    def init_container(self, name: str) -> Any | None:
+        return self._init_containers.index().get(name)
+
+    def volumes(self) -> dict[str, Any]:
+        return self._volumes.index()
+
+    def volume(self, name: str) -> Any | None:
+        return self._volumes.index().get(name)
+
+    def put_volumes(self, *volumes: Any):
+        """Adds volumes, ones of the same name are replaced"""
+        self._volumes.put(*volumes)
+
+    def env(self, container: Any) -> dict[str, Any]:
+        """Env of given container (or init container) by variable name"""
+        return self._env_list(container).index()
+
+    def put_env(self, container: Any, *env: Any):
+        """Adds env variables to container, ones of the same name are
+        replaced. Container gets empty env even if there is nothing to add.
+        """
+        if container.env is None:
+            container.env = []
+        self._env_list(container).put(*env)
+
+    def _env_list(self, container: Any) -> _NamedList:
+        if (lst := self._env.get(id(container))) is None or lst.owner is not container:
+            lst = self._env[id(container)] = _NamedList(container, "env")
+        return lst
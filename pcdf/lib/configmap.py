@@ -1,22 +1,38 @@
 from collections.abc import Sequence
+from dataclasses import dataclass
 from logging import Logger
-from typing import  Protocol, runtime_checkable
-
-from kubemodels.io.k8s.api.core.v1 import (
-    ConfigMap,
-)
-from kubemodels.io.k8s.apimachinery.pkg.apis.meta.v1 import ObjectMeta
+from typing import  ClassVar, Protocol, runtime_checkable
 
 from pcdf import Settings
 from pcdf.core import (
     AbstractResourceProvider,
     Resource,
     RunContext,
+    build,
 )
 from pcdf.lib import datamodel, utils
 
+MAX_SHARD_SIZE = 900 * 1024
+"""Encoded size of documents packed into one ConfigMap by ShardedProvider.
+Kubernetes limits whole object to 1 MiB, the rest is left for metadata"""
+
+
+@dataclass
+class DocumentTooLargeError(Exception):
+    name: str
+    size: int
+    limit: int
+
+    def __str__(self) -> str:
+        return (
+            f"document '{self.name}' takes {self.size} bytes, "
+            f"which does not fit into ConfigMap of {self.limit} bytes"
+        )
+
 
 class Provider(AbstractResourceProvider):
+    side_effect_free = True
+
     @runtime_checkable
     class Datamodel(Protocol):
         metadata: datamodel.Metadata
@@ -25,24 +41,120 @@ class Provider(AbstractResourceProvider):
     def execute(
         self, log: Logger, ctx: RunContext, data: Datamodel
     ) -> Sequence[Resource]:
-        default_labels = utils.default_labels(data.metadata)
+        from kubemodels.io.k8s.api.core.v1 import ConfigMap
+        from kubemodels.io.k8s.apimachinery.pkg.apis.meta.v1 import ObjectMeta
+
         res = Resource(
-            ConfigMap(
+            build(
+                ConfigMap,
                 apiVersion="core/v1",
                 kind="ConfigMap",
-                metadata=ObjectMeta(
+                metadata=build(
+                    ObjectMeta,
                     name=data.metadata.name,
                     namespace=data.metadata.namespace,
-                    labels=default_labels | ctx.system.labels() | ctx.run.labels(),
+                    labels=utils.resource_labels(ctx, data.metadata),
                 ),
-                data={f.name: f.content for f in data.files},
+                data={f.name: f.read() for f in datamodel.documents(data.files)},
             )
         )
 
-        for mut in self.mutators:
-            mut.execute(log, data, res)
+        self.mutate(log, data, res)
 
         return [res]
 
 
 DEFAULT_CONFIG = Settings.Resource(provider=Provider, mutators=[])
+
+
+def encoded_size(doc: datamodel.Document) -> int:
+    """Bytes taken by document in ConfigMap data"""
+    return len(doc.name) + doc.size()
+
+
+def shard(
+    files: Sequence[datamodel.Document], limit: int = MAX_SHARD_SIZE
+) -> list[list[datamodel.Document]]:
+    """Packs documents into as few shards of at most limit bytes as it can
+    (first-fit decreasing). Packing depends only on documents, not on their
+    order, so provider and mounting mutator always agree on it. Glob
+    documents are expanded and packed file by file.
+    Raises DocumentTooLargeError if some document does not fit any shard.
+    """
+    sized = sorted(
+        ((encoded_size(f), f) for f in datamodel.documents(files)),
+        key=lambda sf: (-sf[0], sf[1].name),
+    )
+    shards: list[list[datamodel.Document]] = []
+    free: list[int] = []
+    for size, doc in sized:
+        if size > limit:
+            raise DocumentTooLargeError(doc.name, size, limit)
+        for i, room in enumerate(free):
+            if size <= room:
+                break
+        else:
+            i = len(shards)
+            shards.append([])
+            free.append(limit)
+        shards[i].append(doc)
+        free[i] -= size
+
+    for docs in shards:
+        docs.sort(key=lambda f: f.name)
+    return shards
+
+
+def shard_name(metadata: datamodel.Metadata, index: int) -> str:
+    return f"{metadata.name}-files-{index}"
+
+
+class ShardedProvider(AbstractResourceProvider):
+    """Same as Provider, but splits files into several ConfigMaps, each
+    below Kubernetes' object size limit. Must be mounted by
+    deployment.ShardedConfigmapMountMutator with the same max_size.
+
+    Contents of inline documents are shared with datamodel rather than
+    copied. ConfigMaps are serialized one by one, so output never holds more
+    than one shard at once.
+    """
+
+    side_effect_free = True
+    max_size: ClassVar[int] = MAX_SHARD_SIZE
+
+    @runtime_checkable
+    class Datamodel(Protocol):
+        metadata: datamodel.Metadata
+        files: list[datamodel.Document]
+
+    def execute(
+        self, log: Logger, ctx: RunContext, data: Datamodel
+    ) -> Sequence[Resource]:
+        from kubemodels.io.k8s.api.core.v1 import ConfigMap
+        from kubemodels.io.k8s.apimachinery.pkg.apis.meta.v1 import ObjectMeta
+
+        labels = utils.resource_labels(ctx, data.metadata)
+        resources = []
+        for i, docs in enumerate(shard(data.files, self.max_size)):
+            res = Resource(
+                build(
+                    ConfigMap,
+                    apiVersion="core/v1",
+                    kind="ConfigMap",
+                    metadata=build(
+                        ObjectMeta,
+                        name=shard_name(data.metadata, i),
+                        namespace=data.metadata.namespace,
+                        labels=dict(labels),
+                    ),
+                    data={f.name: f.read() for f in docs},
+                )
+            )
+            self.mutate(log, data, res)
+            resources.append(res)
+        log.debug(f"{len(data.files)} files packed into {len(resources)} ConfigMaps")
+
+        return resources
+
+
+SHARDED_CONFIG = Settings.Resource(provider=ShardedProvider, mutators=[])
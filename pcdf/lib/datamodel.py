@@ -1,6 +1,19 @@
-from typing import Literal, Union
-
-from pydantic import BaseModel, Field, ValidationInfo, field_validator
+import functools
+import glob
+import hashlib
+import mmap
+import os
+from typing import Literal, Self, Union
+
+from pydantic import (
+    BaseModel,
+    Field,
+    PrivateAttr,
+    ValidationInfo,
+    computed_field,
+    field_validator,
+    model_validator,
+)
 
 
 class Metadata(BaseModel):
@@ -91,8 +104,144 @@ class CertManager(BaseModel):
 
 
 class Document(BaseModel):
-    name: str
-    content: str
+    """File mounted from ConfigMap. Content is either given inline or read
+    from path (file or glob pattern) relative to values file. Files are read
+    only when manifests are built, so large ones are not parsed as yaml nor
+    held by datamodel.
+    """
+
+    name: str = Field(
+        default="", description="File name, defaults to base name of path"
+    )
+    content: str | None = Field(default=None, description="Inline content")
+    path: str | None = Field(
+        default=None,
+        description="File or glob pattern relative to values file, "
+        "every matched file becomes a document named after it",
+    )
+    # path is kept as given and resolved against directory of values file
+    # when files are read, so that dumps (render cache keys, state files) do
+    # not depend on where values are checked out
+    _base: str = PrivateAttr(default="")
+
+    @model_validator(mode="after")
+    def resolve_path(self, info: ValidationInfo) -> Self:
+        if (self.content is None) == (self.path is None):
+            raise ValueError("exactly one of content and path must be set")
+        if self.path is None:
+            if self.name == "":
+                raise ValueError("name must be set for inline content")
+            return self
+        if glob.has_magic(self.path) and self.name != "":
+            raise ValueError("name could not be set for glob pattern")
+        # values loaders pass directory of values file
+        context = info.context or {}
+        if not context.get("read_files", True):
+            raise ValueError("files could not be read here, use inline content")
+        self._base = context.get("values_dir", "")
+        if not glob.has_magic(self.path) and not os.path.isfile(self.file()):
+            raise ValueError(f"no such file: {self.file()}")
+        if self.name == "":
+            self.name = os.path.basename(self.path)
+        return self
+
+    def file(self) -> str:
+        """Path of file (or glob pattern) resolved against directory of
+        values file
+        """
+        assert self.path is not None
+        return os.path.join(self._base, self.path)
+
+    def expand(self) -> list["Document"]:
+        """Documents this one stands for: itself, or one per matched file
+        for glob pattern
+        """
+        if self.path is None or not glob.has_magic(self.path):
+            return [self]
+        docs = []
+        for p in sorted(glob.glob(self.path, root_dir=self._base or None)):
+            doc = Document.model_construct(name=os.path.basename(p), path=p)
+            doc._base = self._base
+            if os.path.isfile(doc.file()):
+                docs.append(doc)
+        return docs
+
+    def read(self) -> str:
+        if self.content is not None:
+            return self.content
+        with open(self.file(), "rb") as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return ""
+            # decoded straight from mapped pages, without intermediate bytes
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mem:
+                return str(mem, "utf-8")
+
+    def size(self) -> int:
+        """Content size in bytes of utf-8, files are not read"""
+        if self.content is not None:
+            # ascii content is the common case, its size is known without
+            # encoding a copy of it
+            if self.content.isascii():
+                return len(self.content)
+            return len(self.content.encode())
+        return sum(os.stat(d.file()).st_size for d in self.expand())
+
+    def input_files(self) -> list[str]:
+        """Files content is read from. Directories glob pattern matches files
+        in are included, from its first parent without glob characters on,
+        so that added and removed files are noticed by watchers.
+        """
+        if self.path is None:
+            return []
+        if not glob.has_magic(self.path):
+            return [self.file()]
+        patterns = []
+        root = os.path.dirname(self.path)
+        while glob.has_magic(root):
+            patterns.append(root)
+            root = os.path.dirname(root)
+        dirs = [root]
+        for pattern in reversed(patterns):
+            dirs += sorted(
+                d
+                for d in glob.glob(pattern, root_dir=self._base or None)
+                if os.path.isdir(os.path.join(self._base, d))
+            )
+        return [
+            *(os.path.normpath(os.path.join(self._base, d)) for d in dirs),
+            *(d.file() for d in self.expand()),
+        ]
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def digest(self) -> str | None:
+        """Hash of file content, so that dumped datamodel (and everything
+        keyed by it, e.g. render cache) changes with files
+        """
+        if self.path is None:
+            return None
+        h = hashlib.sha256()
+        for d in self.expand():
+            path = d.file()
+            h.update(f"{d.name}\0{_file_digest(path, *_stamp(path))}\0".encode())
+        return h.hexdigest()
+
+
+def _stamp(path: str) -> tuple[int, int]:
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+@functools.lru_cache(maxsize=1024)
+def _file_digest(path: str, mtime_ns: int, size: int) -> str:
+    """Streams file through hash, keyed by stamp to hash unchanged file once"""
+    with open(path, "rb") as file:
+        return hashlib.file_digest(file, "sha256").hexdigest()
+
+
+def documents(files: list[Document]) -> list[Document]:
+    """Expands glob documents"""
+    return [d for f in files for d in f.expand()]
 
 
 class ResourceReqPair(BaseModel):
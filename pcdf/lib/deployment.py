@@ -1,23 +1,13 @@
 from collections.abc import Sequence
 from dataclasses import dataclass
 from logging import Logger
-from typing import Protocol, runtime_checkable
-
-from kubemodels.io.k8s.api.apps.v1 import Deployment, DeploymentSpec
-from kubemodels.io.k8s.api.core.v1 import (
-    ConfigMapVolumeSource,
-    ResourceRequirements,
-    Container,
-    ContainerPort,
-    EnvVar,
-    KeyToPath,
-    PodSpec,
-    PodTemplateSpec,
-    Volume,
-    VolumeMount,
-)
-from kubemodels.io.k8s.apimachinery.pkg.apis.meta.v1 import LabelSelector, ObjectMeta
-from kubemodels.io.k8s.apimachinery.pkg.api.resource import Quantity
+from typing import TYPE_CHECKING, ClassVar, Protocol, runtime_checkable
+
+# kubemodels modules are large, they are imported by code building manifests
+# rather than on import of this module
+if TYPE_CHECKING:  # pragma: no cover
+    from kubemodels.io.k8s.api.apps.v1 import Deployment
+    from kubemodels.io.k8s.api.core.v1 import Container
 
 from pcdf import Settings
 from pcdf.core import (
@@ -25,8 +15,10 @@ from pcdf.core import (
     AbstractResourceProvider,
     Resource,
     RunContext,
+    WorkloadIndex,
+    build,
 )
-from pcdf.lib import datamodel, utils
+from pcdf.lib import configmap, datamodel, utils
 from pcdf.lib.exceptions import IncorrectManifestError
 
 
@@ -39,30 +31,45 @@ class MainContainersMiscountError(Exception):
         return f" has {self.count} container named '{self.mc_name}'. Expected only 1"
 
 
-def app_container(containers: list[Container], runtime_cfg: datamodel.Runtime):
+def app_container(containers: list["Container"], runtime_cfg: datamodel.Runtime):
     ct = [c for c in containers if c.name == runtime_cfg.containerName]
     if (ctlen := len(ct)) != 1:
         raise MainContainersMiscountError(runtime_cfg.containerName, ctlen)
     return ct[0]
 
 
+def workload(mutator: AbstractResourceMutator, resource: Resource) -> WorkloadIndex:
+    """Returns indexed pod spec of resource mutated by mutator.
+    Raises IncorrectManifestError if resource has none.
+    """
+    if (wl := resource.workload) is None:
+        raise IncorrectManifestError(type(mutator).__qualname__)
+    return wl
+
+
+def main_container(wl: WorkloadIndex, runtime_cfg: datamodel.Runtime) -> "Container":
+    """Same as app_container, looked up by index"""
+    name = runtime_cfg.containerName
+    if (count := wl.container_count(name)) != 1:
+        raise MainContainersMiscountError(name, count)
+    return wl.containers()[name]
+
+
 class EnvMutator(AbstractResourceMutator):
     @runtime_checkable
     class Datamodel(Protocol):
         envs: list[datamodel.EnvVar]
 
-    def execute(self, log: Logger, data: Datamodel, resource: Resource[Deployment]):
-        if resource.model.spec is None or resource.model.spec.template.spec is None:
-            raise IncorrectManifestError(self.__qualname__)
+    def execute(self, log: Logger, data: Datamodel, resource: Resource["Deployment"]):
+        wl = workload(self, resource)
 
-        containers = resource.model.spec.template.spec.containers
-        if len(containers) < 1:
-            return
+        from kubemodels.io.k8s.api.core.v1 import EnvVar
 
-        for container in containers:
-            if container.env is None:
-                container.env = []
-            container.env += [EnvVar(name=v.name, value=v.value) for v in data.envs]
+        for container in wl.containers().values():
+            wl.put_env(
+                container,
+                *[build(EnvVar, name=v.name, value=v.value) for v in data.envs],
+            )
 
 
 class RuntimeMutator(AbstractResourceMutator):
@@ -70,15 +77,15 @@ class RuntimeMutator(AbstractResourceMutator):
     class Datamodel(Protocol):
         runtime: datamodel.Runtime
 
-    def execute(self, log: Logger, data: Datamodel, resource: Resource[Deployment]):
-        if (spec := resource.model.spec) is None or spec.template.spec is None:
-            raise IncorrectManifestError(self.__qualname__)
-
-        ct = app_container(spec.template.spec.containers, data.runtime)
+    def execute(self, log: Logger, data: Datamodel, resource: Resource["Deployment"]):
+        ct = main_container(workload(self, resource), data.runtime)
         ct.image = f"{data.runtime.image}:{data.runtime.tag}"
         ct.command = data.runtime.entrypoint
         ct.args = data.runtime.command
 
+        # pod template found by workload is part of spec
+        if (spec := resource.model.spec) is None:
+            raise IncorrectManifestError(type(self).__qualname__)
         spec.replicas = data.runtime.replicas
 
 
@@ -88,19 +95,21 @@ class ResourcesMutator(AbstractResourceMutator):
         runtime: datamodel.Runtime
         resources: datamodel.Resources
 
-    def execute(self, log: Logger, data: Datamodel, resource: Resource[Deployment]):
-        if (spec := resource.model.spec) is None or spec.template.spec is None:
-            raise IncorrectManifestError(self.__qualname__)
+    def execute(self, log: Logger, data: Datamodel, resource: Resource["Deployment"]):
+        ct = main_container(workload(self, resource), data.runtime)
+
+        from kubemodels.io.k8s.api.core.v1 import ResourceRequirements
+        from kubemodels.io.k8s.apimachinery.pkg.api.resource import Quantity
 
-        ct = app_container(spec.template.spec.containers, data.runtime)
-        ct.resources = ResourceRequirements(
+        ct.resources = build(
+            ResourceRequirements,
             limits={
-                "cpu": Quantity(data.resources.limits.cpu),
-                "memory": Quantity(data.resources.limits.memory),
+                "cpu": build(Quantity, data.resources.limits.cpu),
+                "memory": build(Quantity, data.resources.limits.memory),
             },
             requests={
-                "cpu": Quantity(data.resources.requests.cpu),
-                "memory": Quantity(data.resources.requests.memory),
+                "cpu": build(Quantity, data.resources.requests.cpu),
+                "memory": build(Quantity, data.resources.requests.memory),
             },
         )
 
@@ -111,13 +120,13 @@ class ContainerPortMutator(AbstractResourceMutator):
         network: datamodel.Networking
         runtime: datamodel.Runtime
 
-    def execute(self, log: Logger, data: Datamodel, resource: Resource[Deployment]):
-        if (spec := resource.model.spec) is None or spec.template.spec is None:
-            raise IncorrectManifestError(self.__qualname__)
+    def execute(self, log: Logger, data: Datamodel, resource: Resource["Deployment"]):
+        ct = main_container(workload(self, resource), data.runtime)
+
+        from kubemodels.io.k8s.api.core.v1 import ContainerPort
 
-        ct = app_container(spec.template.spec.containers, data.runtime)
         ct.ports = [
-            ContainerPort(name=p.name, containerPort=p.number)
+            build(ContainerPort, name=p.name, containerPort=p.number)
             for p in data.network.ports
         ]
 
@@ -127,9 +136,9 @@ class DefaultContainerAnnotationMutator(AbstractResourceMutator):
     class Datamodel(Protocol):
         runtime: datamodel.Runtime
 
-    def execute(self, log: Logger, data: Datamodel, resource: Resource[Deployment]):
+    def execute(self, log: Logger, data: Datamodel, resource: Resource["Deployment"]):
         if (meta := resource.model.metadata) is None or meta.annotations is None:
-            raise IncorrectManifestError(self.__qualname__)
+            raise IncorrectManifestError(type(self).__qualname__)
 
         meta.annotations["kubectl.kubernetes.io/default-container"] = (
             data.runtime.containerName
@@ -144,33 +153,102 @@ class ConfigmapMountMutator(AbstractResourceMutator):
         runtime: datamodel.Runtime
         filesMountPath: str
 
-    def execute(self, log: Logger, data: Datamodel, resource: Resource[Deployment]):
-        if (spec := resource.model.spec) is None or spec.template.spec is None:
-            raise IncorrectManifestError(self.__qualname__)
-
+    def execute(self, log: Logger, data: Datamodel, resource: Resource["Deployment"]):
+        wl = workload(self, resource)
         if len(data.files) < 1:
             return
 
-        tplspec = spec.template.spec
-        if tplspec.volumes is None:
-            tplspec.volumes = []
-        tplspec.volumes.append(
-            Volume(
+        from kubemodels.io.k8s.api.core.v1 import (
+            ConfigMapVolumeSource,
+            KeyToPath,
+            Volume,
+            VolumeMount,
+        )
+
+        wl.put_volumes(
+            build(
+                Volume,
                 name="mounted-config",
-                configMap=ConfigMapVolumeSource(
+                configMap=build(
+                    ConfigMapVolumeSource,
                     name=data.metadata.name,
-                    items=[KeyToPath(key=f.name, path=f.name) for f in data.files],
+                    items=[
+                        build(KeyToPath, key=f.name, path=f.name)
+                        for f in datamodel.documents(data.files)
+                    ],
+                ),
+            )
+        )
+
+        ct = main_container(wl, data.runtime)
+        ct.volumeMounts = [
+            build(VolumeMount, mountPath=data.filesMountPath, name="mounted-config")
+        ]
+
+
+class ShardedConfigmapMountMutator(AbstractResourceMutator):
+    """Mounts ConfigMaps of configmap.ShardedProvider into one directory by
+    single projected volume
+    """
+
+    max_size: ClassVar[int] = configmap.MAX_SHARD_SIZE
+
+    @runtime_checkable
+    class Datamodel(Protocol):
+        metadata: datamodel.Metadata
+        files: list[datamodel.Document]
+        runtime: datamodel.Runtime
+        filesMountPath: str
+
+    def execute(self, log: Logger, data: Datamodel, resource: Resource["Deployment"]):
+        wl = workload(self, resource)
+        if len(data.files) < 1:
+            return
+
+        from kubemodels.io.k8s.api.core.v1 import (
+            ConfigMapProjection,
+            KeyToPath,
+            ProjectedVolumeSource,
+            Volume,
+            VolumeMount,
+            VolumeProjection,
+        )
+
+        wl.put_volumes(
+            build(
+                Volume,
+                name="mounted-config",
+                projected=build(
+                    ProjectedVolumeSource,
+                    sources=[
+                        build(
+                            VolumeProjection,
+                            configMap=build(
+                                ConfigMapProjection,
+                                name=configmap.shard_name(data.metadata, i),
+                                items=[
+                                    build(KeyToPath, key=f.name, path=f.name)
+                                    for f in docs
+                                ],
+                            ),
+                        )
+                        for i, docs in enumerate(
+                            configmap.shard(data.files, self.max_size)
+                        )
+                    ],
                 ),
             )
         )
 
-        ct = app_container(spec.template.spec.containers, data.runtime)
+        ct = main_container(wl, data.runtime)
         ct.volumeMounts = [
-            VolumeMount(mountPath=data.filesMountPath, name="mounted-config")
+            build(VolumeMount, mountPath=data.filesMountPath, name="mounted-config")
         ]
 
 
 class Provider(AbstractResourceProvider):
+    side_effect_free = True
+
     @runtime_checkable
     class Datamodel(Protocol):
         metadata: datamodel.Metadata
@@ -179,12 +257,21 @@ class Provider(AbstractResourceProvider):
     def execute(
         self, log: Logger, ctx: RunContext, data: Datamodel
     ) -> Sequence[Resource]:
-        default_labels = utils.default_labels(data.metadata)
+        from kubemodels.io.k8s.api.apps.v1 import Deployment, DeploymentSpec
+        from kubemodels.io.k8s.api.core.v1 import Container, PodSpec, PodTemplateSpec
+        from kubemodels.io.k8s.apimachinery.pkg.apis.meta.v1 import (
+            LabelSelector,
+            ObjectMeta,
+        )
+
+        default_labels = utils.run_default_labels(ctx, data.metadata)
         res = Resource(
-            Deployment(
+            build(
+                Deployment,
                 apiVersion="apps/v1",
                 kind="Deployment",
-                metadata=ObjectMeta(
+                metadata=build(
+                    ObjectMeta,
                     name=data.metadata.name,
                     namespace=data.metadata.namespace,
                     labels=default_labels
@@ -193,24 +280,28 @@ class Provider(AbstractResourceProvider):
                     | ctx.run.labels(),
                     annotations={},
                 ),
-                spec=DeploymentSpec(
-                    selector=LabelSelector(matchLabels=default_labels),
-                    template=PodTemplateSpec(
-                        metadata=ObjectMeta(labels=default_labels),
-                        spec=PodSpec(
+                spec=build(
+                    DeploymentSpec,
+                    selector=build(LabelSelector, matchLabels=default_labels),
+                    template=build(
+                        PodTemplateSpec,
+                        # not shared with selector, see pcdf.core.build
+                        metadata=build(ObjectMeta, labels=dict(default_labels)),
+                        spec=build(
+                            PodSpec,
                             containers=[
-                                Container(
+                                build(
+                                    Container,
                                     name=data.runtime.containerName,
                                 )
-                            ]
+                            ],
                         ),
                     ),
                 ),
             )
         )
 
-        for mut in self.mutators:
-            mut.execute(log, data, res)
+        self.mutate(log, data, res)
 
         return [res]
 
@@ -1,19 +1,11 @@
 from collections.abc import Sequence
 from logging import Logger
-from typing import Protocol, cast, runtime_checkable
-
-from kubemodels.io.k8s.api.networking.v1 import (
-    HTTPIngressPath,
-    HTTPIngressRuleValue,
-    Ingress,
-    IngressBackend,
-    IngressRule,
-    IngressServiceBackend,
-    IngressSpec,
-    IngressTLS,
-    ServiceBackendPort,
-)
-from kubemodels.io.k8s.apimachinery.pkg.apis.meta.v1 import ObjectMeta
+from typing import TYPE_CHECKING, Protocol, cast, runtime_checkable
+
+# kubemodels modules are large, they are imported by code building manifests
+# rather than on import of this module
+if TYPE_CHECKING:  # pragma: no cover
+    from kubemodels.io.k8s.api.networking.v1 import Ingress, ServiceBackendPort
 
 from pcdf import Settings
 from pcdf.core import (
@@ -21,6 +13,7 @@ from pcdf.core import (
     AbstractResourceProvider,
     Resource,
     RunContext,
+    build,
 )
 from pcdf.lib import datamodel, utils
 from pcdf.lib.exceptions import IncorrectManifestError
@@ -32,28 +25,43 @@ class RulesMutator(AbstractResourceMutator):
         metadata: datamodel.Metadata
         network: datamodel.Networking
 
-    def __publication_port(self, data: datamodel.Publication) -> ServiceBackendPort:
+    def __publication_port(self, data: datamodel.Publication) -> "ServiceBackendPort":
+        from kubemodels.io.k8s.api.networking.v1 import ServiceBackendPort
+
         match p := data.destPort:
             case str():
-                return ServiceBackendPort(name=cast("str", p))
+                return build(ServiceBackendPort, name=cast("str", p))
             case int():
-                return ServiceBackendPort(number=cast("int", p))
+                return build(ServiceBackendPort, number=cast("int", p))
             case _:
                 raise Exception("Unable to determine port type")
 
-    def execute(self, log: Logger, data: Datamodel, resource: Resource[Ingress]):
+    def execute(self, log: Logger, data: Datamodel, resource: Resource["Ingress"]):
         if (spec := resource.model.spec) is None or spec.rules is None:
-            raise IncorrectManifestError(self.__qualname__)
+            raise IncorrectManifestError(type(self).__qualname__)
+
+        from kubemodels.io.k8s.api.networking.v1 import (
+            HTTPIngressPath,
+            HTTPIngressRuleValue,
+            IngressBackend,
+            IngressRule,
+            IngressServiceBackend,
+        )
 
         for r in data.network.publicate:
             spec.rules.append(
-                IngressRule(
+                build(
+                    IngressRule,
                     host=r.host,
-                    http=HTTPIngressRuleValue(
+                    http=build(
+                        HTTPIngressRuleValue,
                         paths=[
-                            HTTPIngressPath(
-                                backend=IngressBackend(
-                                    service=IngressServiceBackend(
+                            build(
+                                HTTPIngressPath,
+                                backend=build(
+                                    IngressBackend,
+                                    service=build(
+                                        IngressServiceBackend,
                                         name=data.metadata.name
                                         if (rdo := r.destOverride) is None
                                         else rdo,
@@ -75,15 +83,18 @@ class TlsMutator(AbstractResourceMutator):
         metadata: datamodel.Metadata
         network: datamodel.Networking
 
-    def execute(self, log: Logger, data: Datamodel, resource: Resource[Ingress]):
+    def execute(self, log: Logger, data: Datamodel, resource: Resource["Ingress"]):
         if not data.network.tls:
             return
 
         if (spec := resource.model.spec) is None or spec.rules is None:
-            raise IncorrectManifestError(self.__qualname__)
+            raise IncorrectManifestError(type(self).__qualname__)
+
+        from kubemodels.io.k8s.api.networking.v1 import IngressTLS
 
         spec.tls = [
-            IngressTLS(
+            build(
+                IngressTLS,
                 hosts=[pub.host for pub in data.network.publicate],
                 secretName=f"{data.metadata.name}{data.network.tlsSecretSuffix}",
             )
@@ -96,12 +107,12 @@ class CertManagerMutator(AbstractResourceMutator):
         network: datamodel.Networking
         certmanager: datamodel.CertManager
 
-    def execute(self, log: Logger, data: Datamodel, resource: Resource[Ingress]):
+    def execute(self, log: Logger, data: Datamodel, resource: Resource["Ingress"]):
         if not data.network.tls:
             return
 
         if (meta := resource.model.metadata) is None:
-            raise IncorrectManifestError(self.__qualname__)
+            raise IncorrectManifestError(type(self).__qualname__)
 
         if meta.annotations is None:
             meta.annotations = {}
@@ -114,6 +125,8 @@ class CertManagerMutator(AbstractResourceMutator):
 
 
 class Provider(AbstractResourceProvider):
+    side_effect_free = True
+
     @runtime_checkable
     class Datamodel(Protocol):
         metadata: datamodel.Metadata
@@ -122,21 +135,26 @@ class Provider(AbstractResourceProvider):
     def execute(
         self, log: Logger, ctx: RunContext, data: Datamodel
     ) -> Sequence[Resource]:
-        default_labels = utils.default_labels(data.metadata)
+        from kubemodels.io.k8s.api.networking.v1 import Ingress, IngressSpec
+        from kubemodels.io.k8s.apimachinery.pkg.apis.meta.v1 import ObjectMeta
+
         res = Resource(
-            Ingress(
+            build(
+                Ingress,
                 apiVersion="networking.k8s.io/v1",
                 kind="Ingress",
-                metadata=ObjectMeta(
-                    labels=default_labels | ctx.system.labels() | ctx.run.labels(),
+                metadata=build(
+                    ObjectMeta,
+                    labels=utils.resource_labels(ctx, data.metadata),
                     annotations={},
                 ),
-                spec=IngressSpec(ingressClassName=data.network.ingressClass, rules=[]),
+                spec=build(
+                    IngressSpec, ingressClassName=data.network.ingressClass, rules=[]
+                ),
             )
         )
 
-        for mut in self.mutators:
-            mut.execute(log, data, res)
+        self.mutate(log, data, res)
 
         return [res]
 
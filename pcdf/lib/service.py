@@ -3,23 +3,19 @@ from collections.abc import Sequence
 from logging import Logger
 from typing import Protocol, runtime_checkable
 
-from kubemodels.io.k8s.api.core.v1 import (
-    Service,
-    ServicePort,
-    ServiceSpec,
-)
-from kubemodels.io.k8s.apimachinery.pkg.apis.meta.v1 import ObjectMeta
-
 from pcdf import Settings
 from pcdf.core import (
     AbstractResourceProvider,
     Resource,
     RunContext,
+    build,
 )
 from pcdf.lib import datamodel, utils
 
 
 class Provider(AbstractResourceProvider):
+    side_effect_free = True
+
     @runtime_checkable
     class Datamodel(Protocol):
         metadata: datamodel.Metadata
@@ -28,20 +24,28 @@ class Provider(AbstractResourceProvider):
     def execute(
         self, log: Logger, ctx: RunContext, data: Datamodel
     ) -> Sequence[Resource]:
-        default_labels = utils.default_labels(data.metadata)
+        from kubemodels.io.k8s.api.core.v1 import Service, ServicePort, ServiceSpec
+        from kubemodels.io.k8s.apimachinery.pkg.apis.meta.v1 import ObjectMeta
+
+        default_labels = utils.run_default_labels(ctx, data.metadata)
         res = Resource(
-            Service(
+            build(
+                Service,
                 apiVersion="core/v1",
                 kind="Service",
-                metadata=ObjectMeta(
+                metadata=build(
+                    ObjectMeta,
                     name=data.metadata.name,
                     namespace=data.metadata.namespace,
-                    labels=default_labels | ctx.system.labels() | ctx.run.labels(),
+                    labels=utils.resource_labels(ctx, data.metadata),
                 ),
-                spec=ServiceSpec(
+                spec=build(
+                    ServiceSpec,
                     selector=default_labels,
                     ports=[
-                        ServicePort(name=p.name, port=p.number, protocol=p.protocol)
+                        build(
+                            ServicePort, name=p.name, port=p.number, protocol=p.protocol
+                        )
                         for p in data.network.ports
                     ],
                     type=data.network.serviceType,
@@ -49,8 +53,7 @@ class Provider(AbstractResourceProvider):
             )
         )
 
-        for mut in self.mutators:
-            mut.execute(log, data, res)
+        self.mutate(log, data, res)
 
         return [res]
 
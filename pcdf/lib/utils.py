@@ -1,5 +1,9 @@
+from pcdf.core import MemoKey, RunContext
 from pcdf.lib.datamodel import Metadata
 
+DEFAULT_LABELS = MemoKey[dict[str, str]]("pcdf.lib.default-labels")
+RESOURCE_LABELS = MemoKey[dict[str, str]]("pcdf.lib.resource-labels")
+
 
 def default_labels(metadata: Metadata) -> dict[str, str]:
     return {
@@ -9,3 +13,22 @@ def default_labels(metadata: Metadata) -> dict[str, str]:
         "app.kubernetes.io/component": metadata.type,
         "app.kubernetes.io/managed-by": "progressive-cd",
     }
+
+
+def run_default_labels(ctx: RunContext, metadata: Metadata) -> dict[str, str]:
+    """Same as default_labels, computed once per run. Returns caller's own
+    copy, resources must not share mutable values
+    """
+    return dict(ctx.memo.get(DEFAULT_LABELS, lambda: default_labels(metadata)))
+
+
+def resource_labels(ctx: RunContext, metadata: Metadata) -> dict[str, str]:
+    """Default, system and run labels set on every resource, computed once
+    per run. Returns caller's own copy
+    """
+    return dict(
+        ctx.memo.get(
+            RESOURCE_LABELS,
+            lambda: default_labels(metadata) | ctx.system.labels() | ctx.run.labels(),
+        )
+    )
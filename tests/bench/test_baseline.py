@@ -0,0 +1,73 @@
+import pytest
+
+from pcdf.bench import (
+    Benchmark,
+    Report,
+    Result,
+    Scale,
+    ScaleMismatchError,
+    collect,
+    compare,
+    measure,
+)
+
+
+def result(name: str, median_ns: int, mad_ns: int = 0) -> Result:
+    return Result(name, "group", 10, median_ns, median_ns, mad_ns)
+
+
+def report(*results: Result, scale: Scale = Scale()) -> Report:
+    return Report(scale, {r.name: r for r in results})
+
+
+def test_measure_collects_min_samples():
+    calls = []
+    res = measure(Benchmark("op", "group", calls.append, lambda: (1,)), 0, 7)
+    # warm up call is not a sample
+    assert len(calls) == 8
+    assert res.samples == 7
+    assert res.min_ns <= res.median_ns
+    assert res.mad_ns >= 0
+
+
+def test_collected_benchmarks_run(tmp_path):
+    scale = Scale(ports=1, envs=1, publications=1, files=1, file_size=16, releases=1)
+    benches = collect(scale, str(tmp_path))
+    assert any(b.name.startswith("mutator/") for b in benches)
+    for bench in benches:
+        bench.op(*bench.setup())
+
+
+def test_compare_threshold():
+    baseline = report(result("a", 1000), result("b", 1000), result("gone", 1))
+    current = report(result("a", 1099), result("b", 1101), result("new", 1))
+
+    rows = {row.name: row for row in compare(baseline, current, 0.1)}
+    assert sorted(rows) == ["a", "b"]
+    assert not rows["a"].regressed
+    assert rows["b"].regressed
+    assert rows["b"].ratio == pytest.approx(1.101)
+
+
+def test_compare_tolerates_noise():
+    baseline = report(result("a", 1000, mad_ns=300))
+    assert not compare(baseline, report(result("a", 1250)), 0.1)[0].regressed
+    assert compare(baseline, report(result("a", 1350)), 0.1)[0].regressed
+
+
+def test_compare_rejects_other_scale():
+    with pytest.raises(ScaleMismatchError):
+        compare(report(), report(scale=Scale(envs=1)), 0.1)
+
+
+def test_report_round_trip(tmp_path):
+    path = str(tmp_path / "report.json")
+    original = report(result("a", 1000, 5), scale=Scale(ports=3))
+    original.save(path)
+    assert Report.load(path) == original
+
+
+def test_report_version_is_checked():
+    raw = report().to_dict() | {"version": 0}
+    with pytest.raises(ValueError):
+        Report.from_dict(raw)
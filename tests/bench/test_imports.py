@@ -0,0 +1,31 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from pcdf.bench.imports import DEFAULT_FORBIDDEN, median_profile
+
+IMPORT_BUDGET_MS = float(os.environ.get("IMPORT_BUDGET_MS", 250))
+
+
+@pytest.fixture(scope="module")
+def profile():
+    return median_profile(runs=3)
+
+
+def test_cold_start_loads_no_forbidden_modules(profile):
+    assert profile.loaded(list(DEFAULT_FORBIDDEN)) == []
+
+
+def test_cold_start_is_within_budget(profile):
+    assert profile.total_us / 1e3 <= IMPORT_BUDGET_MS
+
+
+def test_commands_are_exported_lazily():
+    statement = (
+        "import sys; from pcdf.cmd import render, render_batch; "
+        "assert callable(render) and callable(render_batch); "
+        "assert 'pcdf.cmd.overlay' not in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", statement], check=True)
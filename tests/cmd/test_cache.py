@@ -0,0 +1,89 @@
+import io
+import logging
+from typing import Any
+
+import pytest
+from pydantic import BaseModel
+
+from pcdf.cmd.cache import RUN_ID_PLACEHOLDER, RenderCache
+from pcdf.core import AbstractResourceProvider, RunInfo, Settings
+
+
+class Provider(AbstractResourceProvider):
+    def execute(self, log: logging.Logger, ctx: Any, data: Any):
+        return []
+
+
+class Salted(Provider):
+    salt = "1"
+
+    @classmethod
+    def cache_salt(cls) -> str:
+        return cls.salt
+
+
+class Values(BaseModel):
+    name: str
+
+
+def settings(provider: type[AbstractResourceProvider] = Provider, version="1"):
+    return Settings(
+        version=version,
+        resources=[Settings.Resource(provider=provider, mutators=[])],
+    )
+
+
+@pytest.fixture
+def cache(tmp_path) -> RenderCache:
+    return RenderCache(str(tmp_path / "cache"), 1024 * 1024)
+
+
+def test_key_is_stable(cache: RenderCache):
+    assert cache.key(settings(), Values(name="a")) == cache.key(
+        settings(), Values(name="a")
+    )
+
+
+def test_key_components(cache: RenderCache):
+    key = cache.key(settings(), Values(name="a"))
+    assert cache.key(settings(), Values(name="b")) != key
+    assert cache.key(settings(), Values(name="a"), "json") != key
+    assert cache.key(settings(version="2"), Values(name="a")) != key
+    assert cache.key(settings(Salted), Values(name="a")) != key
+
+
+def test_cache_salt_is_part_of_key(cache: RenderCache, monkeypatch):
+    key = cache.key(settings(Salted), Values(name="a"))
+    monkeypatch.setattr(Salted, "salt", "2")
+    assert cache.key(settings(Salted), Values(name="a")) != key
+
+
+def test_run_id_is_substituted(cache: RenderCache):
+    first, second = RunInfo(), RunInfo()
+    assert not cache.copy_to("key", first, io.StringIO())
+
+    with cache.writer("key", first) as entry:
+        entry.write(f"id: {first.id}\n")
+    with open(cache._entry("key")) as file:
+        assert file.read() == f"id: {RUN_ID_PLACEHOLDER}\n"
+
+    out = io.StringIO()
+    assert cache.copy_to("key", second, out)
+    assert out.getvalue() == f"id: {second.id}\n"
+
+
+def test_failed_entry_is_not_stored(cache: RenderCache):
+    with pytest.raises(RuntimeError):
+        with cache.writer("key", RunInfo()) as entry:
+            entry.write("partial")
+            raise RuntimeError()
+    assert not cache.copy_to("key", RunInfo(), io.StringIO())
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = RenderCache(str(tmp_path / "cache"), 250)
+    for key in ["a", "b", "c"]:
+        with cache.writer(key, RunInfo()) as entry:
+            entry.write("x" * 100)
+    assert not cache.copy_to("a", RunInfo(), io.StringIO())
+    assert cache.copy_to("c", RunInfo(), io.StringIO())
@@ -0,0 +1,138 @@
+import json
+import os
+
+import pytest
+
+from pcdf.cmd.outdir import (
+    INDEX_NAME,
+    ConflictingPathError,
+    OutputDir,
+    resource_path,
+)
+from pcdf.cmd.serializers import OutputFormat, get_serializer
+from pcdf.core.canonical import CONTENT_HASH_ANNOTATION
+
+
+def config_map(name: str, value: str = "1", namespace: str = "ns") -> dict:
+    return {
+        "apiVersion": "v1",
+        "kind": "ConfigMap",
+        "metadata": {"name": name, "namespace": namespace},
+        "data": {"value": value},
+    }
+
+
+@pytest.fixture
+def outdir(tmp_path) -> OutputDir:
+    return OutputDir(str(tmp_path / "out"), get_serializer(OutputFormat.YAML))
+
+
+def read(outdir: OutputDir, rel: str) -> str:
+    with open(os.path.join(outdir.path, rel)) as file:
+        return file.read()
+
+
+def test_resource_path():
+    assert resource_path(config_map("a"), ".yaml") == "ns/configmap-a.yaml"
+    cluster = {"apiVersion": "v1", "kind": "Namespace", "metadata": {"name": "ns"}}
+    assert resource_path(cluster, ".json") == "_cluster/namespace-ns.json"
+    assert resource_path(config_map("../x"), ".yaml") == "ns/configmap-.._x.yaml"
+
+
+def test_unchanged_files_are_not_written(outdir: OutputDir):
+    update = outdir.update([config_map("a"), config_map("b")])
+    assert update.written == ["ns/configmap-a.yaml", "ns/configmap-b.yaml"]
+    stat = os.stat(os.path.join(outdir.path, "ns/configmap-a.yaml"))
+
+    update = outdir.update([config_map("a"), config_map("b", "2")])
+    assert update.written == ["ns/configmap-b.yaml"]
+    assert update.unchanged == 1
+    after = os.stat(os.path.join(outdir.path, "ns/configmap-a.yaml"))
+    assert (after.st_ino, after.st_mtime_ns) == (stat.st_ino, stat.st_mtime_ns)
+    assert "value: '2'" in read(outdir, "ns/configmap-b.yaml")
+
+
+def test_gone_resources_are_removed(outdir: OutputDir):
+    outdir.update([config_map("a"), config_map("b", namespace="other")])
+    update = outdir.update([config_map("a")])
+    assert update.removed == ["other/configmap-b.yaml"]
+    # directory emptied by removal is removed too
+    assert sorted(os.listdir(outdir.path)) == [INDEX_NAME, "ns"]
+
+
+def test_foreign_files_are_left_alone(outdir: OutputDir):
+    os.makedirs(os.path.join(outdir.path, ".git"))
+    os.makedirs(os.path.join(outdir.path, "other"))
+    for rel in (".git/HEAD", "README.md", "other/notes.txt"):
+        with open(os.path.join(outdir.path, rel), "w") as file:
+            file.write(rel)
+    # open directory keeps its inode from being reused by a replacement
+    fd = os.open(outdir.path, os.O_RDONLY)
+    try:
+        outdir.update([config_map("a"), config_map("b", namespace="other")])
+        outdir.update([config_map("a", "2")])
+        # directory is updated in place, never replaced
+        assert os.path.samestat(os.fstat(fd), os.stat(outdir.path))
+    finally:
+        os.close(fd)
+    for rel in (".git/HEAD", "README.md", "other/notes.txt"):
+        assert read(outdir, rel) == rel
+    assert not os.path.exists(os.path.join(outdir.path, "other/configmap-b.yaml"))
+    assert [n for n in os.listdir(outdir.path) if n.endswith(".tmp")] == []
+
+
+def test_edited_files_are_written_again(outdir: OutputDir):
+    outdir.update([config_map("a")])
+    path = os.path.join(outdir.path, "ns/configmap-a.yaml")
+    original = read(outdir, "ns/configmap-a.yaml")
+    # same size, so only content (and mtime) tells the edit
+    with open(path, "w") as file:
+        file.write(original.replace("'1'", "'9'"))
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1))
+
+    update = outdir.update([config_map("a")])
+    assert update.written == ["ns/configmap-a.yaml"]
+    assert read(outdir, "ns/configmap-a.yaml") == original
+
+
+def test_touched_files_with_same_content_are_kept(outdir: OutputDir):
+    outdir.update([config_map("a")])
+    path = os.path.join(outdir.path, "ns/configmap-a.yaml")
+    os.utime(path, ns=(0, 0))
+    update = outdir.update([config_map("a")])
+    assert update.unchanged == 1 and update.written == []
+    # index is refreshed, so file is not hashed again next time
+    with open(os.path.join(outdir.path, INDEX_NAME)) as file:
+        entry = json.load(file)["files"]["ns/configmap-a.yaml"]
+    assert entry["mtime_ns"] == 0
+
+
+def test_lost_index_is_rebuilt_from_files(outdir: OutputDir):
+    outdir.update([config_map("a")])
+    os.remove(os.path.join(outdir.path, INDEX_NAME))
+    update = outdir.update([config_map("a")])
+    assert update.unchanged == 1
+    assert os.path.isfile(os.path.join(outdir.path, INDEX_NAME))
+
+
+def test_annotate_setting_change_rewrites_files(outdir: OutputDir):
+    outdir.update([config_map("a")])
+    annotated = OutputDir(outdir.path, outdir.serializer, annotate=True)
+    assert annotated.update([config_map("a")]).written == ["ns/configmap-a.yaml"]
+    assert CONTENT_HASH_ANNOTATION in read(outdir, "ns/configmap-a.yaml")
+    assert annotated.update([config_map("a")]).unchanged == 1
+
+
+def test_annotate_setting_change_removes_gone_files(outdir: OutputDir):
+    outdir.update([config_map("a"), config_map("b", namespace="other")])
+    annotated = OutputDir(outdir.path, outdir.serializer, annotate=True)
+    update = annotated.update([config_map("a")])
+    assert update.written == ["ns/configmap-a.yaml"]
+    assert update.removed == ["other/configmap-b.yaml"]
+    assert sorted(os.listdir(outdir.path)) == [INDEX_NAME, "ns"]
+
+
+def test_conflicting_paths(outdir: OutputDir):
+    with pytest.raises(ConflictingPathError):
+        outdir.update([config_map("a"), config_map("a", "2")])
@@ -0,0 +1,151 @@
+import logging
+from typing import Annotated
+
+import pytest
+from pydantic import AfterValidator, BaseModel, ValidationInfo, field_validator
+
+from pcdf.cmd.context import CommandContext
+from pcdf.cmd.overlay import OverlayMatrix, combination_name, deep_merge
+
+
+class Limits(BaseModel):
+    cpu: str = "1"
+    memory: str = "1Gi"
+
+
+class Plain(BaseModel):
+    name: str
+    replicas: int = 1
+    limits: Limits = Limits()
+    tags: list[str] = []
+
+
+class Bounded(BaseModel):
+    max: int
+    replicas: int
+
+    @field_validator("replicas")
+    @classmethod
+    def within_max(cls, v: int, info: ValidationInfo) -> int:
+        assert v <= info.data["max"], "replicas exceed max"
+        return v
+
+
+def at_most_max(v: int, info: ValidationInfo) -> int:
+    assert v <= info.data["max"], "replicas exceed max"
+    return v
+
+
+class AnnotatedBounded(BaseModel):
+    max: int
+    replicas: Annotated[int, AfterValidator(at_most_max)]
+
+
+def test_deep_merge():
+    base = {"a": {"b": 1, "c": {"d": 2}}, "l": [1, 2], "gone": 1, "kept": {"x": 1}}
+    overlay = {"a": {"c": {"e": 3}}, "l": [3], "gone": None, "new": 4}
+    merged = deep_merge(base, overlay)
+    assert merged == {
+        "a": {"b": 1, "c": {"d": 2, "e": 3}},
+        "l": [3],
+        "kept": {"x": 1},
+        "new": 4,
+    }
+    # arguments are not modified, untouched subtrees are shared
+    assert base["a"] == {"b": 1, "c": {"d": 2}} and "gone" in base
+    assert merged["kept"] is base["kept"]
+
+
+def test_deep_merge_replaces_mapping_by_scalar():
+    assert deep_merge({"a": {"b": 1}}, {"a": 1}) == {"a": 1}
+    assert deep_merge({"a": 1}, {"a": {"b": 1}}) == {"a": {"b": 1}}
+
+
+def matrix(
+    tmp_path, datamodel: type[BaseModel], base: str, *axes: dict[str, str]
+) -> OverlayMatrix:
+    (tmp_path / "base.yaml").write_text(base)
+    paths = []
+    for axis in axes:
+        paths.append([])
+        for name, text in axis.items():
+            (tmp_path / f"{name}.yaml").write_text(text)
+            paths[-1].append(str(tmp_path / f"{name}.yaml"))
+    ctx = CommandContext(
+        logger=logging.getLogger("test"),
+        settings=None,  # type: ignore[typeddict-item]
+        datamodel=datamodel,
+        interactive=False,
+    )
+    return OverlayMatrix(ctx, str(tmp_path / "base.yaml"), paths)
+
+
+@pytest.fixture
+def full_validations(monkeypatch) -> list[type[BaseModel]]:
+    calls = []
+    validate = BaseModel.model_validate.__func__  # type: ignore[attr-defined]
+
+    def spy(cls, *args, **kwargs):
+        calls.append(cls)
+        return validate(cls, *args, **kwargs)
+
+    monkeypatch.setattr(BaseModel, "model_validate", classmethod(spy))
+    return calls
+
+
+def test_combinations_merge_overlays_in_axes_order(tmp_path):
+    m = matrix(
+        tmp_path,
+        Plain,
+        "name: app\n",
+        {"dev": "replicas: 1\n", "prod": "replicas: 3\ntags: [prod]\n"},
+        {"eu": "limits: {cpu: '2'}\n", "us": "tags: [us]\n"},
+    )
+    combos = m.combinations()
+    assert [combination_name(c) for c in combos] == [
+        "dev/eu",
+        "dev/us",
+        "prod/eu",
+        "prod/us",
+    ]
+    raw, touched = m.merged(combos[3])
+    assert raw == {"name": "app", "replicas": 3, "tags": ["us"]}
+    assert touched == {"replicas", "tags"}
+    assert m.model(combos[2]) == Plain(
+        name="app", replicas=3, limits=Limits(cpu="2"), tags=["prod"]
+    )
+
+
+def test_touched_fields_of_valid_base_are_validated_alone(tmp_path, full_validations):
+    m = matrix(tmp_path, Plain, "name: app\n", {"prod": "limits: {cpu: '2'}\n"})
+    model = m.model(m.combinations()[0])
+    assert full_validations == [Plain]  # base only
+    assert model == Plain.model_validate(m.merged(m.combinations()[0])[0])
+    assert model.limits.memory == "1Gi"
+
+
+def test_invalid_touched_field_is_rejected(tmp_path):
+    m = matrix(tmp_path, Plain, "name: app\n", {"bad": "replicas: many\n"})
+    with pytest.raises(ValueError):
+        m.model(m.combinations()[0])
+
+
+@pytest.mark.parametrize("datamodel", [Bounded, AnnotatedBounded])
+def test_field_validators_reading_other_fields_see_merged_values(
+    tmp_path, datamodel, full_validations
+):
+    m = matrix(tmp_path, datamodel, "replicas: 5\nmax: 10\n", {"small": "max: 2\n"})
+    with pytest.raises(ValueError, match="replicas exceed max"):
+        m.model(m.combinations()[0])
+    assert full_validations[-1] is datamodel
+
+
+def test_removed_field_is_validated_as_a_whole(tmp_path):
+    m = matrix(tmp_path, Plain, "name: app\n", {"unnamed": "name: null\n"})
+    with pytest.raises(ValueError, match="name"):
+        m.model(m.combinations()[0])
+
+
+def test_overlays_completing_base(tmp_path):
+    m = matrix(tmp_path, Plain, "replicas: 2\n", {"named": "name: app\n"})
+    assert m.model(m.combinations()[0]) == Plain(name="app", replicas=2)
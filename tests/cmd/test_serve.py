@@ -0,0 +1,161 @@
+import json
+import logging
+import os
+import stat
+import threading
+from collections.abc import Iterator
+from typing import Any, Protocol, runtime_checkable
+
+import pytest
+from pydantic import BaseModel
+
+from pcdf.cmd.context import CommandContext
+from pcdf.cmd.remote import Address, RemoteError, render_remote, request
+from pcdf.cmd.serializers import OutputFormat
+from pcdf.cmd.serve import RenderService, _TCPServer, _UnixServer
+from pcdf.core import AbstractResourceProvider, Resource, ResourceFactory, Settings
+from pcdf.lib.datamodel import Document
+
+
+class Manifest(BaseModel):
+    apiVersion: str = "v1"
+    kind: str = "ConfigMap"
+    metadata: dict[str, Any]
+    data: dict[str, str]
+
+
+class Provider(AbstractResourceProvider):
+    @runtime_checkable
+    class Datamodel(Protocol):
+        name: str
+        files: list[Document]
+
+    def execute(self, log: logging.Logger, ctx: Any, data: Datamodel):
+        return [
+            Resource(
+                Manifest(
+                    metadata={"name": data.name},
+                    data={d.name: d.read() for f in data.files for d in f.expand()},
+                )
+            )
+        ]
+
+
+class Values(BaseModel):
+    name: str
+    files: list[Document] = []
+
+
+class Unconformed(BaseModel):
+    name: str
+
+
+def context(datamodel: type[BaseModel] = Values) -> CommandContext:
+    return CommandContext(
+        logger=logging.getLogger("test"),
+        settings=Settings(
+            version="1", resources=[Settings.Resource(provider=Provider, mutators=[])]
+        ),
+        datamodel=datamodel,
+        interactive=False,
+    )
+
+
+def start(server_cls, address: Address, ctx: CommandContext) -> Iterator[Address]:
+    with ResourceFactory.from_config(ctx["logger"], ctx["settings"]) as factory:
+        server = server_cls(address, RenderService(ctx, factory))
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        try:
+            if address.socket == "":
+                address = Address(port=server.server_address[1])
+            yield address
+        finally:
+            server.shutdown()
+            thread.join()
+            server.server_close()
+
+
+@pytest.fixture
+def tcp() -> Iterator[Address]:
+    yield from start(_TCPServer, Address(port=0), context())
+
+
+@pytest.fixture
+def unix(tmp_path) -> Iterator[Address]:
+    yield from start(_UnixServer, Address(socket=str(tmp_path / "s.sock")), context())
+
+
+@pytest.fixture
+def values(tmp_path) -> str:
+    (tmp_path / "secret.txt").write_text("secret")
+    path = tmp_path / "values.yaml"
+    path.write_text("name: app\nfiles:\n  - path: secret.txt\n")
+    return str(path)
+
+
+def render(address: Address, body: str, query: str = "") -> str:
+    return request(address, "POST", f"/render{query}", body.encode()).decode()
+
+
+def test_render_over_tcp(tcp: Address):
+    out = render(tcp, "name: app\nfiles:\n  - name: a\n    content: b\n")
+    assert "name: app" in out
+    assert "a: b" in out
+    items = json.loads(render(tcp, "name: app\n", "?format=json"))["items"]
+    assert [i["kind"] for i in items] == ["ConfigMap"]
+
+
+def test_tcp_clients_could_not_read_files(tcp: Address, values: str):
+    for body in (
+        "name: app\nfiles:\n  - path: /etc/hostname\n",
+        "name: app\nfiles:\n  - path: ../../etc/hostname\n",
+    ):
+        with pytest.raises(RemoteError) as err:
+            render(tcp, body)
+        assert err.value.status == 400
+        assert "files could not be read" in err.value.message
+    # path sent by client is ignored as well
+    with pytest.raises(RemoteError, match="files could not be read"):
+        render(tcp, "name: app\nfiles:\n  - path: secret.txt\n", f"?path={values}")
+
+
+def test_unix_clients_read_files_relative_to_values(
+    unix: Address, values: str, tmp_path
+):
+    assert stat.S_IMODE(os.stat(unix.socket).st_mode) == 0o600
+    assert "secret.txt: secret" in render_remote(context(), unix, values)
+
+
+def test_unconformed_datamodel(tmp_path):
+    address = Address(socket=str(tmp_path / "s.sock"))
+    for addr in start(_UnixServer, address, context(Unconformed)):
+        with pytest.raises(RemoteError) as err:
+            render(addr, "name: app\n")
+        assert err.value.status == 422
+        assert err.value.errors[0]["unconformed"][0].startswith("files:")
+
+
+def test_invalid_values_and_routes(tcp: Address):
+    with pytest.raises(RemoteError) as err:
+        render(tcp, "files: []\n")
+    assert err.value.status == 400
+    with pytest.raises(RemoteError) as err:
+        render(tcp, "name: app\n", "?format=toml")
+    assert err.value.status == 400
+    with pytest.raises(RemoteError) as err:
+        request(tcp, "GET", "/render")
+    assert err.value.status == 405
+    with pytest.raises(RemoteError) as err:
+        request(tcp, "GET", "/nope")
+    assert err.value.status == 404
+    assert request(tcp, "GET", "/healthz") == b"ok\n"
+
+
+def test_metrics_count_requests(tcp: Address):
+    request(tcp, "GET", "/healthz")
+    request(tcp, "POST", "/validate", b"name: app\n")
+    metrics = request(tcp, "GET", "/metrics").decode()
+    assert 'pcdf_requests_total{endpoint="/healthz",code="200"} 1' in metrics
+    assert 'pcdf_requests_total{endpoint="/validate",code="200"} 1' in metrics
+    assert json.loads(request(tcp, "GET", "/schema"))["title"] == "Values"
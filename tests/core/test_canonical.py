@@ -0,0 +1,67 @@
+from pcdf.core.canonical import (
+    CONTENT_HASH_ANNOTATION,
+    canonical_json,
+    content_hash,
+    format_key,
+    object_key,
+    stored_hash,
+    with_content_hash,
+)
+from pcdf.core.context import RUN_ID_LABEL
+
+
+def deployment(**meta) -> dict:
+    return {
+        "apiVersion": "apps/v1",
+        "kind": "Deployment",
+        "metadata": {"name": "app", "namespace": "ns", **meta},
+        "spec": {"replicas": 1},
+    }
+
+
+def test_canonical_json_is_sorted_and_compact():
+    doc = {"b": 1, "a": {"d": "é", "c": [1, 2]}}
+    assert canonical_json(doc) == '{"a":{"c":[1,2],"d":"é"},"b":1}'
+
+
+def test_run_id_does_not_change_hash():
+    a = deployment(labels={"app": "a", RUN_ID_LABEL: "1"})
+    b = deployment(labels={"app": "a", RUN_ID_LABEL: "2"})
+    assert content_hash(a) == content_hash(b)
+    assert content_hash(a) != content_hash(deployment(labels={"app": "b"}))
+
+
+def test_empty_metadata_maps_do_not_change_hash():
+    plain = content_hash(deployment())
+    assert content_hash(deployment(labels={}, annotations={})) == plain
+    assert content_hash(deployment(labels={RUN_ID_LABEL: "1"})) == plain
+
+
+def test_annotation_does_not_change_hash():
+    doc = deployment(annotations={"a": "b"})
+    annotated = with_content_hash(doc)
+
+    assert annotated["metadata"]["annotations"] == {
+        "a": "b",
+        CONTENT_HASH_ANNOTATION: content_hash(doc),
+    }
+    assert content_hash(annotated) == content_hash(doc)
+    # original is left as is
+    assert doc["metadata"]["annotations"] == {"a": "b"}
+    assert content_hash(with_content_hash(deployment())) == content_hash(deployment())
+
+
+def test_stored_hash():
+    doc = deployment()
+    assert stored_hash(doc) == content_hash(doc)
+    stale = deployment(annotations={CONTENT_HASH_ANNOTATION: "stale"})
+    assert stored_hash(stale) == "stale"
+
+
+def test_object_key():
+    key = object_key(deployment())
+    assert key == ("apps", "Deployment", "ns", "app")
+    assert format_key(key) == "deployment.apps/ns/app"
+
+    core = {"apiVersion": "v1", "kind": "Namespace", "metadata": {"name": "ns"}}
+    assert format_key(object_key(core)) == "namespace/ns"
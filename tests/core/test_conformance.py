@@ -0,0 +1,99 @@
+import functools
+import pickle
+from typing import Protocol
+
+import pytest
+from pydantic import BaseModel, ConfigDict, computed_field
+
+from pcdf.core import (
+    AbstractResourceMutator,
+    DatamodelConformanceError,
+    ProtocolConformanceError,
+    compile_conformance,
+)
+
+
+class Entity(AbstractResourceMutator):
+    class Datamodel(Protocol):
+        name: str
+        replicas: int
+        host: str
+        labels: dict[str, str]
+
+    def execute(self, log, data, resource):
+        pass
+
+
+class Methods(AbstractResourceMutator):
+    class Datamodel(Protocol):
+        copy: int
+        schema: str
+
+    def execute(self, log, data, resource):
+        pass
+
+
+class Conforming(BaseModel):
+    name: str
+    replicas: int = 1
+
+    @computed_field
+    @property
+    def host(self) -> str:
+        return f"{self.name}.local"
+
+    @functools.cached_property
+    def labels(self) -> dict[str, str]:
+        return {"name": self.name}
+
+
+class Partial(BaseModel):
+    name: str
+
+
+class Extra(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    name: str
+
+
+def test_fields_and_properties_conform():
+    compile_conformance(Conforming, (Entity,)).check(Conforming(name="a"))
+
+
+def test_model_methods_are_not_fields():
+    plan = compile_conformance(Conforming, (Methods,))
+    with pytest.raises(DatamodelConformanceError) as err:
+        plan.check(Conforming(name="a"))
+    assert err.value.errors[0].unconformed == ["copy: int", "schema: str"]
+
+
+def test_missing_fields_are_reported():
+    with pytest.raises(DatamodelConformanceError) as err:
+        compile_conformance(Partial, (Entity,)).check(Partial(name="a"))
+    assert [e.protocol for e in err.value.errors] == [Entity.fqname()]
+    assert [f.split(":")[0] for f in err.value.unconformed] == [
+        "host",
+        "labels",
+        "replicas",
+    ]
+
+
+def test_extra_fields_are_checked_per_input():
+    plan = compile_conformance(Extra, (Entity,))
+    plan.check(Extra(name="a", replicas=1, host="h", labels={}))
+    with pytest.raises(DatamodelConformanceError):
+        plan.check(Extra(name="a", replicas=1))
+
+
+def test_datamodel_error_is_protocol_error():
+    err = DatamodelConformanceError(
+        [ProtocolConformanceError("a", ["x: int"]), ProtocolConformanceError("b", [])]
+    )
+    assert isinstance(err, ProtocolConformanceError)
+    assert err.protocol == "a, b"
+    assert err.unconformed == ["x: int"]
+
+    copy = pickle.loads(pickle.dumps(err))
+    assert copy.errors == err.errors
+    assert str(copy) == str(err)
@@ -0,0 +1,146 @@
+import asyncio
+import logging
+import threading
+from typing import Any
+
+import pytest
+from pydantic import BaseModel
+
+from pcdf.core import (
+    AbstractResourceProvider,
+    AsyncResourceProvider,
+    ProviderDependencyError,
+    Resource,
+    ResourceFactory,
+    SystemInfo,
+)
+
+log = logging.getLogger(__name__)
+
+
+class Model(BaseModel):
+    name: str
+
+
+class Recorder(AbstractResourceProvider):
+    """Records execution order into datamodel list"""
+
+    def execute(self, log: logging.Logger, ctx: Any, data: list[str]):
+        data.append(self.fqname())
+        return [Resource(Model(name=type(self).__qualname__))]
+
+
+class First(Recorder):
+    pass
+
+
+class Second(Recorder):
+    depends_on = (f"{__name__}.Third",)
+
+
+class Third(Recorder):
+    pass
+
+
+class Unknown(Recorder):
+    depends_on = (f"{__name__}.Missing",)
+
+
+class Itself(Recorder):
+    depends_on = (f"{__name__}.Itself",)
+
+
+def factory(*providers: type[AbstractResourceProvider], concurrency: int = 1):
+    return (
+        ResourceFactory(log, SystemInfo(version="0", framework_version="0"))
+        .with_providers(*[p().with_mutators() for p in providers])
+        .with_concurrency(concurrency)
+    )
+
+
+@pytest.mark.parametrize("concurrency", [1, 4])
+def test_dependencies_are_executed_first(concurrency: int):
+    executed: list[str] = []
+    out = factory(First, Second, Third, concurrency=concurrency).run(executed)
+
+    assert executed.index(Third.fqname()) < executed.index(Second.fqname())
+    # output keeps configured order whatever the execution order was
+    assert [r.model.name for r in out] == ["First", "Second", "Third"]
+
+
+def test_sequential_order_without_dependencies():
+    executed: list[str] = []
+    factory(First, Third).run(executed)
+    assert executed == [First.fqname(), Third.fqname()]
+
+
+@pytest.mark.parametrize("concurrency", [1, 4])
+@pytest.mark.parametrize("provider", [Unknown, Itself])
+def test_unsatisfiable_dependencies(
+    provider: type[AbstractResourceProvider], concurrency: int
+):
+    with pytest.raises(ProviderDependencyError):
+        factory(First, provider, concurrency=concurrency).run([])
+
+
+class AsyncRecorder(AsyncResourceProvider):
+    async def execute(self, log: logging.Logger, ctx: Any, data: list[str]):
+        data.append(self.fqname())
+        return [Resource(Model(name=type(self).__qualname__))]
+
+
+class Gauge:
+    """Counts providers running at once"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+
+    def __enter__(self):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+
+    def __exit__(self, *exc):
+        with self.lock:
+            self.running -= 1
+
+
+class Slow(AsyncResourceProvider):
+    async def execute(self, log: logging.Logger, ctx: Any, data: Gauge):
+        with data:
+            await asyncio.sleep(0.01)
+        return []
+
+
+class SlowSync(AbstractResourceProvider):
+    side_effect_free = True
+
+    def execute(self, log: logging.Logger, ctx: Any, data: Gauge):
+        with data:
+            threading.Event().wait(0.01)
+        return []
+
+
+def test_async_providers_run_sequentially_without_concurrency():
+    executed: list[str] = []
+    out = factory(First, AsyncRecorder, Third).run(executed)
+    assert executed == [First.fqname(), AsyncRecorder.fqname(), Third.fqname()]
+    assert [r.model.name for r in out] == ["First", "AsyncRecorder", "Third"]
+
+
+@pytest.mark.parametrize("concurrency", [1, 2, 3])
+def test_async_scheduling_is_limited_by_concurrency(concurrency: int):
+    providers = [type(f"Slow{i}", (Slow,), {}) for i in range(3)]
+    providers += [type(f"SlowSync{i}", (SlowSync,), {}) for i in range(3)]
+    gauge = Gauge()
+    factory(*providers, concurrency=concurrency).run(gauge)
+    assert 1 <= gauge.peak <= concurrency
+
+
+def test_run_under_running_loop():
+    async def main():
+        return factory(First, AsyncRecorder).run([])
+
+    assert [r.model.name for r in asyncio.run(main())] == ["First", "AsyncRecorder"]
@@ -0,0 +1,60 @@
+from pcdf.core import Memo, MemoKey, MemoScope, MemoStore, memoize
+from pcdf.core.memo import MemoStats, activate, current
+
+RUN_KEY = MemoKey[int]("test.run")
+BATCH_KEY = MemoKey[int]("test.batch", MemoScope.BATCH)
+
+
+class Counter:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, x: int) -> int:
+        self.calls += 1
+        return x * 2
+
+
+def test_store_counts_hits_and_misses():
+    store, compute = MemoStore(), Counter()
+    assert store.get(RUN_KEY, compute, 1) == 2
+    assert store.get(RUN_KEY, compute, 1) == 2
+    assert store.get(RUN_KEY, compute, 2) == 4
+    assert compute.calls == 2
+    assert store.stats() == {"test.run": MemoStats(hits=1, misses=2)}
+
+
+def test_batch_keys_are_shared_between_runs():
+    batch, compute = MemoStore(), Counter()
+    first, second = Memo(batch), Memo(batch)
+
+    first.get(BATCH_KEY, compute, 1)
+    second.get(BATCH_KEY, compute, 1)
+    first.get(RUN_KEY, compute, 1)
+    second.get(RUN_KEY, compute, 1)
+
+    assert compute.calls == 3
+    assert batch.stats() == {"test.batch": MemoStats(hits=1, misses=1)}
+    assert second.run.stats() == {"test.run": MemoStats(hits=0, misses=1)}
+
+
+def test_batch_keys_without_batch_store_live_in_run():
+    memo, compute = Memo(), Counter()
+    memo.get(BATCH_KEY, compute, 1)
+    memo.get(BATCH_KEY, compute, 1)
+    assert compute.calls == 1
+    assert "test.batch" in memo.run.stats()
+
+
+def test_memoize_uses_active_memo():
+    compute = Counter()
+    memoize(RUN_KEY, compute, 1)
+    memoize(RUN_KEY, compute, 1)
+    assert compute.calls == 2
+
+    memo = Memo()
+    with activate(memo):
+        assert current() is memo
+        memoize(RUN_KEY, compute, 1)
+        memoize(RUN_KEY, compute, 1)
+    assert current() is None
+    assert compute.calls == 3
@@ -0,0 +1,107 @@
+import logging
+import os
+import sys
+
+import pytest
+
+from pcdf.core import AbstractResourceMutator, AbstractResourceProvider, registry
+from pcdf.core.registry import (
+    MUTATORS_GROUP,
+    PROVIDERS_GROUP,
+    EntityNotFoundError,
+    IncorrectEntityError,
+    Registry,
+    fingerprint,
+    load_entity,
+)
+
+
+class Provider(AbstractResourceProvider):
+    def execute(self, log: logging.Logger, ctx, data):
+        return []
+
+
+@pytest.fixture(autouse=True)
+def entry_points(monkeypatch) -> dict[str, dict[str, str]]:
+    groups = {
+        PROVIDERS_GROUP: {"local": f"{__name__}:Provider", "gone": "no.such:Thing"},
+        MUTATORS_GROUP: {},
+    }
+    reg = Registry()
+    reg._groups = groups
+    monkeypatch.setattr(registry, "_registry", reg)
+    registry._resolve.cache_clear()
+    yield groups
+    registry._resolve.cache_clear()
+
+
+def provider(ref) -> type:
+    return load_entity(ref, PROVIDERS_GROUP, AbstractResourceProvider)
+
+
+def test_classes_are_returned_as_is():
+    assert provider(Provider) is Provider
+
+
+@pytest.mark.parametrize(
+    "ref", ["local", f"{__name__}.Provider", f"{__name__}:Provider"]
+)
+def test_references(ref):
+    assert provider(ref) is Provider
+
+
+def test_fqname_of_nested_attribute():
+    ref = "pcdf.lib.deployment.RuntimeMutator"
+    from pcdf.lib.deployment import RuntimeMutator
+
+    assert load_entity(ref, MUTATORS_GROUP, AbstractResourceMutator) is (RuntimeMutator)
+
+
+def test_entity_of_other_kind_is_rejected():
+    with pytest.raises(IncorrectEntityError):
+        load_entity(f"{__name__}.Provider", MUTATORS_GROUP, AbstractResourceMutator)
+
+
+@pytest.mark.parametrize("ref", ["unknown", "no_such_module.Provider", "tests.Nope"])
+def test_unknown_references(ref):
+    with pytest.raises(EntityNotFoundError, match="installed"):
+        provider(ref)
+
+
+def test_broken_entry_point_is_not_hidden():
+    with pytest.raises(ModuleNotFoundError):
+        provider("gone")
+
+
+def test_index_file_is_reused_while_fingerprint_is_the_same(tmp_path, monkeypatch):
+    path = str(tmp_path / "index.json")
+    groups = Registry(path)._load()
+    assert os.path.isfile(path)
+
+    def fail(**_):
+        raise AssertionError("metadata scanned again")
+
+    monkeypatch.setattr(registry, "entry_points", fail)
+    assert Registry(path)._load() == groups
+
+    monkeypatch.setattr(registry, "fingerprint", lambda: "other")
+    with pytest.raises(AssertionError, match="scanned again"):
+        Registry(path)._load()
+
+
+def test_fingerprint_follows_site_directories_only(tmp_path, monkeypatch):
+    site_dir, work_dir = tmp_path / "site-packages", tmp_path / "work"
+    site_dir.mkdir()
+    work_dir.mkdir()
+    monkeypatch.chdir(work_dir)
+    monkeypatch.setattr(sys, "path", ["", str(work_dir), str(site_dir)])
+    monkeypatch.setattr(registry, "site_dirs", lambda: {str(site_dir)})
+
+    before = fingerprint()
+    (work_dir / "output.yaml").write_text("")
+    os.utime(work_dir, ns=(0, 0))
+    assert fingerprint() == before
+
+    (site_dir / "plugin-1.0.dist-info").mkdir()
+    os.utime(site_dir, ns=(0, 0))
+    assert fingerprint() != before
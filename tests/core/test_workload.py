@@ -0,0 +1,109 @@
+from pydantic import BaseModel
+
+from pcdf.core.workload import WorkloadIndex, pod_spec
+
+
+class Env(BaseModel):
+    name: str
+    value: str = ""
+
+
+class Container(BaseModel):
+    name: str
+    env: list[Env] | None = None
+
+
+class Volume(BaseModel):
+    name: str
+    source: str = ""
+
+
+class PodSpec(BaseModel):
+    containers: list[Container] = []
+    initContainers: list[Container] | None = None
+    volumes: list[Volume] | None = None
+
+
+class Template(BaseModel):
+    spec: PodSpec | None = None
+
+
+class WorkloadSpec(BaseModel):
+    template: Template | None = None
+
+
+class JobSpec(BaseModel):
+    template: Template
+
+
+class JobTemplate(BaseModel):
+    spec: JobSpec | None = None
+
+
+class CronJobSpec(BaseModel):
+    jobTemplate: JobTemplate
+
+
+class Model(BaseModel):
+    spec: PodSpec | WorkloadSpec | CronJobSpec | None = None
+
+
+def test_pod_spec():
+    pod = PodSpec()
+    template = Template(spec=pod)
+    assert pod_spec(Model(spec=pod)) is pod
+    assert pod_spec(Model(spec=WorkloadSpec(template=template))) is pod
+    cron = CronJobSpec(jobTemplate=JobTemplate(spec=JobSpec(template=template)))
+    assert pod_spec(Model(spec=cron)) is pod
+
+    assert pod_spec(Model()) is None
+    assert pod_spec(Model(spec=WorkloadSpec())) is None
+    assert pod_spec(Model(spec=CronJobSpec(jobTemplate=JobTemplate()))) is None
+
+
+def test_containers_by_name():
+    pod = PodSpec(containers=[Container(name="app"), Container(name="sidecar")])
+    wl = WorkloadIndex(pod)
+    assert wl.container("app") is pod.containers[0]
+    assert wl.container("missing") is None
+    assert wl.container_count("app") == 1
+    assert wl.init_containers() == {}
+
+
+def test_direct_edits_are_noticed():
+    pod = PodSpec(containers=[Container(name="app")])
+    wl = WorkloadIndex(pod)
+    assert list(wl.containers()) == ["app"]
+
+    pod.containers.append(Container(name="app"))
+    assert wl.container_count("app") == 2
+    pod.containers = [Container(name="other")]
+    assert list(wl.containers()) == ["other"]
+
+
+def test_put_volumes_upserts_in_place():
+    pod = PodSpec()
+    wl = WorkloadIndex(pod)
+    wl.put_volumes(Volume(name="a"), Volume(name="b"))
+    wl.put_volumes(Volume(name="a", source="new"), Volume(name="c"))
+
+    assert pod.volumes is not None
+    assert [(v.name, v.source) for v in pod.volumes] == [
+        ("a", "new"),
+        ("b", ""),
+        ("c", ""),
+    ]
+    assert wl.volume("a") is pod.volumes[0]
+
+
+def test_put_env():
+    app = Container(name="app")
+    wl = WorkloadIndex(PodSpec(containers=[app]))
+    wl.put_env(app)
+    assert app.env == []
+
+    wl.put_env(app, Env(name="A", value="1"), Env(name="B", value="1"))
+    wl.put_env(app, Env(name="A", value="2"))
+    assert app.env is not None
+    assert [(e.name, e.value) for e in app.env] == [("A", "2"), ("B", "1")]
+    assert wl.env(app)["A"].value == "2"
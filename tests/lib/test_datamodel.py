@@ -0,0 +1,86 @@
+import os
+
+import pytest
+from pydantic import ValidationError
+
+from pcdf.lib.datamodel import Document
+
+
+def document(values_dir: str, **fields) -> Document:
+    return Document.model_validate(fields, context={"values_dir": values_dir})
+
+
+@pytest.fixture
+def values_dir(tmp_path):
+    (tmp_path / "files").mkdir()
+    (tmp_path / "files" / "a.conf").write_text("a")
+    (tmp_path / "files" / "b.conf").write_text("bb")
+    return str(tmp_path)
+
+
+def test_path_is_kept_as_given(values_dir):
+    doc = document(values_dir, path="files/a.conf")
+    assert doc.path == "files/a.conf"
+    assert doc.name == "a.conf"
+    assert doc.read() == "a"
+    assert doc.input_files() == [f"{values_dir}/files/a.conf"]
+    assert values_dir not in doc.model_dump_json()
+
+
+def test_dump_does_not_depend_on_checkout(values_dir, tmp_path_factory):
+    other = tmp_path_factory.mktemp("other")
+    (other / "files").mkdir()
+    (other / "files" / "a.conf").write_text("a")
+    assert (
+        document(values_dir, path="files/a.conf").model_dump()
+        == document(str(other), path="files/a.conf").model_dump()
+    )
+
+
+def test_glob_expands_relative_to_values_dir(values_dir):
+    doc = document(values_dir, path="files/*.conf")
+    expanded = doc.expand()
+    assert [(d.name, d.path) for d in expanded] == [
+        ("a.conf", "files/a.conf"),
+        ("b.conf", "files/b.conf"),
+    ]
+    assert [d.read() for d in expanded] == ["a", "bb"]
+    assert doc.size() == 3
+    assert doc.input_files() == [
+        f"{values_dir}/files",
+        f"{values_dir}/files/a.conf",
+        f"{values_dir}/files/b.conf",
+    ]
+
+
+def test_glob_in_directory_watches_its_parent(values_dir):
+    os.makedirs(f"{values_dir}/conf/a")
+    os.makedirs(f"{values_dir}/conf/b")
+    with open(f"{values_dir}/conf/a/x.yaml", "w") as file:
+        file.write("x")
+    doc = document(values_dir, path="conf/*/x.yaml")
+    assert doc.input_files() == [
+        f"{values_dir}/conf",
+        f"{values_dir}/conf/a",
+        f"{values_dir}/conf/b",
+        f"{values_dir}/conf/a/x.yaml",
+    ]
+
+
+def test_digest_follows_content(values_dir):
+    doc = document(values_dir, path="files/a.conf")
+    before = doc.digest
+    with open(doc.file(), "w") as file:
+        file.write("changed")
+    assert doc.digest != before
+
+
+def test_missing_file_is_rejected(values_dir):
+    with pytest.raises(ValidationError, match="no such file"):
+        document(values_dir, path="files/missing.conf")
+
+
+def test_content_or_path(values_dir):
+    assert document(values_dir, name="x", content="c").read() == "c"
+    with pytest.raises(ValidationError, match="exactly one"):
+        document(values_dir, name="x", content="c", path="files/a.conf")